@@ -0,0 +1,185 @@
+"""
+FastAPI TeuxDeux Clone - Admission Control
+Bounds the number of in-flight API requests per client and in total
+"""
+
+import os
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, Tuple
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Set to false to admit every request
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() in ("1", "true", "yes")
+# In-flight requests of all clients together
+MAX_INFLIGHT_READS = int(os.getenv("MAX_INFLIGHT_READS", "64"))
+MAX_INFLIGHT_WRITES = int(os.getenv("MAX_INFLIGHT_WRITES", "8"))
+# In-flight requests of a single client
+CLIENT_MAX_INFLIGHT_READS = int(os.getenv("CLIENT_MAX_INFLIGHT_READS", "8"))
+CLIENT_MAX_INFLIGHT_WRITES = int(os.getenv("CLIENT_MAX_INFLIGHT_WRITES", "2"))
+# How long a request may wait for a slot before it is rejected
+ADMISSION_QUEUE_TIMEOUT_MS = int(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "500"))
+# Header that identifies the client (e.g. x-forwarded-for behind a proxy); the peer address otherwise
+ADMISSION_CLIENT_HEADER = os.getenv("ADMISSION_CLIENT_HEADER", "").lower().encode()
+# Value of the Retry-After header on rejected requests
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", "1"))
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+EXEMPT_PATHS = ("/api/v1/health",)
+
+
+class Slots:
+    """FIFO counting semaphore whose waiters give up after a timeout"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def idle(self) -> bool:
+        return self.active == 0 and not self.waiters
+
+    async def acquire(self, timeout: float) -> bool:
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return True
+        if timeout <= 0:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+            return True
+        except asyncio.TimeoutError:
+            if waiter.done():  # Handed a slot just as the wait ran out
+                return True
+            self.waiters.remove(waiter)
+            return False
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release()
+            else:
+                self.waiters.remove(waiter)
+            raise
+
+    def release(self):
+        # Hand the slot straight to the next waiter, if any
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+
+class AdmissionController:
+    """In-flight slots of all clients, shared by the middleware and the health check"""
+
+    def __init__(self):
+        self.global_slots = {
+            "read": Slots(MAX_INFLIGHT_READS),
+            "write": Slots(MAX_INFLIGHT_WRITES),
+        }
+        self.client_slots: Dict[Tuple[str, str], Slots] = {}
+        self.rejected_client = 0
+        self.rejected_global = 0
+
+    def slots_for(self, client: str, kind: str) -> Slots:
+        slots = self.client_slots.get((client, kind))
+        if slots is None:
+            limit = CLIENT_MAX_INFLIGHT_READS if kind == "read" else CLIENT_MAX_INFLIGHT_WRITES
+            slots = self.client_slots[(client, kind)] = Slots(limit)
+        return slots
+
+    def forget_if_idle(self, client: str, kind: str):
+        slots = self.client_slots.get((client, kind))
+        if slots is not None and slots.idle:
+            del self.client_slots[(client, kind)]
+
+    def as_dict(self) -> dict:
+        status = {
+            kind: {"in_flight": slots.active, "queued": len(slots.waiters), "limit": slots.limit}
+            for kind, slots in self.global_slots.items()
+        }
+        status.update(
+            clients=len(self.client_slots),
+            rejected_client=self.rejected_client,
+            rejected_global=self.rejected_global,
+        )
+        return status
+
+
+admission = AdmissionController()
+
+
+class AdmissionMiddleware:
+    """Limit in-flight API requests, separately for reads and writes.
+
+    A request first waits (up to ADMISSION_QUEUE_TIMEOUT_MS) for a slot of
+    its client and then for a global slot. A client over its own limit gets
+    429, a full server 503, both with ``Retry-After``. Waiting is FIFO, so a
+    client looping on one endpoint cannot starve the others, and tail latency
+    stays bounded by the queue timeout instead of growing with the backlog.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.timeout = ADMISSION_QUEUE_TIMEOUT_MS / 1000
+
+    def _client(self, scope) -> str:
+        if ADMISSION_CLIENT_HEADER:
+            for name, value in scope["headers"]:
+                if name == ADMISSION_CLIENT_HEADER:
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def _reject(self, send, status: int, detail: str):
+        logger.debug(f"Rejected request with {status}: {detail}")
+        body = orjson.dumps({"detail": detail})
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(RETRY_AFTER_SECONDS).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or not scope["path"].startswith("/api/")
+                or scope["path"] in EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        kind = "read" if scope["method"] in READ_METHODS else "write"
+        client = self._client(scope)
+        client_slots = admission.slots_for(client, kind)
+        # Both waits share one deadline
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        try:
+            if not await client_slots.acquire(self.timeout):
+                admission.rejected_client += 1
+                await self._reject(send, 429, f"Too many concurrent {kind} requests from this client")
+                return
+            global_slots = admission.global_slots[kind]
+            if not await global_slots.acquire(deadline - loop.time()):
+                client_slots.release()
+                admission.rejected_global += 1
+                await self._reject(send, 503, f"Server is busy, too many concurrent {kind} requests")
+                return
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                global_slots.release()
+                client_slots.release()
+        finally:
+            admission.forget_if_idle(client, kind)
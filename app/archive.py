@@ -0,0 +1,190 @@
+"""
+FastAPI TeuxDeux Clone - Archival Functions
+Move old completed todos and migration history out of the hot tables
+"""
+
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import text, bindparam
+from app.database import Database
+from app.statistics import SUSPEND_STATISTICS, RESUME_STATISTICS
+from app.read_model import read_model
+
+logger = logging.getLogger(__name__)
+
+# Completed todos older than this many days are moved to the archive
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+# Number of todos moved per transaction, keeps the write lock short
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+# Seconds between archival runs (0 = only run at startup)
+ARCHIVE_INTERVAL_SECONDS = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", "86400"))
+
+TODO_COLUMNS = (
+    "id, title, completed, category_id, scheduled_date, sort_order, color, "
+    "recurring_pattern, parent_id, created_at, updated_at"
+)
+MIGRATION_COLUMNS = "id, todo_id, from_date, to_date, migrated_at"
+
+
+async def ensure_archive_tables(db: Database):
+    """Create the archive tables if they don't exist"""
+    schema = db.archive_schema
+    statements = [
+        f"""
+        CREATE TABLE IF NOT EXISTS {schema}.todos_archive (
+            archive_id INTEGER PRIMARY KEY,
+            id INTEGER NOT NULL,
+            title VARCHAR NOT NULL,
+            completed BOOLEAN,
+            category_id INTEGER,
+            scheduled_date VARCHAR,
+            sort_order INTEGER,
+            color VARCHAR,
+            recurring_pattern VARCHAR,
+            parent_id INTEGER,
+            created_at DATETIME,
+            updated_at DATETIME,
+            archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            completed_at DATETIME
+        )
+        """,
+        f"CREATE INDEX IF NOT EXISTS {schema}.idx_todos_archive_scheduled_date "
+        f"ON todos_archive (scheduled_date)",
+        f"CREATE INDEX IF NOT EXISTS {schema}.idx_todos_archive_id ON todos_archive (id)",
+        f"""
+        CREATE TABLE IF NOT EXISTS {schema}.todo_migrations_archive (
+            archive_id INTEGER PRIMARY KEY,
+            id INTEGER NOT NULL,
+            todo_id INTEGER NOT NULL,
+            from_date VARCHAR,
+            to_date VARCHAR,
+            migrated_at DATETIME,
+            archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        f"CREATE INDEX IF NOT EXISTS {schema}.idx_todo_migrations_archive_todo_id "
+        f"ON todo_migrations_archive (todo_id)",
+    ]
+
+    async with db.engine.begin() as conn:
+        for statement in statements:
+            await conn.execute(text(statement))
+
+
+async def archive_old_data(db: Database, older_than_days: int = ARCHIVE_AFTER_DAYS,
+                           batch_size: int = ARCHIVE_BATCH_SIZE) -> dict:
+    """Move old completed todos and old migration rows into the archive tables.
+
+    Works in batches of ``batch_size`` rows, each in its own transaction, so
+    request handlers are never blocked on the write lock for long.
+    """
+    schema = db.archive_schema
+    cutoff = (datetime.now() - timedelta(days=older_than_days)).strftime("%Y-%m-%d")
+
+    # Todos with subtasks stay until their subtasks have been archived
+    select_todos = text("""
+        SELECT id FROM todos
+        WHERE completed = true
+        AND (
+            (scheduled_date IS NOT NULL AND scheduled_date < :cutoff)
+            OR (scheduled_date IS NULL AND updated_at < :cutoff)
+        )
+        AND NOT EXISTS (SELECT 1 FROM todos c WHERE c.parent_id = todos.id)
+        ORDER BY id
+        LIMIT :batch_size
+    """)
+    # The completion time goes along, the statistics keep using it
+    copy_todos = text(f"""
+        INSERT INTO {schema}.todos_archive ({TODO_COLUMNS}, completed_at)
+        SELECT {TODO_COLUMNS}, (SELECT completed_at FROM stats_completions WHERE todo_id = todos.id)
+        FROM todos WHERE id IN :ids
+    """).bindparams(bindparam("ids", expanding=True))
+    copy_todo_migrations = text(f"""
+        INSERT INTO {schema}.todo_migrations_archive ({MIGRATION_COLUMNS})
+        SELECT {MIGRATION_COLUMNS} FROM todo_migrations WHERE todo_id IN :ids
+    """).bindparams(bindparam("ids", expanding=True))
+    delete_todo_migrations = text(
+        "DELETE FROM todo_migrations WHERE todo_id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+    delete_todos = text(
+        "DELETE FROM todos WHERE id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+    delete_completions = text(
+        "DELETE FROM stats_completions WHERE todo_id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+
+    select_migrations = text("""
+        SELECT id FROM todo_migrations
+        WHERE migrated_at < :cutoff
+        ORDER BY id
+        LIMIT :batch_size
+    """)
+    copy_migrations = text(f"""
+        INSERT INTO {schema}.todo_migrations_archive ({MIGRATION_COLUMNS})
+        SELECT {MIGRATION_COLUMNS} FROM todo_migrations WHERE id IN :ids
+    """).bindparams(bindparam("ids", expanding=True))
+    delete_migrations = text(
+        "DELETE FROM todo_migrations WHERE id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+
+    archived_todos = 0
+    archived_migrations = 0
+    params = {"cutoff": cutoff, "batch_size": batch_size}
+
+    # Completed todos, together with the migration history that belongs to them
+    while True:
+        async with db.SessionLocal() as session:
+            ids = (await session.execute(select_todos, params)).scalars().all()
+            if not ids:
+                break
+            await session.execute(copy_todos, {"ids": ids})
+            result = await session.execute(copy_todo_migrations, {"ids": ids})
+            archived_migrations += result.rowcount
+            await session.execute(delete_todo_migrations, {"ids": ids})
+            # Archived todos keep counting in the statistics rollups
+            await session.execute(SUSPEND_STATISTICS)
+            await session.execute(delete_todos, {"ids": ids})
+            await session.execute(delete_completions, {"ids": ids})
+            await session.execute(RESUME_STATISTICS)
+            await session.commit()
+        archived_todos += len(ids)
+        # Give waiting requests a chance to run between batches
+        await asyncio.sleep(0)
+
+    # Remaining migration history of todos that are still in the hot table
+    while True:
+        async with db.SessionLocal() as session:
+            ids = (await session.execute(select_migrations, params)).scalars().all()
+            if not ids:
+                break
+            await session.execute(copy_migrations, {"ids": ids})
+            await session.execute(delete_migrations, {"ids": ids})
+            await session.commit()
+        archived_migrations += len(ids)
+        await asyncio.sleep(0)
+
+    if archived_todos:
+        read_model.invalidate()
+    if archived_todos or archived_migrations:
+        logger.info(
+            f"Archived {archived_todos} todos and {archived_migrations} migration rows "
+            f"older than {cutoff}"
+        )
+    else:
+        logger.info("No data to archive")
+
+    return {"archived_todos": archived_todos, "archived_migrations": archived_migrations}
+
+
+async def run_archive_schedule(db: Database, interval: int = ARCHIVE_INTERVAL_SECONDS, tenants=None):
+    """Periodically archive old data until cancelled (and of every tenant, given a TenantDatabasePool)"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await archive_old_data(db)
+        except Exception:
+            logger.exception("Archival run failed")
+        if tenants:
+            await tenants.run_for_each_tenant(archive_old_data, "Archival run")
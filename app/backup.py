@@ -0,0 +1,179 @@
+"""
+FastAPI TeuxDeux Clone - Online Backups
+Consistent snapshots of the live SQLite files with the SQLite online backup API
+"""
+
+import os
+import re
+import time
+import sqlite3
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+from app.coordination import file_lock
+from app.database import Database
+
+logger = logging.getLogger(__name__)
+
+# Directory for backup files
+BACKUP_DIR = os.getenv(
+    "BACKUP_DIR", "/app/data/backups" if os.path.isdir("/app/data") else "./backups"
+)
+# Pages copied per backup step; the database is only locked for one step at a time
+BACKUP_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", "256"))
+# Pause between steps, leaves the disk and the database to request handlers
+BACKUP_STEP_SLEEP_MS = int(os.getenv("BACKUP_STEP_SLEEP_MS", "5"))
+# Restarts of the stepwise copy (caused by writes) before falling back to one full-copy step
+BACKUP_MAX_RESTARTS = int(os.getenv("BACKUP_MAX_RESTARTS", "10"))
+# Number of backups kept per database file
+BACKUP_RETAIN = int(os.getenv("BACKUP_RETAIN", "7"))
+# Seconds between scheduled backups (0 = only on request)
+BACKUP_INTERVAL_SECONDS = int(os.getenv("BACKUP_INTERVAL_SECONDS", "0"))
+
+
+class BackupStats:
+    """Outcome of the most recent backup of this process"""
+
+    def __init__(self):
+        self.last: Optional[dict] = None
+        self.count = 0
+        self.failures = 0
+
+    def as_dict(self) -> dict:
+        return {"backups": self.count, "failures": self.failures, "last": self.last}
+
+
+backup_stats = BackupStats()
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def _backup_file(source_path: str, target_path: str) -> dict:
+    """Copy one database file step by step (runs in a worker thread).
+
+    Under a steady write load the stepwise copy may never finish; after
+    BACKUP_MAX_RESTARTS restarts the file is copied in one step instead,
+    which holds the read lock for the whole copy but cannot be restarted.
+    """
+    progress = {"steps": 0, "restarts": 0, "remaining": None, "full_copy": False}
+
+    def on_progress(status, remaining, total):
+        # The backup starts over when another connection writes to the source
+        if progress["remaining"] is not None and remaining > progress["remaining"]:
+            progress["restarts"] += 1
+            if progress["restarts"] > BACKUP_MAX_RESTARTS:
+                raise _TooManyRestarts()
+        progress["remaining"] = remaining
+        progress["steps"] += 1
+        if remaining and BACKUP_STEP_SLEEP_MS:
+            time.sleep(BACKUP_STEP_SLEEP_MS / 1000)
+
+    temp_path = f"{target_path}.tmp"
+    source = sqlite3.connect(source_path)
+    try:
+        target = sqlite3.connect(temp_path)
+        try:
+            source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=on_progress)
+        except _TooManyRestarts:
+            logger.info(f"Backup of {source_path} restarted {BACKUP_MAX_RESTARTS} times, copying it in one step")
+            target.close()
+            os.remove(temp_path)
+            target = sqlite3.connect(temp_path)
+            source.backup(target, pages=-1)
+            progress["steps"] += 1
+            progress["full_copy"] = True
+        finally:
+            target.close()
+    finally:
+        source.close()
+    # Only complete backups ever carry the final name
+    os.replace(temp_path, target_path)
+
+    return {
+        "file": os.path.basename(target_path),
+        "size_bytes": os.path.getsize(target_path),
+        "steps": progress["steps"],
+        "restarts": progress["restarts"],
+        "full_copy": progress["full_copy"],
+    }
+
+
+def _prune_backups(stem: str):
+    """Delete the oldest backups of one database beyond BACKUP_RETAIN"""
+    # Exact match, so pruning "acme" leaves the backups of "acme-corp" alone
+    pattern = re.compile(rf"{re.escape(stem)}-\d{{8}}-\d{{6}}(-\d{{6}})?\.db")
+    backups = sorted(name for name in os.listdir(BACKUP_DIR) if pattern.fullmatch(name))
+    for name in backups[:-BACKUP_RETAIN] if BACKUP_RETAIN > 0 else []:
+        os.remove(os.path.join(BACKUP_DIR, name))
+
+
+def list_backups() -> List[dict]:
+    """Stored backup files, newest first"""
+    if not os.path.isdir(BACKUP_DIR):
+        return []
+    backups = []
+    for name in os.listdir(BACKUP_DIR):
+        if not name.endswith(".db"):
+            continue
+        stat = os.stat(os.path.join(BACKUP_DIR, name))
+        backups.append({
+            "file": name,
+            "size_bytes": stat.st_size,
+            "created_at": datetime.fromtimestamp(stat.st_mtime),
+        })
+    return sorted(backups, key=lambda backup: backup["created_at"], reverse=True)
+
+
+async def backup_database(db: Database) -> dict:
+    """Back up the database (and its archive file, if separate) to BACKUP_DIR.
+
+    The copy runs in a thread, a few pages at a time, so requests keep being
+    served; readers and the writer are never blocked for more than one step.
+    """
+    sources = [db.db_path] + ([db.archive_path] if db.archive_path else [])
+    started = time.perf_counter()
+
+    # One backup of a database at a time, across workers
+    async with file_lock(f"{db.db_path}.backup.lock"):
+        # Taken under the lock and with microseconds, so back-to-back backups never share a name
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        os.makedirs(BACKUP_DIR, exist_ok=True)
+        files = []
+        try:
+            for source_path in sources:
+                stem = os.path.splitext(os.path.basename(source_path))[0]
+                target_path = os.path.join(BACKUP_DIR, f"{stem}-{timestamp}.db")
+                files.append(await asyncio.to_thread(_backup_file, source_path, target_path))
+                _prune_backups(stem)
+        except Exception:
+            backup_stats.failures += 1
+            raise
+
+    result = {
+        "files": files,
+        "size_bytes": sum(f["size_bytes"] for f in files),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "finished_at": datetime.now(),
+    }
+    backup_stats.count += 1
+    backup_stats.last = result
+    logger.info(
+        f"Backed up {', '.join(f['file'] for f in files)} "
+        f"({result['size_bytes']} bytes in {result['duration_ms']} ms)"
+    )
+    return result
+
+
+async def run_backup_schedule(db: Database, interval: int = BACKUP_INTERVAL_SECONDS, tenants=None):
+    """Periodically back up the database until cancelled (and every tenant's, given a TenantDatabasePool)"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await backup_database(db)
+        except Exception:
+            logger.exception("Scheduled backup failed")
+        if tenants:
+            await tenants.run_for_each_tenant(backup_database, "Scheduled backup")
@@ -0,0 +1,195 @@
+"""
+FastAPI TeuxDeux Clone - Response Compression
+Content-encoding negotiation, codecs (brotli/zstd are used when installed)
+and a middleware that compresses large API responses
+"""
+
+import os
+import gzip
+import time
+import logging
+from typing import Dict, Iterable, Optional, Sequence
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def available_encodings() -> list:
+    """Content encodings this process can produce for static files, best first"""
+    encodings = []
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def dynamic_encodings() -> list:
+    """Content encodings used for responses compressed on the fly, fastest first"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {encoding: quality}"""
+    accepted = {}
+    if not header:
+        return accepted
+    for part in header.split(","):
+        encoding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if encoding:
+            accepted[encoding.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(header: Optional[str], offered: Iterable[str]) -> Optional[str]:
+    """Pick the first offered encoding the client accepts (offered is in preference order)"""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    for encoding in offered:
+        # identity is acceptable unless the client explicitly refuses it
+        default = 1.0 if encoding == "identity" else wildcard
+        if accepted.get(encoding, default) > 0:
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str, static: bool = False) -> bytes:
+    """Compress ``data``; ``static`` selects maximum compression for build-time assets"""
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=19 if static else 3).compress(data)
+    if encoding == "br":
+        return brotli.compress(data, quality=11 if static else 4)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9 if static else 6, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class CompressionStats:
+    """Running totals of the work done by the compression middleware"""
+
+    def __init__(self):
+        self.responses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    def record(self, bytes_in: int, bytes_out: int, cpu_seconds: float):
+        self.responses += 1
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.cpu_seconds += cpu_seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "responses": self.responses,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.bytes_in / self.bytes_out, 2) if self.bytes_out else None,
+            "cpu_ms": round(self.cpu_seconds * 1000, 2),
+        }
+
+
+compression_stats = CompressionStats()
+
+
+class CompressionMiddleware:
+    """Compress complete response bodies above a size threshold.
+
+    Streaming responses (more than one body message), responses that already
+    carry a Content-Encoding, non-text content types and excluded path
+    prefixes are passed through. Every other response gets ``Vary:
+    Accept-Encoding``, also when it is sent uncompressed because it is small
+    or the client accepts no encoding we offer, so shared caches never hand
+    one client's representation to another.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE,
+                 exclude_paths: Sequence[str] = ()):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.exclude_paths = tuple(exclude_paths)
+        self.encodings = dynamic_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is None or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            started = time.thread_time()
+            compressed = compress(body, encoding)
+            cpu_seconds = time.thread_time() - started
+            compression_stats.record(len(body), len(compressed), cpu_seconds)
+            logger.debug(
+                f"{encoding} {scope['path']}: {len(body)} -> {len(compressed)} bytes "
+                f"(ratio {len(body) / max(len(compressed), 1):.1f}x, {cpu_seconds * 1000:.2f} ms CPU)"
+            )
+
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
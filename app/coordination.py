@@ -0,0 +1,171 @@
+"""
+FastAPI TeuxDeux Clone - Multi-Worker Coordination
+File locks for startup/leader election and cross-process cache invalidation
+"""
+
+import os
+import fcntl
+import sqlite3
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Number of worker processes sharing the database (uvicorn/gunicorn convention)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Seconds between attempts of a follower to take over leadership
+LEADER_RETRY_SECONDS = int(os.getenv("LEADER_RETRY_SECONDS", "30"))
+
+
+@asynccontextmanager
+async def file_lock(path: str):
+    """Hold an exclusive lock on ``path``, waiting for other processes to release it"""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        await asyncio.to_thread(fcntl.flock, fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+class LeaderLock:
+    """Process-lifetime lock that makes exactly one worker the leader.
+
+    The leader runs the jobs that must happen once per deployment (seeding,
+    rollover, schedules). The lock is released by the OS when the process
+    exits, so a follower can take over.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        """Try to become the leader without waiting"""
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    async def wait_for_leadership(self, on_elected: Callable[[], Awaitable[None]],
+                                  interval: int = LEADER_RETRY_SECONDS):
+        """Retry until this worker becomes the leader, then run ``on_elected``"""
+        while not self.try_acquire():
+            await asyncio.sleep(interval)
+        logger.info(f"Worker {os.getpid()} took over leadership")
+        await on_elected()
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class ChangeMonitor:
+    """Detect writes by other processes.
+
+    Every write transaction of a worker's engine bumps that worker's row in
+    ``worker_changes`` before committing. ``PRAGMA data_version`` on a
+    dedicated connection is the cheap first check: it changes whenever any
+    other connection commits, including this worker's own pool connections,
+    and on WAL checkpoints. Only then are the other workers' counters read,
+    and the registered invalidators are called if one of them moved, so
+    writes this worker already applied to its caches do not drop them.
+    Writers outside the workers (scripts, the sqlite3 shell) are not seen.
+    """
+
+    def __init__(self):
+        self._connection: Optional[sqlite3.Connection] = None
+        self._version: Optional[int] = None
+        self._counters: Dict[int, int] = {}
+        self._pid: Optional[int] = None
+        self._engine: Optional[AsyncEngine] = None
+        self._invalidators: List[Callable[[], None]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self._connection is not None
+
+    def start(self, db_path: str, engine: AsyncEngine):
+        """Watch ``db_path`` for writes by other workers; ``engine`` is this worker's"""
+        self._pid = os.getpid()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS worker_changes (pid INTEGER PRIMARY KEY, counter INTEGER NOT NULL)"
+            )
+        self._version = self._read_version()
+        self._counters = self._read_counters()
+        self._engine = engine
+        event.listen(engine.sync_engine, "commit", self._count_local_commit)
+
+    def _count_local_commit(self, conn):
+        # total_changes() counts the rows written since the connection was opened
+        if conn.exec_driver_sql("SELECT total_changes()").scalar():
+            conn.exec_driver_sql(
+                "INSERT INTO worker_changes (pid, counter) VALUES (?, 1) "
+                "ON CONFLICT (pid) DO UPDATE SET counter = counter + 1",
+                (self._pid,)
+            )
+
+    def _read_counters(self) -> Dict[int, int]:
+        return dict(self._connection.execute(
+            "SELECT pid, counter FROM worker_changes WHERE pid != ?", (self._pid,)
+        ).fetchall())
+
+    def register(self, invalidator: Callable[[], None]):
+        """Register a callback that drops an in-process cache"""
+        self._invalidators.append(invalidator)
+
+    def unregister(self, invalidator: Callable[[], None]):
+        if invalidator in self._invalidators:
+            self._invalidators.remove(invalidator)
+
+    def _read_version(self) -> int:
+        return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def check(self) -> bool:
+        """Invalidate caches if the database changed since the last check"""
+        if self._connection is None:
+            return False
+        version = self._read_version()
+        if version == self._version:
+            return False
+        self._version = version
+        counters = self._read_counters()
+        if counters == self._counters:
+            return False
+        self._counters = counters
+        for invalidate in self._invalidators:
+            invalidate()
+        return True
+
+    def stop(self):
+        if self._engine is not None:
+            event.remove(self._engine.sync_engine, "commit", self._count_local_commit)
+            self._engine = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+# Global change monitor, started by main.py when several workers share the database
+change_monitor = ChangeMonitor()
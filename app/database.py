@@ -4,30 +4,84 @@ SQLAlchemy async database setup with SQLite
 """
 
 import os
+import time
 import logging
+from typing import Optional
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.models import Base, Category
+from app.slow_query import install_slow_query_log
+from app.statement_cache import install_statement_cache_stats, SQL_STATEMENT_CACHE_SIZE
+from app.single_flight import install_single_flight_invalidation
 
 logger = logging.getLogger(__name__)
 
+# Seconds a connection waits for another writer (other workers share the file)
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "5"))
+# Log every SQL statement (for debugging; see app/slow_query.py for production)
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() in ("1", "true", "yes")
+
 class Database:
     def __init__(self):
         self.engine = None
         self.SessionLocal = None
+        self.archive_schema = "main"
+        self.db_path = None
+        self.archive_path = None
+        # Connections currently in use and when one was last taken or returned
+        self.connections_in_use = 0
+        self.last_activity = time.monotonic()
     
-    async def initialize(self, db_path: str):
+    async def initialize(self, db_path: str, archive_path: Optional[str] = None,
+                         seed_defaults: bool = True):
         """Initialize database connection and create tables"""
+        self.db_path = db_path
+        self.archive_path = archive_path
+        
         # Create database URL
         database_url = f"sqlite+aiosqlite:///{db_path}"
         
         # Create async engine
         self.engine = create_async_engine(
             database_url,
-            echo=False,  # Set to True for SQL debugging
-            connect_args={"check_same_thread": False}
+            echo=SQL_ECHO,
+            query_cache_size=SQL_STATEMENT_CACHE_SIZE,
+            connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT}
         )
         
+        if archive_path:
+            self.archive_schema = "archive"
+        
+        @event.listens_for(self.engine.sync_engine, "connect")
+        def _configure_connection(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            # Lets maintenance return free pages to the OS; only takes effect on
+            # new (empty) database files (see app/maintenance.py)
+            cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            # WAL lets readers in other workers proceed while one worker writes
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            # Keep archived data in a separate file, attached to every connection
+            if archive_path:
+                cursor.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+                cursor.execute("PRAGMA archive.auto_vacuum=INCREMENTAL")
+            cursor.close()
+        
+        @event.listens_for(self.engine.sync_engine, "checkout")
+        def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.connections_in_use += 1
+            self.last_activity = time.monotonic()
+        
+        @event.listens_for(self.engine.sync_engine, "checkin")
+        def _on_checkin(dbapi_connection, connection_record):
+            self.connections_in_use -= 1
+            self.last_activity = time.monotonic()
+        
+        install_slow_query_log(self.engine)
+        install_statement_cache_stats(self.engine)
+        install_single_flight_invalidation(self.engine)
+        
         # Create session factory
         self.SessionLocal = sessionmaker(
             autocommit=False,
@@ -39,20 +93,36 @@ class Database:
         # Create tables
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            # create_all skips existing tables, so add indexes introduced later
+            await conn.run_sync(self._create_missing_indexes)
         
         # Insert default categories
-        await self._insert_default_categories()
+        if seed_defaults:
+            await self._insert_default_categories()
         
         logger.info(f"Database initialized: {db_path}")
     
+    @staticmethod
+    def _create_missing_indexes(connection):
+        """Create indexes that are missing on already existing tables"""
+        # Read the names directly; the inspector does not report expression indexes
+        existing = {
+            row[0] for row in connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(connection)
+    
     async def _insert_default_categories(self):
         """Insert default categories if they don't exist"""
+        # Sort orders leave room for moves in between (see app/ordering.py)
         default_categories = [
-            {"id": 1, "name": "Personal", "color": "#6b46c1", "sort_order": 1},
-            {"id": 2, "name": "Grocery List", "color": "#059669", "sort_order": 2},
-            {"id": 3, "name": "Restaurants", "color": "#dc2626", "sort_order": 3},
-            {"id": 4, "name": "Books to Read", "color": "#7c2d12", "sort_order": 4},
-            {"id": 5, "name": "Things to Buy", "color": "#1d4ed8", "sort_order": 5},
+            {"id": 1, "name": "Personal", "color": "#6b46c1", "sort_order": 1024},
+            {"id": 2, "name": "Grocery List", "color": "#059669", "sort_order": 2048},
+            {"id": 3, "name": "Restaurants", "color": "#dc2626", "sort_order": 3072},
+            {"id": 4, "name": "Books to Read", "color": "#7c2d12", "sort_order": 4096},
+            {"id": 5, "name": "Things to Buy", "color": "#1d4ed8", "sort_order": 5120},
         ]
         
         async with self.SessionLocal() as session:
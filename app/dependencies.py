@@ -3,21 +3,61 @@ FastAPI TeuxDeux Clone - Dependency Injection
 Provides database session dependency for FastAPI routes
 """
 
-from typing import AsyncGenerator
+import os
+import hmac
+from typing import AsyncGenerator, Optional
+from fastapi import Depends, Header, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database import Database
+from app.tenancy import resolve_tenant_id
+
+# The admin API is disabled unless a token is configured
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
 # Global database instance (will be set by main.py)
 _database = None
+# Per-tenant database pool (only set in multi-tenant mode)
+_tenant_pool = None
 
 def set_database(db):
     """Set the global database instance"""
     global _database
     _database = db
 
-async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
-    """Get database session dependency"""
+def set_tenant_pool(pool):
+    """Set the per-tenant database pool"""
+    global _tenant_pool
+    _tenant_pool = pool
+
+def get_database():
+    """Get the global database instance"""
     if not _database:
         raise RuntimeError("Database not initialized")
-    
-    async with _database.SessionLocal() as session:
-        yield session
\ No newline at end of file
+    return _database
+
+async def get_request_database(request: Request) -> Database:
+    """Get the database of the current request (the tenant's database in multi-tenant mode)"""
+    if _tenant_pool is None:
+        return get_database()
+    return await _tenant_pool.get(resolve_tenant_id(request))
+
+async def get_db_session(
+    database: Database = Depends(get_request_database)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Get database session dependency"""
+    async with database.SessionLocal() as session:
+        yield session
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Check a token against ADMIN_TOKEN in constant time"""
+    if not ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Reject requests without a valid X-Admin-Token header"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API disabled")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
@@ -4,18 +4,34 @@ Port of the Go TeuxDeux clone to FastAPI with equivalent functionality
 """
 
 import os
+import asyncio
 import logging
 from datetime import datetime
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.database import Database
-from app.routers import todos, categories, dashboard
+from app.routers import todos, categories, dashboard, calendar, stats, archive, admin
 from app.migration import run_initial_migration
-from app.dependencies import set_database
+from app.archive import (
+    ensure_archive_tables, archive_old_data, run_archive_schedule, ARCHIVE_INTERVAL_SECONDS
+)
+from app.statistics import ensure_statistics_tables
+from app.backup import run_backup_schedule, backup_stats, BACKUP_INTERVAL_SECONDS
+from app.maintenance import run_maintenance_schedule, maintenance_stats, MAINTENANCE_INTERVAL_SECONDS
+from app.dependencies import set_database, set_tenant_pool, ADMIN_TOKEN
+from app.coordination import LeaderLock, file_lock, change_monitor, WEB_CONCURRENCY
+from app.static_files import PrecompressedStaticFiles, IndexPage
+from app.compression import CompressionMiddleware, compression_stats
+from app.statement_cache import statement_cache_stats
+from app.single_flight import read_flights
+from app.admission import AdmissionMiddleware, admission, ADMISSION_CONTROL
+from app.read_model import read_model, READ_MODEL
+from app.profiling import ProfilingMiddleware
+from app.slow_query import RouteContextMiddleware
+from app.tenancy import MULTI_TENANT, TenantDatabasePool, TenantPathMiddleware
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +39,21 @@ logger = logging.getLogger(__name__)
 
 # Database instance
 db = Database()
+# Per-tenant databases (multi-tenant mode only)
+tenant_pool = TenantDatabasePool() if MULTI_TENANT else None
+
+
+async def run_leader_jobs(background_tasks: list):
+    """Run the startup jobs and schedules that must only run in one worker"""
+    await run_initial_migration(db)
+    await archive_old_data(db)
+    # In multi-tenant mode the schedules also go through every tenant database
+    if ARCHIVE_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_archive_schedule(db, tenants=tenant_pool)))
+    if BACKUP_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_backup_schedule(db, tenants=tenant_pool)))
+    if MAINTENANCE_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_maintenance_schedule(db, tenants=tenant_pool)))
 
 
 @asynccontextmanager
@@ -30,20 +61,63 @@ async def lifespan(app: FastAPI):
     """Handle application startup and shutdown"""
     # Startup
     db_path = os.getenv("DB_PATH", "./teuxdeux.db")
-    await db.initialize(db_path)
+    archive_path = os.getenv("ARCHIVE_DB_PATH")  # Optional separate archive file
+    leader = LeaderLock(f"{db_path}.leader.lock")
+    is_leader = leader.try_acquire()
+
+    # Workers create the schema one after another; only the leader seeds it
+    async with file_lock(f"{db_path}.init.lock"):
+        await db.initialize(db_path, archive_path=archive_path, seed_defaults=is_leader)
+        await ensure_archive_tables(db)
+        await ensure_statistics_tables(db)
     set_database(db)  # Set the global database instance
-    await run_initial_migration(db)
+
+    # Read index.html and compress static assets once instead of per request
+    index_page.load()
+    for mount in static_mounts:
+        await asyncio.to_thread(mount.precompress)
+
+    background_tasks = []
+    if is_leader:
+        await run_leader_jobs(background_tasks)
+    else:
+        logger.info(f"Worker {os.getpid()} is a follower, skipping startup jobs")
+        background_tasks.append(asyncio.create_task(
+            leader.wait_for_leadership(lambda: run_leader_jobs(background_tasks))
+        ))
+    if WEB_CONCURRENCY > 1:
+        change_monitor.start(db_path, db.engine)
+    if tenant_pool:
+        set_tenant_pool(tenant_pool)
+        background_tasks.append(asyncio.create_task(tenant_pool.run_idle_sweeper()))
+    elif READ_MODEL:
+        # Hold the planning window in memory (after the startup migration)
+        read_model.enable()
+        await read_model.hydrate(db)
     yield
     # Shutdown
+    for task in background_tasks:
+        task.cancel()
+    if tenant_pool:
+        await tenant_pool.close()
+    read_model.disable()
+    change_monitor.stop()
+    leader.release()
     await db.close()
 
 app = FastAPI(
     title="TeuxDeux Clone",
     description="A FastAPI port of the TeuxDeux todo application",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Bound in-flight API requests per client and in total (inside CORS, so
+# rejections still carry the CORS headers)
+if ADMISSION_CONTROL:
+    app.add_middleware(AdmissionMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -53,34 +127,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large API responses (static files are precompressed separately)
+app.add_middleware(CompressionMiddleware, exclude_paths=["/static", "/assets"])
+
+# Tag SQL statements with the route that issued them (slow query log)
+app.add_middleware(RouteContextMiddleware)
+
+# Per-request profiling for admins (not installed at all without a token)
+if ADMIN_TOKEN:
+    app.add_middleware(ProfilingMiddleware)
+
+# Resolve /t/{tenant}/... paths in multi-tenant mode
+if MULTI_TENANT:
+    app.add_middleware(TenantPathMiddleware)
+
 # Mount static files
 static_paths = ["./static", "/app/static"]
+static_mounts = []
 for path in static_paths:
     if os.path.exists(path):
-        app.mount("/static", StaticFiles(directory=path), name="static")
-        app.mount("/assets", StaticFiles(directory=os.path.join(path, "dist/assets")), name="assets")
+        static_mounts = [
+            PrecompressedStaticFiles(directory=path),
+            # Bundles in dist/assets are content-hashed, so clients may cache them forever
+            PrecompressedStaticFiles(directory=os.path.join(path, "dist/assets"), immutable=True),
+        ]
+        app.mount("/static", static_mounts[0], name="static")
+        app.mount("/assets", static_mounts[1], name="assets")
         break
 
+# index.html is resolved and read once at startup
+index_page = IndexPage([
+    "./static/dist/index.html",
+    "/app/static/dist/index.html",
+    "./go-app/static/dist/index.html"
+])
+
 # Include routers
 app.include_router(dashboard.router, prefix="/api/v1", tags=["dashboard"])
 app.include_router(todos.router, prefix="/api/v1", tags=["todos"])
 app.include_router(categories.router, prefix="/api/v1", tags=["categories"])
+app.include_router(calendar.router, prefix="/api/v1", tags=["calendar"])
+app.include_router(stats.router, prefix="/api/v1", tags=["stats"])
+app.include_router(archive.router, prefix="/api/v1", tags=["archive"])
+app.include_router(admin.router, prefix="/api/v1", tags=["admin"])
 
 @app.get("/", response_class=HTMLResponse)
-async def serve_index():
+@app.head("/", response_class=HTMLResponse)
+async def serve_index(request: Request):
     """Serve the main application HTML"""
-    index_paths = [
-        "./static/dist/index.html",
-        "/app/static/dist/index.html",
-        "./go-app/static/dist/index.html"
-    ]
-    
-    for index_path in index_paths:
-        if os.path.exists(index_path):
-            logger.info(f"Serving index.html from: {index_path}")
-            return FileResponse(index_path)
-    
-    raise HTTPException(status_code=404, detail="index.html not found")
+    response = index_page.response(request.scope)
+    if response is None:
+        raise HTTPException(status_code=404, detail="index.html not found")
+    return response
 
 @app.get("/api/v1/health")
 @app.head("/api/v1/health")
@@ -88,7 +186,14 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "timestamp": datetime.now()
+        "timestamp": datetime.now(),
+        "compression": compression_stats.as_dict(),
+        "backup": backup_stats.as_dict(),
+        "maintenance": maintenance_stats.as_dict(),
+        "admission": admission.as_dict() if ADMISSION_CONTROL else None,
+        "read_model": read_model.as_dict() if read_model.enabled else None,
+        "statement_cache": statement_cache_stats.as_dict(),
+        "single_flight": read_flights.as_dict()
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,185 @@
+"""
+FastAPI TeuxDeux Clone - Database Maintenance
+Planner statistics, free page reclamation and WAL checkpoints in quiet moments
+"""
+
+import os
+import time
+import sqlite3
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+from app.database import Database
+
+logger = logging.getLogger(__name__)
+
+# Seconds between maintenance runs (0 = only on request)
+MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "3600"))
+# A run waits until this worker has not used the database for this long
+MAINTENANCE_QUIET_MS = int(os.getenv("MAINTENANCE_QUIET_MS", "2000"))
+# Total time a run may take; remaining steps are left for the next run
+MAINTENANCE_BUDGET_MS = int(os.getenv("MAINTENANCE_BUDGET_MS", "1000"))
+# Rows sampled per index by ANALYZE (PRAGMA analysis_limit)
+MAINTENANCE_ANALYSIS_LIMIT = int(os.getenv("MAINTENANCE_ANALYSIS_LIMIT", "400"))
+# Free pages released per incremental vacuum transaction
+MAINTENANCE_VACUUM_PAGES = int(os.getenv("MAINTENANCE_VACUUM_PAGES", "256"))
+# WAL size above which the checkpoint also truncates the -wal file
+MAINTENANCE_WAL_TRUNCATE_BYTES = int(os.getenv("MAINTENANCE_WAL_TRUNCATE_BYTES", str(64 * 1024 * 1024)))
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class MaintenanceStats:
+    """Report of the most recent maintenance run of this process"""
+
+    def __init__(self):
+        self.last: Optional[dict] = None
+        self.count = 0
+        self.failures = 0
+
+    def as_dict(self) -> dict:
+        return {"runs": self.count, "failures": self.failures, "last": self.last}
+
+
+maintenance_stats = MaintenanceStats()
+
+
+def _connect(db: Database, timeout: float) -> sqlite3.Connection:
+    """Autocommit connection, so every step is its own short transaction"""
+    connection = sqlite3.connect(db.db_path, timeout=timeout, isolation_level=None)
+    if db.archive_path:
+        connection.execute("ATTACH DATABASE ? AS archive", (db.archive_path,))
+    return connection
+
+
+def _tables_without_statistics(connection: sqlite3.Connection) -> List[str]:
+    """Tables of the main database that have no sqlite_stat1 rows yet"""
+    tables = [row[0] for row in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )]
+    has_stat1 = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchone()
+    if not has_stat1:
+        return tables
+    analyzed = {row[0] for row in connection.execute("SELECT DISTINCT tbl FROM sqlite_stat1")}
+    return [table for table in tables if table not in analyzed]
+
+
+def _maintain(db: Database) -> List[dict]:
+    """Run the maintenance steps within MAINTENANCE_BUDGET_MS (runs in a worker thread)"""
+    started = time.perf_counter()
+    deadline = started + MAINTENANCE_BUDGET_MS / 1000
+    steps = []
+
+    def step(name: str, step_started: float, **detail):
+        steps.append({"step": name, "duration_ms": round((time.perf_counter() - step_started) * 1000, 1), **detail})
+
+    # Never wait for another writer longer than the whole budget
+    connection = _connect(db, timeout=MAINTENANCE_BUDGET_MS / 1000)
+    try:
+        schemas = ["main"] + (["archive"] if db.archive_path else [])
+
+        # Planner statistics: tables never analyzed get ANALYZE, the others are
+        # left to PRAGMA optimize, which re-analyzes tables that changed a lot;
+        # analysis_limit bounds the rows sampled per index
+        step_started = time.perf_counter()
+        connection.execute(f"PRAGMA analysis_limit={MAINTENANCE_ANALYSIS_LIMIT}")
+        analyzed = _tables_without_statistics(connection)
+        for table in analyzed:
+            connection.execute(f'ANALYZE "{table}"')
+        connection.execute("PRAGMA optimize=0x10002")
+        step("optimize", step_started, analyzed=analyzed)
+
+        # Free pages left behind by deletes (only databases created with incremental auto_vacuum)
+        for schema in schemas:
+            if time.perf_counter() >= deadline:
+                break
+            step_started = time.perf_counter()
+            if connection.execute(f"PRAGMA {schema}.auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+                step("incremental_vacuum", step_started, schema=schema, skipped="auto_vacuum is not incremental")
+                continue
+            free_before = connection.execute(f"PRAGMA {schema}.freelist_count").fetchone()[0]
+            free = free_before
+            while free and time.perf_counter() < deadline:
+                connection.execute(f"PRAGMA {schema}.incremental_vacuum({MAINTENANCE_VACUUM_PAGES})").fetchall()
+                free = connection.execute(f"PRAGMA {schema}.freelist_count").fetchone()[0]
+            step("incremental_vacuum", step_started, schema=schema, pages_freed=free_before - free, pages_left=free)
+
+        # Move WAL content into the database; truncate a -wal file that has grown large
+        if time.perf_counter() < deadline:
+            step_started = time.perf_counter()
+            wal_path = f"{db.db_path}-wal"
+            wal_bytes = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+            mode = "TRUNCATE" if wal_bytes > MAINTENANCE_WAL_TRUNCATE_BYTES else "PASSIVE"
+            busy, log_frames, checkpointed = connection.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+            step(
+                "wal_checkpoint", step_started, mode=mode, wal_bytes=wal_bytes,
+                busy=bool(busy), wal_frames=log_frames, checkpointed_frames=checkpointed
+            )
+    finally:
+        connection.close()
+    return steps
+
+
+async def run_maintenance(db: Database) -> dict:
+    """Run one time-boxed maintenance pass over the database and report what was done"""
+    started = time.perf_counter()
+    try:
+        steps = await asyncio.to_thread(_maintain, db)
+    except Exception:
+        maintenance_stats.failures += 1
+        raise
+
+    result = {
+        "steps": steps,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "finished_at": datetime.now(),
+    }
+    maintenance_stats.count += 1
+    maintenance_stats.last = result
+    logger.info(
+        f"Database maintenance took {result['duration_ms']} ms: "
+        + ", ".join(f"{s['step']} {s['duration_ms']} ms" for s in steps)
+    )
+    return result
+
+
+async def wait_until_quiet(db: Database, max_wait: float, quiet_ms: int = MAINTENANCE_QUIET_MS,
+                           poll_ms: int = 100) -> bool:
+    """Wait until this worker has not used the database for ``quiet_ms``.
+
+    Returns False if that did not happen within ``max_wait`` seconds.
+    """
+    give_up = time.monotonic() + max_wait
+    while db.connections_in_use or (time.monotonic() - db.last_activity) * 1000 < quiet_ms:
+        if time.monotonic() >= give_up:
+            return False
+        await asyncio.sleep(poll_ms / 1000)
+    return True
+
+
+async def run_maintenance_schedule(db: Database, interval: int = MAINTENANCE_INTERVAL_SECONDS,
+                                   tenants=None):
+    """Periodically maintain the database in quiet moments until cancelled.
+
+    Given a TenantDatabasePool, every tenant database is maintained after
+    the main one, each waiting a short while for a quiet moment of its own.
+    """
+
+    async def maintain_tenant(tenant_db: Database):
+        await wait_until_quiet(tenant_db, max_wait=MAINTENANCE_QUIET_MS / 1000 * 2)
+        await run_maintenance(tenant_db)
+
+    while True:
+        await asyncio.sleep(interval)
+        # Under constant load the run still happens, its steps are time-boxed anyway
+        if not await wait_until_quiet(db, max_wait=interval):
+            logger.info("No quiet moment for database maintenance, running anyway")
+        try:
+            await run_maintenance(db)
+        except Exception:
+            logger.exception("Scheduled database maintenance failed")
+        if tenants:
+            await tenants.run_for_each_tenant(maintain_tenant, "Scheduled database maintenance")
@@ -10,39 +10,44 @@ from app.database import Database
 
 logger = logging.getLogger(__name__)
 
+# Incomplete todos scheduled before :today
+RECORD_MIGRATIONS = text("""
+    INSERT INTO todo_migrations (todo_id, from_date, to_date, migrated_at)
+    SELECT id, scheduled_date, :today, CURRENT_TIMESTAMP FROM todos
+    WHERE completed = false 
+    AND scheduled_date IS NOT NULL 
+    AND scheduled_date < :today
+""")
+MIGRATE_TODOS = text("""
+    UPDATE todos 
+    SET scheduled_date = :today, updated_at = CURRENT_TIMESTAMP
+    WHERE completed = false 
+    AND scheduled_date IS NOT NULL 
+    AND scheduled_date < :today
+""")
+
+async def migrate_past_todos(session, today: str) -> int:
+    """Move incomplete todos from past dates to ``today`` and record the history.
+
+    Two set-based statements regardless of the number of todos; the caller
+    commits. Returns the number of migrated todos.
+    """
+    # Record the migration history
+    await session.execute(RECORD_MIGRATIONS, {"today": today})
+    
+    # Migrate them
+    result = await session.execute(MIGRATE_TODOS, {"today": today})
+    return result.rowcount
+
 async def run_initial_migration(db: Database):
     """Run initial migration to move past incomplete todos to today"""
     today = datetime.now().strftime("%Y-%m-%d")
     
     async with db.SessionLocal() as session:
-        # Check for incomplete todos from past dates
-        result = await session.execute(
-            text("""
-                SELECT COUNT(*) as count FROM todos 
-                WHERE completed = false 
-                AND scheduled_date IS NOT NULL 
-                AND scheduled_date < :today
-            """),
-            {"today": today}
-        )
-        count = result.scalar()
+        count = await migrate_past_todos(session, today)
+        await session.commit()
         
         if count > 0:
-            logger.info(f"Found {count} incomplete todos from past dates, migrating to today...")
-            
-            # Migrate them
-            await session.execute(
-                text("""
-                    UPDATE todos 
-                    SET scheduled_date = :today 
-                    WHERE completed = false 
-                    AND scheduled_date IS NOT NULL 
-                    AND scheduled_date < :today
-                """),
-                {"today": today}
-            )
-            
-            await session.commit()
             logger.info(f"Successfully migrated {count} todos to today")
         else:
-            logger.info("No past todos to migrate")
\ No newline at end of file
+            logger.info("No past todos to migrate")
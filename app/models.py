@@ -4,9 +4,9 @@ Pydantic models for request/response validation and SQLAlchemy ORM models
 """
 
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Generic, Optional, List, TypeVar
 from pydantic import BaseModel
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index, literal_column
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -55,11 +55,24 @@ class TodoMigration(Base):
 
 # Create indexes
 Index('idx_todos_scheduled_date', Todo.scheduled_date)
+# Covers the calendar overview aggregation without touching the table
+Index('idx_todos_scheduled_completed_category', Todo.scheduled_date, Todo.completed, Todo.category_id)
 Index('idx_todos_category_id', Todo.category_id)
+Index('idx_todos_parent_id', Todo.parent_id)
 Index('idx_todos_completed', Todo.completed)
 Index('idx_todos_created_at', Todo.created_at)
 Index('idx_categories_sort_order', Category.sort_order)
 
+# Sort key of GET /todos pages: someday todos first, then by date and position.
+# Queries must use these exact expressions (with literals, not parameters) for
+# SQLite to match the expression index.
+TODO_KEYSET = (
+    func.coalesce(Todo.scheduled_date, literal_column("''")),
+    func.coalesce(Todo.sort_order, literal_column("0")),
+    Todo.id,
+)
+Index('idx_todos_keyset', *TODO_KEYSET)
+
 # Helper classes for Go-style nullable fields
 class NullableInt64(BaseModel):
     Int64: int
@@ -95,10 +108,14 @@ class TodoResponse(BaseModel):
     parent_id: Optional[NullableInt64] = None
     created_at: datetime
     updated_at: datetime
+    children: List["TodoResponse"] = []
 
     class Config:
         from_attributes = True
 
+class ArchivedTodoResponse(TodoResponse):
+    archived_at: datetime
+
 class WeeklyTodos(BaseModel):
     date: str
     day: str
@@ -111,6 +128,65 @@ class DashboardData(BaseModel):
     today_date: str
     week_start_date: str
 
+class TodosData(BaseModel):
+    todos: List[TodoResponse]
+    count: int
+    next_cursor: Optional[str] = None  # None on the last page
+
+class BulkTodosData(BaseModel):
+    created: List[int]  # Ids of the created todos, in request order
+    updated: int
+    deleted: List[int]  # Ids of the deleted todos, subtasks included
+
+class SparseWeeklyTodos(BaseModel):
+    date: str
+    day: str
+    todos: List[Dict[str, Any]]
+
+class SparseDashboardData(BaseModel):
+    """Dashboard limited to the requested sections and todo fields"""
+    weekly_todos: Optional[List[SparseWeeklyTodos]] = None
+    someday_todos: Optional[List[Dict[str, Any]]] = None
+    categories: Optional[List[CategoryResponse]] = None
+    today_date: str
+    week_start_date: str
+
+class CategoriesData(BaseModel):
+    categories: List[CategoryResponse]
+
+class CalendarCategoryCount(BaseModel):
+    category_id: Optional[int] = None
+    open: int
+    completed: int
+
+class CalendarDay(BaseModel):
+    date: str
+    open: int
+    completed: int
+    categories: Optional[List[CalendarCategoryCount]] = None
+
+class CalendarData(BaseModel):
+    from_date: str
+    to_date: str
+    days: List[CalendarDay]
+
+class CategoryStats(BaseModel):
+    category_id: Optional[int] = None
+    total: int
+    completed: int
+    completion_rate: Optional[float] = None
+    avg_days_to_complete: Optional[float] = None
+    rolled_forward: int
+
+class WeeklyStats(BaseModel):
+    week_start: str
+    categories: List[CategoryStats]
+
+class StatsData(BaseModel):
+    from_week: str
+    weeks: List[WeeklyStats]
+    totals: List[CategoryStats]
+
 # Pydantic Request Models
 class CreateTodoRequest(BaseModel):
     title: str
@@ -118,6 +194,7 @@ class CreateTodoRequest(BaseModel):
     scheduled_date: Optional[str] = None
     color: Optional[str] = None
     recurring_pattern: Optional[str] = None
+    parent_id: Optional[int] = None  # Create as a subtask of this todo
 
 class UpdateTodoRequest(BaseModel):
     title: Optional[str] = None
@@ -127,6 +204,19 @@ class UpdateTodoRequest(BaseModel):
     sort_order: Optional[int] = None
     color: Optional[str] = None
 
+class BulkUpdateTodoRequest(UpdateTodoRequest):
+    id: int
+
+class BulkTodosRequest(BaseModel):
+    """Creates, updates and deletes applied in one transaction, in that order"""
+    create: List[CreateTodoRequest] = []
+    update: List[BulkUpdateTodoRequest] = []
+    delete: List[int] = []  # Subtasks are deleted with their todo
+
+class MoveRequest(BaseModel):
+    after_id: Optional[int] = None   # Place right after this item
+    before_id: Optional[int] = None  # Place right before this item
+
 class CreateCategoryRequest(BaseModel):
     name: str
     color: Optional[str] = None
@@ -140,4 +230,13 @@ class APIResponse(BaseModel):
     success: bool
     message: Optional[str] = None
     data: Optional[dict] = None
-    error: Optional[str] = None
\ No newline at end of file
+    error: Optional[str] = None
+
+DataT = TypeVar("DataT")
+
+class DataResponse(BaseModel, Generic[DataT]):
+    """APIResponse with a typed data payload (see app/responses.py)"""
+    success: bool
+    message: Optional[str] = None
+    data: Optional[DataT] = None
+    error: Optional[str] = None
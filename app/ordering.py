@@ -0,0 +1,150 @@
+"""
+FastAPI TeuxDeux Clone - Sort Ordering
+Sparse integer sort orders, so moving an item only rewrites that item
+"""
+
+import os
+import logging
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import select, update, func, tuple_, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from app.database import Database
+from app.models import Todo, Category, MoveRequest
+
+logger = logging.getLogger(__name__)
+
+# Distance between neighbouring sort orders after a list is renumbered
+SORT_GAP = int(os.getenv("SORT_GAP", "1024"))
+# A list is renumbered in the background once a move leaves less room than this
+SORT_MIN_GAP = 16
+
+# Display order of each list, sort_order first
+TODO_ORDER = [Todo.sort_order, Todo.created_at, Todo.id]
+CATEGORY_ORDER = [Category.sort_order, Category.name]
+
+def todo_list_conditions(scheduled_date: Optional[str], category_id: Optional[int],
+                         parent_id: Optional[int] = None) -> list:
+    """Conditions selecting one list: the subtasks of a todo, a day, or a someday list"""
+    if parent_id is not None:
+        return [Todo.parent_id == parent_id]
+    if scheduled_date:
+        return [Todo.parent_id.is_(None), Todo.scheduled_date == scheduled_date]
+    if category_id is None:
+        return [Todo.parent_id.is_(None), Todo.scheduled_date.is_(None), Todo.category_id.is_(None)]
+    return [Todo.parent_id.is_(None), Todo.scheduled_date.is_(None), Todo.category_id == category_id]
+
+def todo_list_kind(scheduled_date: Optional[str], category_id: Optional[int],
+                   parent_id: Optional[int] = None) -> str:
+    """Which of the lists of todo_list_conditions a todo belongs to"""
+    if parent_id is not None:
+        return "subtasks"
+    if scheduled_date:
+        return "day"
+    if category_id is None:
+        return "uncategorized"
+    return "someday"
+
+# todo_list_conditions of each kind of list, with the list key as bound parameters
+# (list_parent_id, list_date, list_category_id) for statements built once
+TODO_LIST_CONDITIONS = {
+    "subtasks": [Todo.parent_id == bindparam("list_parent_id")],
+    "day": [Todo.parent_id.is_(None), Todo.scheduled_date == bindparam("list_date")],
+    "uncategorized": [Todo.parent_id.is_(None), Todo.scheduled_date.is_(None), Todo.category_id.is_(None)],
+    "someday": [Todo.parent_id.is_(None), Todo.scheduled_date.is_(None), Todo.category_id == bindparam("list_category_id")],
+}
+
+def append_position(model, *conditions):
+    """Scalar subquery for a sort order behind the last item of a list"""
+    return (
+        select(func.coalesce(func.max(model.sort_order), 0) + SORT_GAP)
+        .where(*conditions)
+        .scalar_subquery()
+    )
+
+async def load_move_rows(db: AsyncSession, model, item_id: int, move: MoveRequest, name: str):
+    """Load the moved item and its requested neighbours in one query"""
+    if move.after_id is None and move.before_id is None:
+        raise HTTPException(status_code=400, detail="after_id or before_id is required")
+    if item_id in (move.after_id, move.before_id):
+        raise HTTPException(status_code=400, detail=f"A {name} cannot be moved next to itself")
+
+    ids = [i for i in (item_id, move.after_id, move.before_id) if i is not None]
+    result = await db.execute(select(model).where(model.id.in_(ids)))
+    rows = {row.id: row for row in result.scalars()}
+
+    if item_id not in rows:
+        raise HTTPException(status_code=404, detail=f"{name.capitalize()} not found")
+    for neighbor_id in (move.after_id, move.before_id):
+        if neighbor_id is not None and neighbor_id not in rows:
+            raise HTTPException(status_code=404, detail=f"Neighbor {name} {neighbor_id} not found")
+
+    return rows[item_id], rows.get(move.after_id), rows.get(move.before_id)
+
+async def _adjacent_position(db: AsyncSession, model, order_key: list, conditions: list,
+                             item_id: int, pivot, previous: bool) -> Optional[int]:
+    """Sort order of the item right before (or after) ``pivot``, ignoring ``item_id``"""
+    # Compare against the stored pivot row, not its Python values
+    pivot_row = aliased(model)
+    key = tuple_(*order_key)
+    pivot_key = tuple_(*[getattr(pivot_row, column.key) for column in order_key])
+    query = select(model.sort_order).join(pivot_row, pivot_row.id == pivot.id).where(
+        model.id.notin_([item_id, pivot.id]), *conditions
+    )
+    if previous:
+        query = query.where(key < pivot_key).order_by(*[column.desc() for column in order_key])
+    else:
+        query = query.where(key > pivot_key).order_by(*order_key)
+    return await db.scalar(query.limit(1))
+
+async def find_position(db: AsyncSession, model, order_key: list, conditions: list,
+                        item_id: int, after=None, before=None) -> Tuple[Optional[int], bool]:
+    """Pick a free sort order between two neighbours.
+
+    ``after`` and ``before`` are the rows the item should follow and precede;
+    one of them may be None. Returns the position (None when the neighbours
+    have no free value between them) and whether the list is getting crowded.
+    """
+    if after is not None:
+        low = after.sort_order or 0
+    else:
+        low = await _adjacent_position(db, model, order_key, conditions, item_id, before, previous=True)
+    if before is not None:
+        high = before.sort_order or 0
+    else:
+        high = await _adjacent_position(db, model, order_key, conditions, item_id, after, previous=False)
+
+    if low is None:
+        low = high - 2 * SORT_GAP
+    if high is None:
+        high = low + 2 * SORT_GAP
+
+    if high - low < 2:
+        return None, True
+    return (low + high) // 2, high - low < 2 * SORT_MIN_GAP
+
+async def respace(db: AsyncSession, model, order_key: list, conditions: list):
+    """Renumber one list to multiples of SORT_GAP, keeping its order (one UPDATE)"""
+    ranked = select(
+        model.id,
+        (func.row_number().over(order_by=order_key) * SORT_GAP).label("position")
+    ).where(*conditions).subquery()
+
+    await db.execute(
+        update(model)
+        .where(model.id == ranked.c.id)
+        # Renumbering is bookkeeping, not an edit of the items
+        .values(sort_order=ranked.c.position, updated_at=model.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+async def respace_in_background(database: Database, model, order_key: list, conditions: list):
+    """Renumber a crowded list after the response has been sent"""
+    try:
+        async with database.SessionLocal() as session:
+            await respace(session, model, order_key, conditions)
+            await session.commit()
+        logger.info(f"Renumbered {model.__tablename__} list")
+    except Exception:
+        logger.exception(f"Renumbering {model.__tablename__} list failed")
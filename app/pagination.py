@@ -0,0 +1,48 @@
+"""
+FastAPI TeuxDeux Clone - Keyset Pagination
+Opaque cursors that continue a listing right after the last row of a page
+"""
+
+import base64
+from typing import Sequence, Tuple
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, tuple_
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Cursor pointing after a row with the given sort key values"""
+    return base64.urlsafe_b64encode(orjson.dumps(list(values))).decode().rstrip("=")
+
+
+def _has_type(value, expected: type) -> bool:
+    # JSON true/false must not pass for an integer key
+    return isinstance(value, expected) and not (isinstance(value, bool) and expected is not bool)
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> Tuple:
+    """Sort key values of a cursor with the given types, 400 if it is malformed"""
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if (
+        not isinstance(values, list) or len(values) != len(types)
+        or not all(_has_type(value, expected) for value, expected in zip(values, types))
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(values)
+
+
+def after_cursor(keyset: Sequence, values: Sequence):
+    """Condition for rows after the cursor.
+
+    SQLite does not seek an index on a plain row value comparison, it scans
+    from the start; the extra bound on the first key lets it start the range
+    scan at the cursor.
+    """
+    first, rest = keyset[0], keyset[1:]
+    return and_(
+        first >= values[0],
+        or_(first > values[0], tuple_(*rest) > tuple_(*values[1:]))
+    )
@@ -0,0 +1,149 @@
+"""
+FastAPI TeuxDeux Clone - Per-Request Profiling
+Opt-in cProfile and tracemalloc capture for individual requests
+"""
+
+import os
+import io
+import re
+import pstats
+import cProfile
+import logging
+import tracemalloc
+from uuid import uuid4
+from datetime import datetime
+from typing import List, Optional
+from urllib.parse import parse_qs
+
+from app.dependencies import is_admin_token
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.getenv(
+    "PROFILE_DIR", "/app/logs/profiles" if os.path.isdir("/app/logs") else "./logs/profiles"
+)
+# Number of stored profiles kept on disk
+PROFILE_RETAIN = int(os.getenv("PROFILE_RETAIN", "50"))
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "__profile"
+ADMIN_HEADER = b"x-admin-token"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9a-f]{8}$")
+
+
+def profile_path(profile_id: str, extension: str) -> str:
+    return os.path.join(PROFILE_DIR, f"{profile_id}.{extension}")
+
+
+def list_profiles() -> List[str]:
+    """Ids of the stored profiles, newest first"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    ids = {name.rsplit(".", 1)[0] for name in os.listdir(PROFILE_DIR)}
+    return sorted((i for i in ids if PROFILE_ID_PATTERN.match(i)), reverse=True)
+
+
+def _prune_profiles():
+    for profile_id in list_profiles()[PROFILE_RETAIN:]:
+        for extension in ("prof", "txt"):
+            try:
+                os.remove(profile_path(profile_id, extension))
+            except FileNotFoundError:
+                pass
+
+
+class ProfilingMiddleware:
+    """Profile single requests that ask for it with an admin token.
+
+    A request is profiled when it carries ``X-Profile: cprofile`` or
+    ``X-Profile: tracemalloc`` (or ``?__profile=...``) together with a valid
+    ``X-Admin-Token``. The report is stored in PROFILE_DIR and its id is
+    returned in the ``X-Profile-Id`` response header. Everything else passes
+    straight through. cProfile sees the whole event loop thread, so other
+    requests running at the same time show up in the report as well.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._active = False
+
+    def _requested_mode(self, scope) -> Optional[str]:
+        mode = None
+        token = None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                mode = value.decode("latin-1").strip().lower()
+            elif name == ADMIN_HEADER:
+                token = value.decode("latin-1")
+        if mode is None and PROFILE_QUERY_PARAM.encode() in scope["query_string"]:
+            values = parse_qs(scope["query_string"].decode("latin-1")).get(PROFILE_QUERY_PARAM)
+            mode = values[0].lower() if values else None
+        if mode not in PROFILE_MODES or not is_admin_token(token):
+            return None
+        return mode
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        mode = self._requested_mode(scope)
+        if mode is None or self._active:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid4().hex[:8]}"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+            await send(message)
+
+        self._active = True
+        try:
+            if mode == "cprofile":
+                await self._run_cprofile(profile_id, scope, receive, send_wrapper)
+            else:
+                await self._run_tracemalloc(profile_id, scope, receive, send_wrapper)
+        finally:
+            self._active = False
+        _prune_profiles()
+
+    async def _run_cprofile(self, profile_id, scope, receive, send):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(profile_path(profile_id, "prof"))
+        report = io.StringIO()
+        report.write(f"{scope['method']} {scope['path']}\n\n")
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(40)
+        with open(profile_path(profile_id, "txt"), "w") as f:
+            f.write(report.getvalue())
+        logger.info(f"Stored cProfile report {profile_id} for {scope['method']} {scope['path']}")
+
+    async def _run_tracemalloc(self, profile_id, scope, receive, send):
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start(10)
+        before = tracemalloc.take_snapshot()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            after = tracemalloc.take_snapshot()
+            if not already_tracing:
+                tracemalloc.stop()
+
+        top_stats = after.compare_to(before, "lineno")[:25]
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(profile_path(profile_id, "txt"), "w") as f:
+            f.write(f"{scope['method']} {scope['path']}\n\nTop allocation sites:\n")
+            for stat in top_stats:
+                f.write(f"{stat}\n")
+        logger.info(f"Stored tracemalloc report {profile_id} for {scope['method']} {scope['path']}")
@@ -0,0 +1,318 @@
+"""
+FastAPI TeuxDeux Clone - In-Memory Read Model
+Todos of the active planning window held in process, indexed by date and category
+"""
+
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import select, or_, and_
+
+from app.database import Database
+from app.models import Todo, Category
+from app.coordination import change_monitor
+from app.subtasks import subtask_tree
+
+logger = logging.getLogger(__name__)
+
+# Serve the dashboard from an in-process copy of the planning window
+READ_MODEL = os.getenv("READ_MODEL", "false").lower() in ("1", "true", "yes")
+# Number of days from today held in memory (someday lists are always included)
+READ_MODEL_DAYS = int(os.getenv("READ_MODEL_DAYS", "28"))
+
+TODO_FIELDS = (
+    "id", "title", "completed", "category_id", "scheduled_date", "sort_order",
+    "color", "recurring_pattern", "parent_id", "created_at", "updated_at"
+)
+CATEGORY_FIELDS = ("id", "name", "color", "sort_order", "created_at", "updated_at")
+
+
+class CategoryRecord:
+    """Compact copy of a category row"""
+    __slots__ = CATEGORY_FIELDS
+
+    def __init__(self, row):
+        self.update(row)
+
+    def update(self, row):
+        for field in CATEGORY_FIELDS:
+            setattr(self, field, getattr(row, field))
+
+
+class TodoRecord:
+    """Compact copy of a todo row; ``category`` points to the shared category record"""
+    __slots__ = TODO_FIELDS + ("category",)
+
+    def __init__(self, row, category: Optional[CategoryRecord]):
+        self.update(row, category)
+
+    def update(self, row, category: Optional[CategoryRecord]):
+        for field in TODO_FIELDS:
+            setattr(self, field, getattr(row, field))
+        self.category = category
+
+
+def _null_first(value):
+    # SQLite sorts NULL before any value
+    return (value is not None, value)
+
+def _todo_order(todo: TodoRecord):
+    return (_null_first(todo.sort_order), _null_first(todo.created_at), todo.id)
+
+def _someday_order(todo: TodoRecord):
+    return (_null_first(todo.category_id),) + _todo_order(todo)
+
+def _category_order(category: CategoryRecord):
+    return (_null_first(category.sort_order), category.name)
+
+
+class SortedChildren:
+    """Read-only ``parent id -> subtasks in display order`` view for todo_response"""
+
+    def __init__(self, model: "ReadModel"):
+        self.model = model
+
+    def get(self, parent_id: int, default=()):
+        ids = self.model.children.get(parent_id)
+        if not ids:
+            return default
+        return sorted((self.model.todos[todo_id] for todo_id in ids), key=_todo_order)
+
+
+class ReadModel:
+    """Todos scheduled in [today, today + READ_MODEL_DAYS), all someday todos,
+    their subtasks and all categories.
+
+    Top-level todos are indexed by ``scheduled_date`` (or, for someday todos,
+    by ``category_id``) and subtasks by parent, so a dashboard week is a few
+    dict lookups and small sorts. The write routes apply their changes right
+    after committing; anything that rewrites many rows at once (migration,
+    renumbering, archival) or a write by another worker (seen through
+    ``change_monitor``) invalidates the whole model, and it is hydrated again
+    on the next read. Callers fall back to SQL whenever ``serves`` returns
+    False: the model is disabled or not loaded, or the dates are outside the
+    window.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.ready = False
+        self.window_start: Optional[str] = None
+        self.window_end: Optional[str] = None
+        self.todos: Dict[int, TodoRecord] = {}
+        self.categories: Dict[int, CategoryRecord] = {}
+        self.by_date: Dict[str, Set[int]] = {}
+        self.by_category: Dict[Optional[int], Set[int]] = {}
+        self.children: Dict[int, Set[int]] = {}
+        # Bumped by every change, so a hydration that raced with a write is discarded
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.hydrations = 0
+        self._lock = asyncio.Lock()
+
+    def enable(self):
+        if not self.enabled:
+            self.enabled = True
+            change_monitor.register(self.invalidate)
+
+    def disable(self):
+        self.enabled = False
+        self.invalidate()
+        change_monitor.unregister(self.invalidate)
+
+    def invalidate(self):
+        """Drop the model; it is hydrated again on the next read"""
+        self.version += 1
+        if self.ready:
+            self.ready = False
+            self.todos, self.categories = {}, {}
+            self.by_date, self.by_category, self.children = {}, {}, {}
+
+    # --- Hydration ---
+
+    async def hydrate(self, db: Database) -> bool:
+        """Load the planning window from the database"""
+        version = self.version
+        start = datetime.now()
+        window_start = start.strftime("%Y-%m-%d")
+        window_end = (start + timedelta(days=READ_MODEL_DAYS - 1)).strftime("%Y-%m-%d")
+
+        top_level = and_(
+            Todo.parent_id.is_(None),
+            or_(Todo.scheduled_date.is_(None), Todo.scheduled_date.between(window_start, window_end))
+        )
+        tree = subtask_tree(Todo.parent_id.in_(select(Todo.id).where(top_level)))
+        columns = [getattr(Todo, field) for field in TODO_FIELDS]
+        async with db.SessionLocal() as session:
+            categories = (await session.execute(
+                select(*[getattr(Category, field) for field in CATEGORY_FIELDS])
+            )).all()
+            roots = (await session.execute(select(*columns).where(top_level))).all()
+            subtasks = (await session.execute(
+                select(*columns).join(tree, Todo.id == tree.c.id)
+            )).all()
+
+        if version != self.version:
+            logger.info("Read model changed while loading, discarding")
+            return False
+
+        self.invalidate()
+        self.window_start, self.window_end = window_start, window_end
+        self.categories = {row.id: CategoryRecord(row) for row in categories}
+        for row in roots:
+            self._add(TodoRecord(row, self.categories.get(row.category_id)))
+        for row in subtasks:
+            self._add(TodoRecord(row, self.categories.get(row.category_id)))
+        self.ready = True
+        self.hydrations += 1
+        logger.info(
+            f"Read model loaded {len(self.todos)} todos for {window_start} to "
+            f"{window_end} in {(datetime.now() - start).total_seconds() * 1000:.0f} ms"
+        )
+        return True
+
+    async def ensure_ready(self, db: Database) -> bool:
+        """Whether reads can be served from memory, hydrating the model if needed"""
+        if not self.enabled:
+            return False
+        change_monitor.check()
+        # The window starts today, so it moves at midnight
+        if self.ready and self.window_start != datetime.now().strftime("%Y-%m-%d"):
+            self.invalidate()
+        if not self.ready:
+            async with self._lock:
+                if not self.ready:
+                    await self.hydrate(db)
+        return self.ready
+
+    async def serves(self, db: Database, first_date: str, last_date: str) -> bool:
+        """Whether the dates from ``first_date`` to ``last_date`` can be read from memory"""
+        if not await self.ensure_ready(db):
+            return False
+        if self.window_start <= first_date and last_date <= self.window_end:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    # --- Indexes ---
+
+    def _index(self, todo: TodoRecord):
+        """The index a todo is listed in, and its key there"""
+        if todo.parent_id is not None:
+            return self.children, todo.parent_id
+        if todo.scheduled_date is not None:
+            return self.by_date, todo.scheduled_date
+        return self.by_category, todo.category_id
+
+    def _add(self, todo: TodoRecord):
+        self.todos[todo.id] = todo
+        index, key = self._index(todo)
+        index.setdefault(key, set()).add(todo.id)
+
+    def _unindex(self, todo: TodoRecord):
+        index, key = self._index(todo)
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(todo.id)
+            if not ids:
+                del index[key]
+
+    def _remove(self, todo_id: int):
+        """Drop a todo together with its subtasks"""
+        todo = self.todos.pop(todo_id, None)
+        if todo is None:
+            return
+        self._unindex(todo)
+        for child_id in self.children.pop(todo_id, ()):
+            self._remove(child_id)
+
+    def _belongs(self, row) -> bool:
+        if row.parent_id is not None:
+            return row.parent_id in self.todos
+        return row.scheduled_date is None or self.window_start <= row.scheduled_date <= self.window_end
+
+    # --- Changes applied by the write routes after committing ---
+
+    def put_todo(self, row, created: bool = False):
+        """Apply a created or updated todo row"""
+        # Bumped even while loading, so a hydration that misses this write is discarded
+        self.version += 1
+        if not self.ready:
+            return
+        todo = self.todos.get(row.id)
+        if todo is None:
+            if self._belongs(row):
+                if not created:
+                    # Entering the window; its subtasks are not in memory
+                    self.invalidate()
+                    return
+                self._add(TodoRecord(row, self.categories.get(row.category_id)))
+            return
+        if not self._belongs(row):
+            self._remove(row.id)
+            return
+        self._unindex(todo)
+        todo.update(row, self.categories.get(row.category_id))
+        self._add(todo)
+
+    def remove_todos(self, todo_ids: Iterable[int]):
+        """Apply deleted todos"""
+        self.version += 1
+        if not self.ready:
+            return
+        for todo_id in todo_ids:
+            self._remove(todo_id)
+
+    def put_category(self, row):
+        """Apply a created or updated category row"""
+        self.version += 1
+        if not self.ready:
+            return
+        category = self.categories.get(row.id)
+        if category is None:
+            self.categories[row.id] = CategoryRecord(row)
+        else:
+            category.update(row)
+
+    def remove_category(self, category_id: int):
+        """Apply a deleted category (only unused categories can be deleted)"""
+        self.version += 1
+        if not self.ready:
+            return
+        self.categories.pop(category_id, None)
+
+    # --- Reads ---
+
+    def day(self, date_str: str) -> List[TodoRecord]:
+        """Top-level todos of one day in display order"""
+        ids = self.by_date.get(date_str, ())
+        return sorted((self.todos[todo_id] for todo_id in ids), key=_todo_order)
+
+    def someday(self) -> List[TodoRecord]:
+        """Top-level someday todos of all categories in display order"""
+        todos = [self.todos[todo_id] for ids in self.by_category.values() for todo_id in ids]
+        return sorted(todos, key=_someday_order)
+
+    def sorted_categories(self) -> List[CategoryRecord]:
+        return sorted(self.categories.values(), key=_category_order)
+
+    def sorted_children(self) -> SortedChildren:
+        return SortedChildren(self)
+
+    def as_dict(self) -> dict:
+        return {
+            "ready": self.ready,
+            "window": [self.window_start, self.window_end] if self.ready else None,
+            "todos": len(self.todos),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hydrations": self.hydrations,
+        }
+
+
+# Global read model, enabled by main.py with READ_MODEL (single-database mode only)
+read_model = ReadModel()
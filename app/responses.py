@@ -0,0 +1,97 @@
+"""
+FastAPI TeuxDeux Clone - Response Rendering
+Typed response envelopes serialized to JSON bytes in a single pass
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+import orjson
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.models import Todo, Category, DataResponse
+from app.wire_format import compact_responses, pack, MSGPACK_MEDIA_TYPE
+
+# Check every rendered payload against its typed envelope (development and tests)
+RESPONSE_VALIDATION = os.getenv("RESPONSE_VALIDATION", "false").lower() in ("1", "true", "yes")
+
+class EnvelopeRenderer:
+    """Renders the ``DataResponse`` envelope of one data type to JSON bytes.
+
+    Hot routes build plain dicts straight from the rows and return
+    ``render(data)``, so FastAPI neither validates nor re-encodes the result
+    and orjson writes it exactly once. The envelope's TypeAdapter is compiled
+    at import time; it backs the route's ``response_model`` schema and, with
+    RESPONSE_VALIDATION, validates every payload before it is sent.
+    Clients that asked for MessagePack get it without the nullable wrappers
+    (see app/wire_format.py).
+    """
+
+    def __init__(self, data_type: Any):
+        self.envelope = DataResponse[data_type]
+        self.adapter = TypeAdapter(self.envelope)
+
+    def __call__(self, data: Any, message: Optional[str] = None) -> Response:
+        content = {"success": True, "message": message, "data": data, "error": None}
+        if RESPONSE_VALIDATION:
+            self.adapter.validate_python(content)
+        if compact_responses.get():
+            return Response(content=pack(content), media_type=MSGPACK_MEDIA_TYPE)
+        return Response(content=orjson.dumps(content), media_type="application/json")
+
+def todo_response(todo: Todo, children: Optional[Dict[int, List[Todo]]] = None) -> dict:
+    """TodoResponse data of a todo, with its subtasks nested below it"""
+    return {
+        "id": todo.id,
+        "title": todo.title,
+        "completed": bool(todo.completed),
+        "category_id": {"Int64": todo.category_id, "Valid": True} if todo.category_id else None,
+        "category_name": todo.category.name if todo.category else None,
+        "category_color": todo.category.color if todo.category else None,
+        "scheduled_date": {"String": todo.scheduled_date, "Valid": True} if todo.scheduled_date else None,
+        "sort_order": todo.sort_order or 0,
+        "color": {"String": todo.color, "Valid": True} if todo.color else None,
+        "recurring_pattern": {"String": todo.recurring_pattern, "Valid": True} if todo.recurring_pattern else None,
+        "parent_id": {"Int64": todo.parent_id, "Valid": True} if todo.parent_id else None,
+        "created_at": todo.created_at,
+        "updated_at": todo.updated_at,
+        "children": [todo_response(child, children) for child in children.get(todo.id, ())] if children else []
+    }
+
+# Field builders of todo_response, for responses limited to some fields
+TODO_FIELD_GETTERS = {
+    "id": lambda todo: todo.id,
+    "title": lambda todo: todo.title,
+    "completed": lambda todo: bool(todo.completed),
+    "category_id": lambda todo: {"Int64": todo.category_id, "Valid": True} if todo.category_id else None,
+    "category_name": lambda todo: todo.category.name if todo.category else None,
+    "category_color": lambda todo: todo.category.color if todo.category else None,
+    "scheduled_date": lambda todo: {"String": todo.scheduled_date, "Valid": True} if todo.scheduled_date else None,
+    "sort_order": lambda todo: todo.sort_order or 0,
+    "color": lambda todo: {"String": todo.color, "Valid": True} if todo.color else None,
+    "recurring_pattern": lambda todo: {"String": todo.recurring_pattern, "Valid": True} if todo.recurring_pattern else None,
+    "parent_id": lambda todo: {"Int64": todo.parent_id, "Valid": True} if todo.parent_id else None,
+    "created_at": lambda todo: todo.created_at,
+    "updated_at": lambda todo: todo.updated_at,
+}
+TODO_FIELDS = tuple(TODO_FIELD_GETTERS) + ("children",)
+
+def sparse_todo_response(todo: Todo, children: Optional[Dict[int, List[Todo]]], fields: List[str]) -> dict:
+    """The given TodoResponse fields of a todo (in TODO_FIELDS order), subtasks included if requested"""
+    data = {field: TODO_FIELD_GETTERS[field](todo) for field in fields if field != "children"}
+    if "children" in fields:
+        data["children"] = [
+            sparse_todo_response(child, children, fields) for child in children.get(todo.id, ())
+        ] if children else []
+    return data
+
+def category_response(category: Category) -> dict:
+    """CategoryResponse data of a category"""
+    return {
+        "id": category.id,
+        "name": category.name,
+        "color": category.color,
+        "sort_order": category.sort_order or 0,
+        "created_at": category.created_at,
+        "updated_at": category.updated_at
+    }
@@ -0,0 +1,99 @@
+"""
+FastAPI TeuxDeux Clone - Admin Router
+Operational endpoints, guarded by the admin token
+"""
+
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from app.backup import backup_database, list_backups
+from app.database import Database
+from app.dependencies import require_admin, get_request_database
+from app.maintenance import run_maintenance
+from app.models import APIResponse
+from app.profiling import PROFILE_ID_PATTERN, list_profiles, profile_path
+from app.statistics import rebuild_statistics
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/admin/profiles", response_model=APIResponse)
+async def get_profiles():
+    """List stored request profiles, newest first"""
+
+    return APIResponse(
+        success=True,
+        data={"profiles": list_profiles()}
+    )
+
+@router.get("/admin/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: str = Query("text", pattern="^(text|pstats)$", description="text report or raw pstats file")
+):
+    """Get a stored request profile"""
+
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    if format == "pstats":
+        path = profile_path(profile_id, "prof")
+        if not os.path.exists(path):
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+
+    path = profile_path(profile_id, "txt")
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    with open(path) as f:
+        return PlainTextResponse(f.read())
+
+@router.post("/admin/stats/rebuild", response_model=APIResponse)
+async def rebuild_stats(
+    database: Database = Depends(get_request_database)
+):
+    """Recompute the statistics rollups from scratch"""
+
+    await rebuild_statistics(database)
+
+    return APIResponse(
+        success=True,
+        message="Statistics rebuilt"
+    )
+
+@router.get("/admin/backups", response_model=APIResponse)
+async def get_backups():
+    """List stored backups, newest first"""
+
+    return APIResponse(
+        success=True,
+        data={"backups": list_backups()}
+    )
+
+@router.post("/admin/backups", response_model=APIResponse)
+async def create_backup(
+    database: Database = Depends(get_request_database)
+):
+    """Take an online backup of the database now"""
+
+    result = await backup_database(database)
+
+    return APIResponse(
+        success=True,
+        message="Backup created",
+        data=result
+    )
+
+@router.post("/admin/maintenance", response_model=APIResponse)
+async def maintain_database(
+    database: Database = Depends(get_request_database)
+):
+    """Run database maintenance (ANALYZE, incremental vacuum, WAL checkpoint) now"""
+
+    result = await run_maintenance(database)
+
+    return APIResponse(
+        success=True,
+        message="Maintenance finished",
+        data=result
+    )
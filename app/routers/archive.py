@@ -0,0 +1,97 @@
+"""
+FastAPI TeuxDeux Clone - Archive Router
+Read-only access to archived todos and migration history
+"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from app.database import Database
+from app.dependencies import get_db_session, get_request_database
+from app.models import ArchivedTodoResponse, APIResponse, NullableInt64, NullableString
+
+router = APIRouter()
+
+@router.get("/archive/todos", response_model=APIResponse)
+async def get_archived_todos(
+    from_date: Optional[str] = Query(None, alias="from", description="First scheduled date (YYYY-MM-DD)"),
+    to_date: Optional[str] = Query(None, alias="to", description="Last scheduled date (YYYY-MM-DD)"),
+    category_id: Optional[int] = Query(None, description="Only todos of this category"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of todos"),
+    offset: int = Query(0, ge=0, description="Number of todos to skip"),
+    db: AsyncSession = Depends(get_db_session),
+    database: Database = Depends(get_request_database)
+):
+    """Get archived todos, newest first"""
+
+    schema = database.archive_schema
+    conditions = []
+    params = {"limit": limit, "offset": offset}
+    if from_date:
+        conditions.append("a.scheduled_date >= :from_date")
+        params["from_date"] = from_date
+    if to_date:
+        conditions.append("a.scheduled_date <= :to_date")
+        params["to_date"] = to_date
+    if category_id is not None:
+        conditions.append("a.category_id = :category_id")
+        params["category_id"] = category_id
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    query = text(f"""
+        SELECT a.*, c.name AS category_name, c.color AS category_color
+        FROM {schema}.todos_archive a
+        LEFT JOIN categories c ON c.id = a.category_id
+        {where}
+        ORDER BY a.scheduled_date DESC, a.archive_id DESC
+        LIMIT :limit OFFSET :offset
+    """)
+    result = await db.execute(query, params)
+
+    todos = []
+    for row in result.mappings():
+        todos.append(ArchivedTodoResponse(
+            id=row["id"],
+            title=row["title"],
+            completed=bool(row["completed"]),
+            category_id=NullableInt64(Int64=row["category_id"], Valid=True) if row["category_id"] else None,
+            category_name=row["category_name"],
+            category_color=row["category_color"],
+            scheduled_date=NullableString(String=row["scheduled_date"], Valid=True) if row["scheduled_date"] else None,
+            sort_order=row["sort_order"] or 0,
+            color=NullableString(String=row["color"], Valid=True) if row["color"] else None,
+            recurring_pattern=NullableString(String=row["recurring_pattern"], Valid=True) if row["recurring_pattern"] else None,
+            parent_id=NullableInt64(Int64=row["parent_id"], Valid=True) if row["parent_id"] else None,
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            archived_at=row["archived_at"]
+        ))
+
+    return APIResponse(
+        success=True,
+        data={"todos": [todo.model_dump() for todo in todos], "count": len(todos)}
+    )
+
+@router.get("/archive/todos/{todo_id}/migrations", response_model=APIResponse)
+async def get_archived_migrations(
+    todo_id: int,
+    db: AsyncSession = Depends(get_db_session),
+    database: Database = Depends(get_request_database)
+):
+    """Get the archived migration history of a todo"""
+
+    schema = database.archive_schema
+    query = text(f"""
+        SELECT todo_id, from_date, to_date, migrated_at
+        FROM {schema}.todo_migrations_archive
+        WHERE todo_id = :todo_id
+        ORDER BY migrated_at ASC, id ASC
+    """)
+    result = await db.execute(query, {"todo_id": todo_id})
+
+    return APIResponse(
+        success=True,
+        data={"migrations": [dict(row) for row in result.mappings()]}
+    )
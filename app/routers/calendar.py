@@ -0,0 +1,83 @@
+"""
+FastAPI TeuxDeux Clone - Calendar Router
+Aggregated per-day todo counts for month/quarter overviews
+"""
+
+import os
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+
+from app.dependencies import get_db_session
+from app.models import Todo, CalendarData, DataResponse
+from app.responses import EnvelopeRenderer
+from app.wire_format import NegotiatedRoute
+
+router = APIRouter(route_class=NegotiatedRoute)
+
+render_calendar = EnvelopeRenderer(CalendarData)
+
+# Longest range a single calendar request may cover
+CALENDAR_MAX_DAYS = int(os.getenv("CALENDAR_MAX_DAYS", "366"))
+
+def _parse_date(value: str, name: str) -> datetime:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} date, expected YYYY-MM-DD")
+
+@router.get("/calendar", response_model=DataResponse[CalendarData])
+async def get_calendar(
+    from_date: str = Query(..., alias="from", description="First date (YYYY-MM-DD)"),
+    to_date: str = Query(..., alias="to", description="Last date (YYYY-MM-DD)"),
+    categories: bool = Query(False, description="Include per-category counts"),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Get open and completed todo counts per day (days without todos are omitted)"""
+
+    start = _parse_date(from_date, "from")
+    end = _parse_date(to_date, "to")
+    # strptime also takes unpadded dates, which would not compare as text with the stored ones
+    from_date, to_date = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (end - start).days + 1 > CALENDAR_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range must not exceed {CALENDAR_MAX_DAYS} days")
+
+    # One aggregate over the (scheduled_date, completed, category_id) index
+    group_by = [Todo.scheduled_date, Todo.category_id] if categories else [Todo.scheduled_date]
+    query = select(
+        *group_by,
+        func.count().label("total"),
+        func.coalesce(func.sum(Todo.completed), 0).label("completed")
+    ).where(
+        Todo.scheduled_date >= from_date,
+        Todo.scheduled_date <= to_date
+    ).group_by(*group_by).order_by(*group_by)
+
+    result = await db.execute(query)
+
+    days = []
+    for row in result:
+        completed = int(row.completed)
+        open_count = row.total - completed
+        if not days or days[-1]["date"] != row.scheduled_date:
+            days.append({"date": row.scheduled_date, "open": 0, "completed": 0})
+            if categories:
+                days[-1]["categories"] = []
+        day = days[-1]
+        day["open"] += open_count
+        day["completed"] += completed
+        if categories:
+            day["categories"].append({
+                "category_id": row.category_id,
+                "open": open_count,
+                "completed": completed
+            })
+
+    return render_calendar({
+        "from_date": from_date,
+        "to_date": to_date,
+        "days": days
+    })
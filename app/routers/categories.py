@@ -3,34 +3,78 @@ FastAPI TeuxDeux Clone - Categories Router
 CRUD operations for todo categories
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Path
+from functools import partial
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Path
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, insert, update, delete, func, bindparam
 
-from app.dependencies import get_db_session
+from app.database import Database
+from app.dependencies import get_db_session, get_request_database
 from app.models import (
-    Category, Todo, CreateCategoryRequest, UpdateCategoryRequest, 
-    CategoryResponse, APIResponse
+    Category, Todo, CreateCategoryRequest, UpdateCategoryRequest, MoveRequest,
+    CategoriesData, DataResponse, APIResponse
 )
+from app.ordering import (
+    CATEGORY_ORDER, append_position, load_move_rows, find_position, respace,
+    respace_in_background
+)
+from app.read_model import read_model
+from app.single_flight import coalesce_response
+from app.responses import EnvelopeRenderer, category_response
+from app.wire_format import NegotiatedRoute, compact_responses
+
+router = APIRouter(route_class=NegotiatedRoute)
 
-router = APIRouter()
+render_categories = EnvelopeRenderer(CategoriesData)
+
+# Statements built once with bound parameters (see app/statement_cache.py);
+# inserts and updates write the columns given at execution
+CATEGORIES_TABLE = Category.__table__
+CATEGORIES = select(Category).order_by(*CATEGORY_ORDER)
+CATEGORY_EXISTS = select(Category.id).where(Category.id == bindparam("category_id"))
+# New categories go to the end of the list
+CREATE_CATEGORY = (
+    insert(CATEGORIES_TABLE)
+    .values(sort_order=append_position(Category))
+    .returning(*CATEGORIES_TABLE.c)
+)
+UPDATE_CATEGORY = (
+    update(CATEGORIES_TABLE)
+    .where(CATEGORIES_TABLE.c.id == bindparam("category_id"))
+    .returning(*CATEGORIES_TABLE.c)
+    .execution_options(synchronize_session=False)
+)
+# Only deletes the category if no todo is using it
+_in_use = select(Todo.id).where(Todo.category_id == bindparam("category_id")).exists()
+DELETE_CATEGORY = (
+    delete(CATEGORIES_TABLE)
+    .where(CATEGORIES_TABLE.c.id == bindparam("category_id"), ~_in_use)
+    .returning(CATEGORIES_TABLE.c.id)
+    .execution_options(synchronize_session=False)
+)
+# Why nothing was deleted: whether the category exists, and how many todos use it
+CATEGORY_USAGE = select(
+    select(Category.id).where(Category.id == bindparam("category_id")).scalar_subquery(),
+    select(func.count(Todo.id)).where(Todo.category_id == bindparam("category_id")).scalar_subquery()
+)
 
-@router.get("/categories", response_model=APIResponse)
+@router.get("/categories", response_model=DataResponse[CategoriesData])
 async def get_categories(
-    db: AsyncSession = Depends(get_db_session)
+    database: Database = Depends(get_request_database)
 ):
     """Get all categories"""
     
-    query = select(Category).order_by(Category.sort_order.asc(), Category.name.asc())
-    result = await db.execute(query)
-    categories = result.scalars().all()
-    
-    category_responses = [CategoryResponse.from_orm(cat) for cat in categories]
+    # Identical concurrent requests share one query (app/single_flight.py)
+    key = (database.db_path, "categories", compact_responses.get())
+    return await coalesce_response(key, partial(build_categories, database))
+
+async def build_categories(database: Database):
+    """Render the category list, with a database session of its own"""
+    async with database.SessionLocal() as db:
+        result = await db.execute(CATEGORIES)
+        categories = result.scalars().all()
     
-    return APIResponse(
-        success=True,
-        data={"categories": [cat.dict() for cat in category_responses]}
-    )
+    return render_categories({"categories": [category_response(cat) for cat in categories]})
 
 @router.post("/categories", response_model=APIResponse)
 async def create_category(
@@ -42,19 +86,15 @@ async def create_category(
     # Set default color if not provided
     color = category_data.color if category_data.color else "#6b7280"
     
-    category = Category(
-        name=category_data.name,
-        color=color
-    )
-    
-    db.add(category)
+    result = await db.execute(CREATE_CATEGORY, {"name": category_data.name, "color": color})
+    row = result.one()
     await db.commit()
-    await db.refresh(category)
+    read_model.put_category(row)
     
     return APIResponse(
         success=True,
         message="Category created successfully",
-        data={"id": category.id}
+        data={"id": row.id}
     )
 
 @router.put("/categories/{category_id}", response_model=APIResponse)
@@ -65,26 +105,70 @@ async def update_category(
 ):
     """Update an existing category"""
     
-    # Get the category
-    category = await db.get(Category, category_id)
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-    
     # Update fields that are provided
-    update_data = category_data.dict(exclude_unset=True)
+    update_data = category_data.model_dump(exclude_unset=True)
     if not update_data:
+        # A missing category is still reported as 404
+        if await db.scalar(CATEGORY_EXISTS, {"category_id": category_id}) is None:
+            raise HTTPException(status_code=404, detail="Category not found")
         raise HTTPException(status_code=400, detail="No fields to update")
     
-    for field, value in update_data.items():
-        setattr(category, field, value)
+    result = await db.execute(UPDATE_CATEGORY, {**update_data, "category_id": category_id})
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Category not found")
     
     await db.commit()
+    read_model.put_category(row)
     
     return APIResponse(
         success=True,
         message="Category updated successfully"
     )
 
+@router.post("/categories/{category_id}/move", response_model=APIResponse)
+async def move_category(
+    move: MoveRequest,
+    background_tasks: BackgroundTasks,
+    category_id: int = Path(..., description="Category ID"),
+    db: AsyncSession = Depends(get_db_session),
+    database: Database = Depends(get_request_database)
+):
+    """Move a category between two neighbors"""
+    
+    category, after, before = await load_move_rows(db, Category, category_id, move, "category")
+    
+    position, crowded = await find_position(db, Category, CATEGORY_ORDER, [], category_id, after, before)
+    respaced = position is None
+    if respaced:
+        # The neighbors share a sort order, renumber the list right away
+        await respace(db, Category, CATEGORY_ORDER, [])
+        for row in (after, before):
+            if row is not None:
+                await db.refresh(row)
+        position, crowded = await find_position(db, Category, CATEGORY_ORDER, [], category_id, after, before)
+        if position is None:
+            raise HTTPException(status_code=400, detail="after_id must come before before_id")
+    
+    result = await db.execute(UPDATE_CATEGORY, {"sort_order": position, "category_id": category_id})
+    row = result.one()
+    await db.commit()
+    if respaced:
+        read_model.invalidate()
+    else:
+        read_model.put_category(row)
+    
+    if crowded:
+        background_tasks.add_task(respace_in_background, database, Category, CATEGORY_ORDER, [])
+        # Runs after the renumbering
+        background_tasks.add_task(read_model.invalidate)
+    
+    return APIResponse(
+        success=True,
+        message="Category moved successfully",
+        data={"sort_order": position}
+    )
+
 @router.delete("/categories/{category_id}", response_model=APIResponse)
 async def delete_category(
     category_id: int = Path(..., description="Category ID"),
@@ -92,25 +176,23 @@ async def delete_category(
 ):
     """Delete a category"""
     
-    category = await db.get(Category, category_id)
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-    
-    # Check if category is in use
-    count_query = select(func.count(Todo.id)).where(Todo.category_id == category_id)
-    result = await db.execute(count_query)
-    count = result.scalar()
+    result = await db.execute(DELETE_CATEGORY, {"category_id": category_id})
     
-    if count > 0:
+    if result.scalar_one_or_none() is None:
+        # Find out why nothing was deleted
+        reason = await db.execute(CATEGORY_USAGE, {"category_id": category_id})
+        exists, count = reason.one()
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Category not found")
         raise HTTPException(
             status_code=400, 
             detail=f"Cannot delete category: {count} todos are using this category"
         )
     
-    await db.delete(category)
     await db.commit()
+    read_model.remove_category(category_id)
     
     return APIResponse(
         success=True,
         message="Category deleted successfully"
-    )
\ No newline at end of file
+    )
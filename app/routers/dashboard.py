@@ -4,115 +4,169 @@ Dashboard endpoint for getting complete application data
 """
 
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, Query
+from functools import partial
+from typing import List, Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from sqlalchemy import select, and_
+from sqlalchemy import select, bindparam
 
-from app.dependencies import get_db_session
-from app.models import (
-    Todo, Category, DashboardData, WeeklyTodos, 
-    TodoResponse, CategoryResponse, APIResponse, NullableInt64, NullableString
+from app.database import Database
+from app.dependencies import get_request_database
+from app.models import Todo, Category, DashboardData, SparseDashboardData, DataResponse
+from app.ordering import TODO_ORDER, CATEGORY_ORDER
+from app.read_model import read_model
+from app.responses import (
+    EnvelopeRenderer, TODO_FIELDS, todo_response, sparse_todo_response, category_response
 )
+from app.single_flight import coalesce_response
+from app.subtasks import load_subtasks
+from app.wire_format import NegotiatedRoute, compact_responses
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
 
-@router.get("/dashboard", response_model=APIResponse)
+render_dashboard = EnvelopeRenderer(DashboardData)
+render_sparse_dashboard = EnvelopeRenderer(SparseDashboardData)
+
+DASHBOARD_SECTIONS = ("week", "someday", "categories")
+
+# Statements of the SQL path, built once; the date is bound per execution.
+# Keyed by whether the categories of the todos are loaded as well.
+_day_todos = select(Todo).where(
+    Todo.scheduled_date == bindparam("date"),
+    Todo.parent_id.is_(None)
+).order_by(*TODO_ORDER)
+_someday_todos = select(Todo).where(
+    Todo.scheduled_date.is_(None),
+    Todo.parent_id.is_(None)
+).order_by(Todo.category_id.asc(), *TODO_ORDER)
+DAY_TODOS = {False: _day_todos, True: _day_todos.options(selectinload(Todo.category))}
+SOMEDAY_TODOS = {False: _someday_todos, True: _someday_todos.options(selectinload(Todo.category))}
+CATEGORIES = select(Category).order_by(*CATEGORY_ORDER)
+
+def parse_selection(value: Optional[str], allowed: Sequence[str], name: str) -> Optional[List[str]]:
+    """Comma-separated query parameter, None if it was not given"""
+    if value is None:
+        return None
+    selected = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in selected if item not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {name}: {', '.join(unknown)} (allowed: {', '.join(allowed)})"
+        )
+    return selected
+
+@router.get("/dashboard", response_model=DataResponse[DashboardData])
 async def get_dashboard(
     weekOffset: int = Query(0, description="Week offset from current week"),
-    db: AsyncSession = Depends(get_db_session)
+    include: Optional[str] = Query(None, description="Comma-separated sections to return: week, someday, categories (default: all)"),
+    fields: Optional[str] = Query(None, description="Comma-separated todo fields to return (default: all, id is always returned)"),
+    database: Database = Depends(get_request_database)
 ):
     """Get dashboard data with 7-day view and someday todos"""
     
-    # Calculate dates
+    selected = parse_selection(include, DASHBOARD_SECTIONS, "section")
+    sections = DASHBOARD_SECTIONS if selected is None else tuple(
+        section for section in DASHBOARD_SECTIONS if section in selected
+    )
+    todo_fields = parse_selection(fields, TODO_FIELDS, "field")
+    if todo_fields is not None:
+        todo_fields = tuple(field for field in TODO_FIELDS if field in todo_fields or field == "id")
+    sparse = include is not None or fields is not None
+    
+    # Identical concurrent requests share one computation (app/single_flight.py);
+    # the date and the wire format are part of the key because the result depends on them
     today = datetime.now()
+    key = (
+        database.db_path, "dashboard", compact_responses.get(), today.strftime("%Y-%m-%d"),
+        weekOffset, sections, todo_fields, sparse
+    )
+    return await coalesce_response(
+        key, partial(build_dashboard, database, today, weekOffset, sections, todo_fields, sparse)
+    )
+
+async def build_dashboard(database: Database, today: datetime, weekOffset: int, sections: Sequence[str],
+                          todo_fields: Optional[Sequence[str]], sparse: bool):
+    """Render the dashboard response, with a database session of its own"""
+    
+    if todo_fields is None:
+        render_todo = todo_response
+    else:
+        render_todo = partial(sparse_todo_response, fields=todo_fields)
+    # Categories of todos and subtasks are only loaded when they are returned
+    with_categories = todo_fields is None or "category_name" in todo_fields or "category_color" in todo_fields
+    with_children = todo_fields is None or "children" in todo_fields
+    
+    # Calculate dates
     today_str = today.strftime("%Y-%m-%d")
     start_date = today + timedelta(days=weekOffset)
     week_start_str = start_date.strftime("%Y-%m-%d")
+    dates = [start_date + timedelta(days=i) for i in range(7)] if "week" in sections else []
+    first_date, last_date = (
+        (week_start_str, dates[-1].strftime("%Y-%m-%d")) if dates else (today_str, today_str)
+    )
     
-    # Build weekly todos for 7 days
-    weekly_todos = []
-    for i in range(7):
-        date = start_date + timedelta(days=i)
-        date_str = date.strftime("%Y-%m-%d")
-        day_name = date.strftime("%A")
-        
-        # Get todos for this date
-        todos_query = select(Todo).options(selectinload(Todo.category)).where(
-            Todo.scheduled_date == date_str
-        ).order_by(Todo.sort_order.asc(), Todo.created_at.asc())
-        
-        result = await db.execute(todos_query)
-        todos = result.scalars().all()
-        
-        # Convert to response format
-        todo_responses = []
-        for todo in todos:
-            todo_response = TodoResponse(
-                id=todo.id,
-                title=todo.title,
-                completed=todo.completed,
-                category_id=NullableInt64(Int64=todo.category_id, Valid=True) if todo.category_id else None,
-                category_name=todo.category.name if todo.category else None,
-                category_color=todo.category.color if todo.category else None,
-                scheduled_date=NullableString(String=todo.scheduled_date, Valid=True) if todo.scheduled_date else None,
-                sort_order=todo.sort_order,
-                color=NullableString(String=todo.color, Valid=True) if todo.color else None,
-                recurring_pattern=NullableString(String=todo.recurring_pattern, Valid=True) if todo.recurring_pattern else None,
-                parent_id=NullableInt64(Int64=todo.parent_id, Valid=True) if todo.parent_id else None,
-                created_at=todo.created_at,
-                updated_at=todo.updated_at
+    if await read_model.serves(database, first_date, last_date):
+        # The planning window is held in memory (app/read_model.py)
+        days = [(date, read_model.day(date.strftime("%Y-%m-%d"))) for date in dates]
+        someday_todos_orm = read_model.someday() if "someday" in sections else None
+        children = read_model.sorted_children() if with_children else None
+        categories_orm = read_model.sorted_categories() if "categories" in sections else None
+    else:
+        async with database.SessionLocal() as db:
+            days, someday_todos_orm, children, categories_orm = await load_dashboard(
+                db, dates, "someday" in sections, "categories" in sections, with_categories, with_children
             )
-            todo_responses.append(todo_response)
-        
-        weekly_todos.append(WeeklyTodos(
-            date=date_str,
-            day=day_name,
-            todos=todo_responses
-        ))
     
-    # Get someday todos (no scheduled_date)
-    someday_query = select(Todo).options(selectinload(Todo.category)).where(
-        Todo.scheduled_date.is_(None)
-    ).order_by(Todo.category_id.asc(), Todo.sort_order.asc(), Todo.created_at.asc())
+    data = {}
+    if "week" in sections:
+        data["weekly_todos"] = [
+            {
+                "date": date.strftime("%Y-%m-%d"),
+                "day": date.strftime("%A"),
+                "todos": [render_todo(todo, children) for todo in todos]
+            }
+            for date, todos in days
+        ]
+    if "someday" in sections:
+        data["someday_todos"] = [render_todo(todo, children) for todo in someday_todos_orm]
+    if "categories" in sections:
+        data["categories"] = [category_response(cat) for cat in categories_orm]
+    data["today_date"] = today_str
+    data["week_start_date"] = week_start_str
+    
+    if sparse:
+        return render_sparse_dashboard(data)
+    return render_dashboard(data)
+
+async def load_dashboard(db: AsyncSession, dates: List[datetime], with_someday: bool,
+                         with_categories: bool, with_todo_categories: bool, with_children: bool):
+    """Load the requested parts of the dashboard from SQL; parts not requested are None"""
     
-    result = await db.execute(someday_query)
-    someday_todos_orm = result.scalars().all()
+    # Get top-level todos for each day
+    days = []
+    for date in dates:
+        result = await db.execute(DAY_TODOS[with_todo_categories], {"date": date.strftime("%Y-%m-%d")})
+        days.append((date, result.scalars().all()))
     
-    someday_todos = []
-    for todo in someday_todos_orm:
-        todo_response = TodoResponse(
-            id=todo.id,
-            title=todo.title,
-            completed=todo.completed,
-            category_id=NullableInt64(Int64=todo.category_id, Valid=True) if todo.category_id else None,
-            category_name=todo.category.name if todo.category else None,
-            category_color=todo.category.color if todo.category else None,
-            scheduled_date=NullableString(String=todo.scheduled_date, Valid=True) if todo.scheduled_date else None,
-            sort_order=todo.sort_order,
-            color=NullableString(String=todo.color, Valid=True) if todo.color else None,
-            recurring_pattern=NullableString(String=todo.recurring_pattern, Valid=True) if todo.recurring_pattern else None,
-            parent_id=NullableInt64(Int64=todo.parent_id, Valid=True) if todo.parent_id else None,
-            created_at=todo.created_at,
-            updated_at=todo.updated_at
-        )
-        someday_todos.append(todo_response)
+    # Get top-level someday todos (no scheduled_date)
+    someday_todos = None
+    if with_someday:
+        result = await db.execute(SOMEDAY_TODOS[with_todo_categories])
+        someday_todos = result.scalars().all()
     
-    # Get categories
-    categories_query = select(Category).order_by(Category.sort_order.asc(), Category.name.asc())
-    result = await db.execute(categories_query)
-    categories_orm = result.scalars().all()
-    categories = [CategoryResponse.from_orm(cat) for cat in categories_orm]
+    # Subtasks of all of them in a single recursive query
+    children = None
+    if with_children:
+        root_ids = [todo.id for _, todos in days for todo in todos]
+        root_ids.extend(todo.id for todo in someday_todos or ())
+        children = await load_subtasks(db, root_ids)
     
-    dashboard_data = DashboardData(
-        weekly_todos=weekly_todos,
-        someday_todos=someday_todos,
-        categories=categories,
-        today_date=today_str,
-        week_start_date=week_start_str
-    )
+    # Get categories
+    categories = None
+    if with_categories:
+        result = await db.execute(CATEGORIES)
+        categories = result.scalars().all()
     
-    return APIResponse(
-        success=True,
-        data=dashboard_data.dict()
-    )
\ No newline at end of file
+    return days, someday_todos, children, categories
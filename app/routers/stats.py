@@ -0,0 +1,76 @@
+"""
+FastAPI TeuxDeux Clone - Statistics Router
+Productivity statistics served from the weekly rollup table
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from app.dependencies import get_db_session
+from app.models import StatsData, DataResponse
+from app.responses import EnvelopeRenderer
+from app.wire_format import NegotiatedRoute
+
+router = APIRouter(route_class=NegotiatedRoute)
+
+render_stats = EnvelopeRenderer(StatsData)
+
+def _category_stats(category_id, total, completed, completion_days, rolled_forward) -> dict:
+    """CategoryStats data of one rollup (or sum of rollups)"""
+    return {
+        "category_id": category_id or None,
+        "total": total,
+        "completed": completed,
+        "completion_rate": round(completed / total, 4) if total else None,
+        "avg_days_to_complete": round(completion_days / completed, 2) if completed else None,
+        "rolled_forward": rolled_forward
+    }
+
+@router.get("/stats", response_model=DataResponse[StatsData])
+async def get_stats(
+    weeks: int = Query(12, ge=1, le=104, description="Number of weeks up to the current one"),
+    category_id: Optional[int] = Query(None, description="Only this category"),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Get completion rates, days to complete and roll-forwards per category and week"""
+
+    today = datetime.now()
+    current_week = today - timedelta(days=today.weekday())
+    from_week = (current_week - timedelta(weeks=weeks - 1)).strftime("%Y-%m-%d")
+    to_week = current_week.strftime("%Y-%m-%d")
+
+    # Reads at most weeks x categories rollup rows, independent of the history size
+    conditions = ["week_start BETWEEN :from_week AND :to_week"]
+    params = {"from_week": from_week, "to_week": to_week}
+    if category_id is not None:
+        conditions.append("category_id = :category_id")
+        params["category_id"] = category_id
+    result = await db.execute(text(f"""
+        SELECT week_start, category_id, total, completed, completion_days, rolled_forward
+        FROM stats_weekly
+        WHERE {' AND '.join(conditions)}
+        ORDER BY week_start, category_id
+    """), params)
+
+    weekly = []
+    totals = {}
+    for row in result:
+        if not weekly or weekly[-1]["week_start"] != row.week_start:
+            weekly.append({"week_start": row.week_start, "categories": []})
+        weekly[-1]["categories"].append(_category_stats(
+            row.category_id, row.total, row.completed, row.completion_days, row.rolled_forward
+        ))
+        total = totals.setdefault(row.category_id, [0, 0, 0.0, 0])
+        total[0] += row.total
+        total[1] += row.completed
+        total[2] += row.completion_days
+        total[3] += row.rolled_forward
+
+    return render_stats({
+        "from_week": from_week,
+        "weeks": weekly,
+        "totals": [_category_stats(cat, *values) for cat, values in sorted(totals.items())]
+    })
@@ -3,44 +3,302 @@ FastAPI TeuxDeux Clone - Todos Router
 CRUD operations for todo items and migration functionality
 """
 
+import os
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Path
+from typing import Dict, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Path, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
+from sqlalchemy import select, insert, update, delete, bindparam
+from sqlalchemy.orm import aliased, joinedload
 
-from app.dependencies import get_db_session
+from app.database import Database
+from app.dependencies import get_db_session, get_request_database
 from app.models import (
-    Todo, TodoMigration, CreateTodoRequest, UpdateTodoRequest, 
-    APIResponse
+    Todo, CreateTodoRequest, UpdateTodoRequest, MoveRequest, BulkTodosRequest, TodoResponse,
+    TodosData, BulkTodosData, DataResponse, APIResponse, TODO_KEYSET
+)
+from app.ordering import (
+    SORT_GAP, TODO_ORDER, TODO_LIST_CONDITIONS, todo_list_kind, todo_list_conditions, append_position,
+    load_move_rows, find_position, respace, respace_in_background
+)
+from app.pagination import encode_cursor, decode_cursor, after_cursor
+from app.responses import EnvelopeRenderer, todo_response
+from app.subtasks import SUBTASK_MAX_DEPTH, todo_depth, load_subtasks
+from app.migration import migrate_past_todos
+from app.read_model import read_model
+from app.wire_format import NegotiatedRoute
+
+router = APIRouter(route_class=NegotiatedRoute)
+
+render_todos = EnvelopeRenderer(TodosData)
+render_todo = EnvelopeRenderer(TodoResponse)
+render_bulk = EnvelopeRenderer(BulkTodosData)
+
+# Largest page (and ids= batch) of GET /todos, and most operations of a bulk request
+TODOS_MAX_PAGE_SIZE = int(os.getenv("TODOS_MAX_PAGE_SIZE", "500"))
+
+# Statements of the single-todo routes, built once with bound parameters so
+# each request only looks up the compiled form (see app/statement_cache.py).
+# Inserts and updates use the table: the columns given at execution are the
+# ones written.
+TODOS = Todo.__table__
+GET_TODO = select(Todo).options(joinedload(Todo.category)).where(Todo.id == bindparam("todo_id"))
+TODO_EXISTS = select(Todo.id).where(Todo.id == bindparam("todo_id"))
+# New todos go to the end of their list, one statement per kind of list
+CREATE_TODO = {
+    kind: insert(TODOS).values(sort_order=append_position(Todo, *conditions)).returning(*TODOS.c)
+    for kind, conditions in TODO_LIST_CONDITIONS.items()
+}
+# Bulk creates look up the end of each list once and insert all rows in one
+# multi-row statement; SQLite hands out increasing ids in row order
+APPEND_POSITION = {
+    kind: select(append_position(Todo, *conditions))
+    for kind, conditions in TODO_LIST_CONDITIONS.items()
+}
+BULK_CREATE_TODOS = insert(TODOS).returning(TODOS.c.id)
+UPDATE_TODO = (
+    update(TODOS)
+    .where(TODOS.c.id == bindparam("todo_id"))
+    .returning(*TODOS.c)
+    .execution_options(synchronize_session=False)
+)
+# Without RETURNING, so updates with the same fields run as one executemany
+BULK_UPDATE_TODOS = (
+    update(TODOS)
+    .where(TODOS.c.id == bindparam("todo_id"))
+    .execution_options(synchronize_session=False)
+)
+EXISTING_TODO_IDS = select(Todo.id).where(Todo.id.in_(bindparam("todo_ids", expanding=True)))
+# Whole subtrees in one statement (UNION also stops on cyclic data)
+_subtree = select(Todo.id).where(Todo.id.in_(bindparam("todo_ids", expanding=True))).cte("subtree", recursive=True)
+_child = aliased(Todo)
+_subtree = _subtree.union(select(_child.id).where(_child.parent_id == _subtree.c.id))
+DELETE_TODO_TREES = (
+    delete(TODOS)
+    .where(TODOS.c.id.in_(select(_subtree.c.id)))
+    .returning(TODOS.c.id)
+    .execution_options(synchronize_session=False)
 )
 
-router = APIRouter()
+def _check_date(value: Optional[str], name: str):
+    if value is not None:
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid {name} date, expected YYYY-MM-DD")
+
+async def _check_parent(db: AsyncSession, parent_id: int):
+    """A subtask can be created below the todo ``parent_id``"""
+    depth = await todo_depth(db, parent_id)
+    if depth is None:
+        raise HTTPException(status_code=404, detail="Parent todo not found")
+    if depth + 1 > SUBTASK_MAX_DEPTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Subtasks cannot be nested deeper than {SUBTASK_MAX_DEPTH} levels"
+        )
+
+def _parse_ids(value: str) -> list:
+    try:
+        ids = [int(item) for item in value.split(",") if item.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if len(ids) > TODOS_MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {TODOS_MAX_PAGE_SIZE} ids per request")
+    return ids
+
+@router.get("/todos", response_model=DataResponse[TodosData])
+async def list_todos(
+    from_date: Optional[str] = Query(None, alias="from", description="First scheduled date (YYYY-MM-DD)"),
+    to_date: Optional[str] = Query(None, alias="to", description="Last scheduled date (YYYY-MM-DD)"),
+    scheduled: Optional[bool] = Query(None, description="Only scheduled (true) or only someday (false) todos"),
+    category_id: Optional[int] = Query(None, description="Only todos of this category"),
+    completed: Optional[bool] = Query(None, description="Only completed (true) or open (false) todos"),
+    recurring: Optional[bool] = Query(None, description="Only todos with (true) or without (false) a recurring pattern"),
+    parent_id: Optional[int] = Query(None, description="Only subtasks of this todo"),
+    top_level: Optional[bool] = Query(None, description="Only top-level todos (true) or only subtasks (false)"),
+    ids: Optional[str] = Query(None, description="Comma-separated todo ids"),
+    limit: int = Query(100, ge=1, le=TODOS_MAX_PAGE_SIZE, description="Maximum number of todos per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Get todos matching all given filters, someday todos first, then by date
+    and position. Subtasks are listed as todos of their own (no children).
+    """
+    
+    _check_date(from_date, "from")
+    _check_date(to_date, "to")
+    conditions = []
+    if ids is not None:
+        conditions.append(Todo.id.in_(_parse_ids(ids)))
+    if from_date is not None:
+        conditions.append(Todo.scheduled_date >= from_date)
+    if to_date is not None:
+        conditions.append(Todo.scheduled_date <= to_date)
+    if scheduled is not None:
+        conditions.append(Todo.scheduled_date.isnot(None) if scheduled else Todo.scheduled_date.is_(None))
+    if category_id is not None:
+        conditions.append(Todo.category_id == category_id)
+    if completed is not None:
+        conditions.append(Todo.completed == completed)
+    if recurring is not None:
+        conditions.append(Todo.recurring_pattern.isnot(None) if recurring else Todo.recurring_pattern.is_(None))
+    if parent_id is not None:
+        conditions.append(Todo.parent_id == parent_id)
+    if top_level is not None:
+        conditions.append(Todo.parent_id.is_(None) if top_level else Todo.parent_id.isnot(None))
+    if cursor is not None:
+        conditions.append(after_cursor(TODO_KEYSET, decode_cursor(cursor, (str, int, int))))
+    
+    # One row more than the page tells whether there is a next page
+    result = await db.execute(
+        select(Todo)
+        .options(joinedload(Todo.category))
+        .where(*conditions)
+        .order_by(*TODO_KEYSET)
+        .limit(limit + 1)
+    )
+    todos = result.scalars().all()
+    
+    next_cursor = None
+    if len(todos) > limit:
+        todos = todos[:limit]
+        last = todos[-1]
+        next_cursor = encode_cursor((last.scheduled_date or "", last.sort_order or 0, last.id))
+    
+    return render_todos({
+        "todos": [todo_response(todo) for todo in todos],
+        "count": len(todos),
+        "next_cursor": next_cursor
+    })
+
+@router.get("/todos/{todo_id}", response_model=DataResponse[TodoResponse])
+async def get_todo(
+    todo_id: int = Path(..., description="Todo ID"),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Get a todo with its subtasks nested below it"""
+    
+    todo = await db.scalar(GET_TODO, {"todo_id": todo_id})
+    if todo is None:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    children = await load_subtasks(db, [todo_id])
+    
+    return render_todo(todo_response(todo, children))
 
 @router.post("/todos", response_model=APIResponse)
 async def create_todo(
     todo_data: CreateTodoRequest,
     db: AsyncSession = Depends(get_db_session)
 ):
-    """Create a new todo"""
-    
-    todo = Todo(
-        title=todo_data.title,
-        category_id=todo_data.category_id,
-        scheduled_date=todo_data.scheduled_date if todo_data.scheduled_date else None,
-        color=todo_data.color if todo_data.color else None,
-        recurring_pattern=todo_data.recurring_pattern if todo_data.recurring_pattern else None
-    )
+    """Create a new todo, optionally as a subtask of another todo"""
+    
+    if todo_data.parent_id is not None:
+        await _check_parent(db, todo_data.parent_id)
     
-    db.add(todo)
+    kind = todo_list_kind(todo_data.scheduled_date, todo_data.category_id, todo_data.parent_id)
+    result = await db.execute(CREATE_TODO[kind], {
+        "title": todo_data.title,
+        "category_id": todo_data.category_id,
+        "scheduled_date": todo_data.scheduled_date if todo_data.scheduled_date else None,
+        "color": todo_data.color if todo_data.color else None,
+        "recurring_pattern": todo_data.recurring_pattern if todo_data.recurring_pattern else None,
+        "parent_id": todo_data.parent_id,
+        "list_parent_id": todo_data.parent_id,
+        "list_date": todo_data.scheduled_date,
+        "list_category_id": todo_data.category_id,
+    })
+    row = result.one()
     await db.commit()
-    await db.refresh(todo)
+    read_model.put_todo(row, created=True)
     
     return APIResponse(
         success=True,
         message="Todo created successfully",
-        data={"id": todo.id}
+        data={"id": row.id}
     )
 
+@router.post("/todos/bulk", response_model=DataResponse[BulkTodosData])
+async def bulk_todos(
+    bulk: BulkTodosRequest,
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Create, update and delete many todos in one transaction.
+
+    The body can also be sent as MessagePack (Content-Type: application/msgpack).
+    New todos go to the end of their lists in request order.
+    """
+    
+    operations = len(bulk.create) + len(bulk.update) + len(bulk.delete)
+    if not operations:
+        raise HTTPException(status_code=400, detail="No operations")
+    if operations > TODOS_MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {TODOS_MAX_PAGE_SIZE} operations per request")
+    
+    # All referenced todos must exist before anything is written
+    referenced = {item.id for item in bulk.update} | set(bulk.delete)
+    if referenced:
+        existing = set((await db.execute(EXISTING_TODO_IDS, {"todo_ids": list(referenced)})).scalars())
+        missing = sorted(referenced - existing)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Todos not found: {', '.join(map(str, missing))}")
+    for parent_id in {item.parent_id for item in bulk.create if item.parent_id is not None}:
+        await _check_parent(db, parent_id)
+    
+    created = []
+    if bulk.create:
+        # One position lookup per list, then consecutive positions behind it
+        positions: Dict[tuple, int] = {}
+        rows = []
+        for item in bulk.create:
+            kind = todo_list_kind(item.scheduled_date, item.category_id, item.parent_id)
+            list_key = {
+                "subtasks": item.parent_id, "day": item.scheduled_date,
+                "someday": item.category_id, "uncategorized": None
+            }[kind]
+            if (kind, list_key) in positions:
+                position = positions[(kind, list_key)] + SORT_GAP
+            else:
+                position = await db.scalar(APPEND_POSITION[kind], {
+                    "list_parent_id": item.parent_id,
+                    "list_date": item.scheduled_date,
+                    "list_category_id": item.category_id,
+                })
+            positions[(kind, list_key)] = position
+            rows.append({
+                "title": item.title,
+                "category_id": item.category_id,
+                "scheduled_date": item.scheduled_date if item.scheduled_date else None,
+                "color": item.color if item.color else None,
+                "recurring_pattern": item.recurring_pattern if item.recurring_pattern else None,
+                "parent_id": item.parent_id,
+                "sort_order": position,
+            })
+        created = sorted((await db.execute(BULK_CREATE_TODOS, rows)).scalars().all())
+    
+    # Updates setting the same fields share one statement
+    updates: Dict[tuple, list] = {}
+    for item in bulk.update:
+        values = item.model_dump(exclude_unset=True, exclude={"id"})
+        if values:
+            updates.setdefault(tuple(sorted(values)), []).append({**values, "todo_id": item.id})
+    for params in updates.values():
+        await db.execute(BULK_UPDATE_TODOS, params)
+    
+    deleted = []
+    if bulk.delete:
+        result = await db.execute(DELETE_TODO_TREES, {"todo_ids": bulk.delete})
+        deleted = sorted(result.scalars().all())
+    
+    await db.commit()
+    read_model.invalidate()
+    
+    return render_bulk({
+        "created": list(created),
+        "updated": sum(len(params) for params in updates.values()),
+        "deleted": deleted
+    })
+
 @router.put("/todos/{todo_id}", response_model=APIResponse)
 async def update_todo(
     todo_id: int = Path(..., description="Todo ID"),
@@ -49,39 +307,104 @@ async def update_todo(
 ):
     """Update an existing todo"""
     
-    # Get the todo
-    todo = await db.get(Todo, todo_id)
-    if not todo:
-        raise HTTPException(status_code=404, detail="Todo not found")
-    
     # Update fields that are provided
-    update_data = todo_data.dict(exclude_unset=True)
+    update_data = todo_data.model_dump(exclude_unset=True)
     if not update_data:
+        # A missing todo is still reported as 404
+        if await db.scalar(TODO_EXISTS, {"todo_id": todo_id}) is None:
+            raise HTTPException(status_code=404, detail="Todo not found")
         raise HTTPException(status_code=400, detail="No fields to update")
     
-    for field, value in update_data.items():
-        setattr(todo, field, value)
+    result = await db.execute(UPDATE_TODO, {**update_data, "todo_id": todo_id})
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Todo not found")
     
     await db.commit()
+    read_model.put_todo(row)
     
     return APIResponse(
         success=True,
         message="Todo updated successfully"
     )
 
+@router.post("/todos/{todo_id}/move", response_model=APIResponse)
+async def move_todo(
+    move: MoveRequest,
+    background_tasks: BackgroundTasks,
+    todo_id: int = Path(..., description="Todo ID"),
+    db: AsyncSession = Depends(get_db_session),
+    database: Database = Depends(get_request_database)
+):
+    """Move a todo between two neighbors, possibly into another day or someday list"""
+    
+    todo, after, before = await load_move_rows(db, Todo, todo_id, move, "todo")
+    
+    # Subtasks are only reordered among their siblings
+    for row in (after, before):
+        if row is not None and row.parent_id != todo.parent_id:
+            raise HTTPException(status_code=400, detail="Neighbors must have the same parent as the todo")
+    
+    # A top-level todo joins the list of its neighbors
+    neighbor = after or before
+    if todo.parent_id is not None:
+        list_key = (None, None, todo.parent_id)
+    else:
+        list_key = (neighbor.scheduled_date, None if neighbor.scheduled_date else neighbor.category_id)
+        if after and before and (before.scheduled_date, None if before.scheduled_date else before.category_id) != list_key:
+            raise HTTPException(status_code=400, detail="after_id and before_id are not in the same list")
+    conditions = todo_list_conditions(*list_key)
+    
+    position, crowded = await find_position(db, Todo, TODO_ORDER, conditions, todo_id, after, before)
+    respaced = position is None
+    if respaced:
+        # The neighbors share a sort order, renumber the list right away
+        await respace(db, Todo, TODO_ORDER, conditions)
+        for row in (after, before):
+            if row is not None:
+                await db.refresh(row)
+        position, crowded = await find_position(db, Todo, TODO_ORDER, conditions, todo_id, after, before)
+        if position is None:
+            raise HTTPException(status_code=400, detail="after_id must come before before_id")
+    
+    values = {"sort_order": position}
+    if todo.parent_id is None:
+        values["scheduled_date"] = neighbor.scheduled_date
+        if not neighbor.scheduled_date:
+            values["category_id"] = neighbor.category_id
+    result = await db.execute(UPDATE_TODO, {**values, "todo_id": todo_id})
+    row = result.one()
+    await db.commit()
+    if respaced:
+        read_model.invalidate()
+    else:
+        read_model.put_todo(row)
+    
+    if crowded:
+        background_tasks.add_task(respace_in_background, database, Todo, TODO_ORDER, conditions)
+        # Runs after the renumbering
+        background_tasks.add_task(read_model.invalidate)
+    
+    return APIResponse(
+        success=True,
+        message="Todo moved successfully",
+        data={"sort_order": position}
+    )
+
 @router.delete("/todos/{todo_id}", response_model=APIResponse)
 async def delete_todo(
     todo_id: int = Path(..., description="Todo ID"),
     db: AsyncSession = Depends(get_db_session)
 ):
-    """Delete a todo"""
+    """Delete a todo together with all of its subtasks"""
     
-    todo = await db.get(Todo, todo_id)
-    if not todo:
+    result = await db.execute(DELETE_TODO_TREES, {"todo_ids": [todo_id]})
+    deleted_ids = result.scalars().all()
+    if not deleted_ids:
         raise HTTPException(status_code=404, detail="Todo not found")
     
-    await db.delete(todo)
     await db.commit()
+    read_model.remove_todos(deleted_ids)
     
     return APIResponse(
         success=True,
@@ -89,43 +412,19 @@ async def delete_todo(
     )
 
 @router.post("/todos/migrate", response_model=APIResponse)
-async def migrate_past_todos(
+async def migrate_todos(
     db: AsyncSession = Depends(get_db_session)
 ):
     """Migrate incomplete todos from past dates to today"""
     
     today = datetime.now().strftime("%Y-%m-%d")
     
-    # Get all incomplete todos from past dates
-    query = select(Todo).where(
-        Todo.completed == False,
-        Todo.scheduled_date.isnot(None),
-        Todo.scheduled_date < today
-    )
-    
-    result = await db.execute(query)
-    past_todos = result.scalars().all()
-    
-    migrated_count = 0
-    for todo in past_todos:
-        old_date = todo.scheduled_date
-        
-        # Log the migration
-        migration = TodoMigration(
-            todo_id=todo.id,
-            from_date=old_date,
-            to_date=today
-        )
-        db.add(migration)
-        
-        # Update todo to today
-        todo.scheduled_date = today
-        migrated_count += 1
-    
+    migrated_count = await migrate_past_todos(db, today)
     await db.commit()
+    read_model.invalidate()
     
     return APIResponse(
         success=True,
         message=f"Migrated {migrated_count} todos to today",
         data={"migrated_count": migrated_count}
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,86 @@
+"""
+FastAPI TeuxDeux Clone - Single-Flight Reads
+Identical concurrent read requests share one in-flight computation
+"""
+
+import os
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+from fastapi import Response
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Let identical concurrent dashboard and category reads share one computation
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "true").lower() in ("1", "true", "yes")
+
+
+class SingleFlight:
+    """Concurrent ``run`` calls with the same key share one computation.
+
+    The first caller starts the computation as a task of its own and every
+    caller with the same key that arrives while it runs awaits that task, so
+    a herd of identical requests runs its queries once. Nothing is kept once
+    the task is done. A caller that gives up (client disconnect) does not
+    cancel the computation for the others, so computations must not use the
+    caller's database session.
+
+    ``invalidate`` is called on every commit: a read that starts after a
+    write never joins a computation that started before it.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self.generation = 0
+        self.executed = 0
+        self.shared = 0
+
+    def invalidate(self):
+        """Computations already running are not joined by later callers"""
+        self.generation += 1
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        if not SINGLE_FLIGHT:
+            self.executed += 1
+            return await compute()
+
+        flight_key = (self.generation, key)
+        task = self._flights.get(flight_key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._flights[flight_key] = task
+            task.add_done_callback(lambda done: self._land(flight_key, done))
+            self.executed += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _land(self, flight_key: Tuple[int, Hashable], task: asyncio.Task):
+        if self._flights.get(flight_key) is task:
+            del self._flights[flight_key]
+        # Retrieve the error even if every caller has gone away
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Shared read {flight_key[1]!r} failed: {task.exception()!r}")
+
+    def as_dict(self) -> dict:
+        return {"executed": self.executed, "shared": self.shared, "in_flight": len(self._flights)}
+
+
+# Shared by the dashboard and categories routes
+read_flights = SingleFlight()
+
+
+async def coalesce_response(key: Hashable, compute: Callable[[], Awaitable[Response]]) -> Response:
+    """Run ``compute`` through ``read_flights``; each caller gets its own copy of the response"""
+    response = await read_flights.run(key, compute)
+    return Response(content=response.body, status_code=response.status_code, media_type=response.media_type)
+
+
+def install_single_flight_invalidation(engine: AsyncEngine):
+    """Stop sharing computations that started before a commit on ``engine``"""
+
+    @event.listens_for(engine.sync_engine, "commit")
+    def _invalidate_flights(conn):
+        read_flights.invalidate()
@@ -0,0 +1,132 @@
+"""
+FastAPI TeuxDeux Clone - Slow Query Log
+Record slow SQL statements with their query plan through SQLAlchemy engine events
+"""
+
+import os
+import re
+import json
+import time
+import logging
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this many milliseconds are logged (0 disables the log)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG_DIR = os.getenv(
+    "SLOW_QUERY_LOG_DIR", "/app/logs" if os.path.isdir("/app/logs") else "./logs"
+)
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+
+# Route of the request that is currently being handled
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+# Dates are kept in the log, any other text (titles, names) is user content
+_SAFE_STRING = re.compile(r"^\d{4}-\d{2}-\d{2}([ T][\d:.]+)?$")
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+_slow_query_log: Optional[logging.Logger] = None
+
+
+def _get_slow_query_log() -> logging.Logger:
+    """Create the JSON-lines slow query log on first use"""
+    global _slow_query_log
+    if _slow_query_log is None:
+        os.makedirs(SLOW_QUERY_LOG_DIR, exist_ok=True)
+        handler = RotatingFileHandler(
+            os.path.join(SLOW_QUERY_LOG_DIR, "slow_queries.log"),
+            maxBytes=SLOW_QUERY_LOG_MAX_BYTES,
+            backupCount=SLOW_QUERY_LOG_BACKUPS,
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _slow_query_log = logging.getLogger("app.slow_query.records")
+        _slow_query_log.addHandler(handler)
+        _slow_query_log.setLevel(logging.INFO)
+        _slow_query_log.propagate = False
+    return _slow_query_log
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Replace user content in bound parameters, keeping numbers and dates"""
+    if isinstance(parameters, dict):
+        return {key: redact_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(value) for value in parameters]
+    if isinstance(parameters, str) and not _SAFE_STRING.match(parameters):
+        return f"<redacted:{len(parameters)} chars>"
+    if isinstance(parameters, (bytes, bytearray)):
+        return f"<redacted:{len(parameters)} bytes>"
+    return parameters
+
+
+def _explain(conn, statement: str, parameters) -> Optional[list]:
+    if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    try:
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+            return [row[-1] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    except Exception as e:
+        return [f"EXPLAIN failed: {e}"]
+
+
+def install_slow_query_log(engine: AsyncEngine, threshold_ms: float = SLOW_QUERY_MS):
+    """Log statements on ``engine`` that take longer than ``threshold_ms``"""
+    if threshold_ms <= 0:
+        return
+
+    # The start time lives on the execution context, which goes away with the
+    # statement, so statements that raise leave nothing behind on the connection
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start_time = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_start_time", None)
+        if started is None:
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms < threshold_ms:
+            return
+
+        route = current_route.get()
+        record = {
+            "timestamp": datetime.now().isoformat(),
+            "duration_ms": round(duration_ms, 2),
+            "route": route,
+            "statement": statement,
+            "parameters": redact_parameters(parameters),
+            "executemany": executemany,
+            "query_plan": None if executemany else _explain(conn, statement, parameters),
+        }
+        _get_slow_query_log().info(json.dumps(record, default=str))
+        logger.warning(f"Slow query ({duration_ms:.1f} ms) in {route}: {statement.split()[0]} ...")
+
+
+class RouteContextMiddleware:
+    """Remember the route of the current request for the slow query log"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_route.set(f"{scope['method']} {scope['path']}")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_route.reset(token)
@@ -0,0 +1,59 @@
+"""
+FastAPI TeuxDeux Clone - Statement Cache Statistics
+Hit rate of SQLAlchemy's compiled statement cache, reported by the health check
+"""
+
+import os
+import weakref
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Compiled statements kept per engine (SQLAlchemy's query_cache_size)
+SQL_STATEMENT_CACHE_SIZE = int(os.getenv("SQL_STATEMENT_CACHE_SIZE", "500"))
+
+
+class StatementCacheStats:
+    """Statements executed by this process that reused a compiled form (hits),
+    had to be compiled (misses) or bypass the cache (driver-level SQL such as
+    the PRAGMAs run on connect)
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+        self.engines = weakref.WeakSet()
+
+    def record(self, context):
+        cache_hit = getattr(context, "cache_hit", None)
+        if cache_hit == CACHE_HIT:
+            self.hits += 1
+        elif cache_hit == CACHE_MISS:
+            self.misses += 1
+        else:
+            self.uncached += 1
+
+    def as_dict(self) -> dict:
+        compiled = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncached": self.uncached,
+            "hit_rate": round(self.hits / compiled, 4) if compiled else None,
+            # Compiled statements currently held, over all engines (one per tenant)
+            "size": sum(len(engine._compiled_cache or ()) for engine in self.engines),
+            "capacity": SQL_STATEMENT_CACHE_SIZE,
+        }
+
+
+statement_cache_stats = StatementCacheStats()
+
+
+def install_statement_cache_stats(engine: AsyncEngine):
+    """Count compiled cache hits and misses of the statements run on ``engine``"""
+    statement_cache_stats.engines.add(engine.sync_engine)
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _record_cache_use(conn, cursor, statement, parameters, context, executemany):
+        statement_cache_stats.record(context)
@@ -0,0 +1,155 @@
+"""
+FastAPI TeuxDeux Clone - Static File Serving
+Precompressed, cache-friendly static assets and an in-memory index.html
+"""
+
+import os
+import hashlib
+import logging
+import mimetypes
+from typing import Dict, List, Optional, Tuple
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+from app.compression import available_encodings, choose_encoding, compress
+
+logger = logging.getLogger(__name__)
+
+# Content-hashed bundles never change under the same name
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# index.html must always be revalidated so new bundle names are picked up
+INDEX_CACHE_CONTROL = "no-cache"
+
+COMPRESSIBLE_EXTENSIONS = {".js", ".css", ".html", ".svg", ".json", ".map", ".txt"}
+MIN_COMPRESS_SIZE = 1024
+# Files compressed at build time are stored next to the original
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def _etag(data: bytes) -> str:
+    return '"' + hashlib.md5(data).hexdigest() + '"'
+
+
+def _is_not_modified(request_headers: Headers, etag: str) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+
+class CompressedVariants:
+    """Encoded copies of one file, keyed by content encoding"""
+
+    def __init__(self, media_type: str):
+        self.media_type = media_type
+        self.variants: Dict[str, Tuple[bytes, str]] = {}
+
+    def add(self, encoding: str, data: bytes):
+        self.variants[encoding] = (data, _etag(data))
+
+    def response(self, scope, headers: Optional[Dict[str, str]] = None) -> Optional[Response]:
+        """Build a response for the best encoding the client accepts, if any"""
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding"), self.variants)
+        if encoding is None:
+            return None
+        data, etag = self.variants[encoding]
+        response_headers = {"ETag": etag, "Vary": "Accept-Encoding", **(headers or {})}
+        if encoding != "identity":
+            response_headers["Content-Encoding"] = encoding
+        if _is_not_modified(request_headers, etag):
+            return Response(status_code=304, headers=response_headers)
+        if scope["method"] == "HEAD":
+            response_headers["Content-Length"] = str(len(data))
+            return Response(status_code=200, headers=response_headers, media_type=self.media_type)
+        return Response(content=data, headers=response_headers, media_type=self.media_type)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves .br/.gz variants and optionally marks files immutable.
+
+    Variants are picked up from files compressed at build time or created
+    in memory by ``precompress()`` at startup, so read-only static
+    directories work as well.
+    """
+
+    def __init__(self, *args, immutable: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable = immutable
+        self._compressed: Dict[str, CompressedVariants] = {}
+
+    def precompress(self) -> int:
+        """Load or create the compressed variants of all compressible files"""
+        count = 0
+        encodings = available_encodings()
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                extension = os.path.splitext(name)[1]
+                if extension not in COMPRESSIBLE_EXTENSIONS:
+                    continue
+                full_path = os.path.join(root, name)
+                if os.path.getsize(full_path) < MIN_COMPRESS_SIZE:
+                    continue
+                with open(full_path, "rb") as f:
+                    data = f.read()
+
+                media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                variants = CompressedVariants(media_type)
+                for encoding in encodings:
+                    built = full_path + PRECOMPRESSED_SUFFIXES[encoding]
+                    if os.path.exists(built):
+                        with open(built, "rb") as f:
+                            variants.add(encoding, f.read())
+                    else:
+                        variants.add(encoding, compress(data, encoding, static=True))
+
+                relative = os.path.normpath(os.path.relpath(full_path, self.directory))
+                self._compressed[relative] = variants
+                count += 1
+        logger.info(f"Precompressed {count} static files in {self.directory}")
+        return count
+
+    async def get_response(self, path: str, scope) -> Response:
+        variants = self._compressed.get(path)
+        response = None
+        if variants is not None and scope["method"] in ("GET", "HEAD"):
+            response = variants.response(scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+            if variants is not None:
+                response.headers["Vary"] = "Accept-Encoding"
+        if self.immutable and response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+
+class IndexPage:
+    """index.html resolved once and kept in memory with its compressed variants"""
+
+    def __init__(self, candidates: List[str]):
+        self.candidates = candidates
+        self.path: Optional[str] = None
+        self._variants: Optional[CompressedVariants] = None
+
+    def load(self) -> bool:
+        """Resolve the index path and read it into memory"""
+        for index_path in self.candidates:
+            if os.path.exists(index_path):
+                with open(index_path, "rb") as f:
+                    data = f.read()
+                variants = CompressedVariants("text/html")
+                for encoding in available_encodings():
+                    variants.add(encoding, compress(data, encoding, static=True))
+                variants.add("identity", data)
+                self.path = index_path
+                self._variants = variants
+                logger.info(f"Serving index.html from: {index_path}")
+                return True
+        logger.warning("index.html not found")
+        return False
+
+    def response(self, scope) -> Optional[Response]:
+        if self._variants is None:
+            return None
+        return self._variants.response(scope, headers={"Cache-Control": INDEX_CACHE_CONTROL})
@@ -0,0 +1,245 @@
+"""
+FastAPI TeuxDeux Clone - Productivity Statistics
+Weekly per-category rollups maintained incrementally by SQLite triggers
+"""
+
+import os
+import sys
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy import text
+from app.database import Database
+
+logger = logging.getLogger(__name__)
+
+# Week (starting Monday) of a todo: its scheduled date, or its creation date for someday todos
+def _week_of(row: str) -> str:
+    return (
+        f"COALESCE(date(COALESCE({row}.scheduled_date, {row}.created_at), 'weekday 0', '-6 days'), "
+        f"'unknown')"
+    )
+
+# Days from creation to the recorded completion (not to the last edit, which may come later);
+# archived todos carry their completion time in todos_archive.completed_at
+def _completion_days(row: str, completed_at: Optional[str] = None) -> str:
+    completed_at = completed_at or f"(SELECT completed_at FROM stats_completions WHERE todo_id = {row}.id)"
+    return (
+        f"CASE WHEN {row}.completed THEN COALESCE("
+        f"julianday({completed_at}) - julianday({row}.created_at), 0) ELSE 0 END"
+    )
+
+def _add_todo(row: str, sign: str) -> str:
+    """Upsert that adds (sign '+') or removes (sign '-') one todo's contribution"""
+    return f"""
+        INSERT INTO stats_weekly (category_id, week_start, total, completed, completion_days)
+        VALUES (
+            COALESCE({row}.category_id, 0),
+            {_week_of(row)},
+            {sign}1,
+            {sign}COALESCE({row}.completed, 0),
+            {sign}({_completion_days(row)})
+        )
+        ON CONFLICT (category_id, week_start) DO UPDATE SET
+            total = total + excluded.total,
+            completed = completed + excluded.completed,
+            completion_days = completion_days + excluded.completion_days;
+    """
+
+def _prune(row: str) -> str:
+    """Drop a rollup row that no longer counts anything"""
+    return f"""
+        DELETE FROM stats_weekly
+        WHERE category_id = COALESCE({row}.category_id, 0)
+        AND week_start = {_week_of(row)}
+        AND total = 0 AND rolled_forward = 0;
+    """
+
+# Archival sets this flag inside its transaction so moving rows out does not count as deleting them
+_ACTIVE = "(SELECT suspended FROM stats_state WHERE id = 1) = 0"
+
+STATISTICS_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS stats_weekly (
+        category_id INTEGER NOT NULL,
+        week_start TEXT NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        completed INTEGER NOT NULL DEFAULT 0,
+        completion_days REAL NOT NULL DEFAULT 0,
+        rolled_forward INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (category_id, week_start)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_stats_weekly_week_start ON stats_weekly (week_start)",
+    """
+    CREATE TABLE IF NOT EXISTS stats_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        suspended INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "INSERT OR IGNORE INTO stats_state (id, suspended) VALUES (1, 0)",
+    """
+    CREATE TABLE IF NOT EXISTS stats_completions (
+        todo_id INTEGER PRIMARY KEY,
+        completed_at TEXT NOT NULL
+    )
+    """,
+    # Recreated on startup so databases created by older versions get the current definitions
+    "DROP TRIGGER IF EXISTS stats_todos_insert",
+    "DROP TRIGGER IF EXISTS stats_todos_update",
+    "DROP TRIGGER IF EXISTS stats_todos_delete",
+    "DROP TRIGGER IF EXISTS stats_todo_migrations_insert",
+    f"""
+    CREATE TRIGGER stats_todos_insert AFTER INSERT ON todos
+    WHEN {_ACTIVE}
+    BEGIN
+        -- The id may have been used by a todo that was archived since
+        DELETE FROM stats_completions WHERE todo_id = NEW.id;
+        INSERT INTO stats_completions (todo_id, completed_at)
+        SELECT NEW.id, COALESCE(NEW.updated_at, NEW.created_at, CURRENT_TIMESTAMP) WHERE NEW.completed;
+        {_add_todo("NEW", "+")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER stats_todos_update AFTER UPDATE ON todos
+    WHEN {_ACTIVE}
+    BEGIN
+        {_add_todo("OLD", "-")}
+        {_prune("OLD")}
+        DELETE FROM stats_completions WHERE todo_id = NEW.id AND NOT COALESCE(NEW.completed, 0);
+        INSERT OR IGNORE INTO stats_completions (todo_id, completed_at)
+        SELECT NEW.id, CURRENT_TIMESTAMP WHERE NEW.completed;
+        {_add_todo("NEW", "+")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER stats_todos_delete AFTER DELETE ON todos
+    WHEN {_ACTIVE}
+    BEGIN
+        {_add_todo("OLD", "-")}
+        {_prune("OLD")}
+        DELETE FROM stats_completions WHERE todo_id = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER stats_todo_migrations_insert AFTER INSERT ON todo_migrations
+    BEGIN
+        INSERT INTO stats_weekly (category_id, week_start, rolled_forward)
+        VALUES (
+            COALESCE((SELECT category_id FROM todos WHERE id = NEW.todo_id), 0),
+            COALESCE(date(COALESCE(NEW.from_date, NEW.to_date), 'weekday 0', '-6 days'), 'unknown'),
+            1
+        )
+        ON CONFLICT (category_id, week_start) DO UPDATE SET
+            rolled_forward = rolled_forward + excluded.rolled_forward;
+    END
+    """,
+]
+
+SUSPEND_STATISTICS = text("UPDATE stats_state SET suspended = 1 WHERE id = 1")
+RESUME_STATISTICS = text("UPDATE stats_state SET suspended = 0 WHERE id = 1")
+
+
+async def ensure_statistics_tables(db: Database):
+    """Create the rollup tables and the triggers that maintain them.
+
+    When the completion times are new (a fresh database, or one from before
+    the rollups or completion times existed) they are filled in from the
+    todos already there and the rollups are rebuilt. Needs the archive
+    tables (``ensure_archive_tables``).
+    """
+    schema = db.archive_schema
+    async with db.engine.begin() as conn:
+        result = await conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats_completions'"
+        ))
+        upgrade = result.first() is None
+        archive_columns = [row[1] for row in await conn.execute(text(f"PRAGMA {schema}.table_info(todos_archive)"))]
+        if "completed_at" not in archive_columns:
+            await conn.execute(text(f"ALTER TABLE {schema}.todos_archive ADD COLUMN completed_at DATETIME"))
+            upgrade = True
+        for statement in STATISTICS_SCHEMA:
+            await conn.execute(text(statement))
+        if upgrade:
+            # The last edit is the best guess for when existing todos were completed
+            await conn.execute(text(f"""
+                UPDATE {schema}.todos_archive SET completed_at = COALESCE(
+                    (SELECT completed_at FROM stats_completions WHERE todo_id = todos_archive.id),
+                    updated_at, created_at, CURRENT_TIMESTAMP
+                )
+                WHERE completed AND completed_at IS NULL
+            """))
+            await conn.execute(text(
+                "DELETE FROM stats_completions WHERE todo_id NOT IN (SELECT id FROM todos WHERE completed)"
+            ))
+            await conn.execute(text("""
+                INSERT OR IGNORE INTO stats_completions (todo_id, completed_at)
+                SELECT id, COALESCE(updated_at, created_at, CURRENT_TIMESTAMP) FROM todos
+                WHERE completed
+            """))
+
+    if upgrade:
+        await rebuild_statistics(db)
+
+
+async def rebuild_statistics(db: Database):
+    """Recompute all rollups from the hot and archived todos (for recovery)"""
+    schema = db.archive_schema
+    todo_columns = "id, category_id, scheduled_date, completed, created_at, updated_at"
+    all_todos = (
+        f"SELECT {todo_columns}, "
+        f"(SELECT completed_at FROM stats_completions WHERE todo_id = todos.id) AS completed_at FROM todos "
+        f"UNION ALL SELECT {todo_columns}, completed_at FROM {schema}.todos_archive"
+    )
+    all_migrations = (
+        "SELECT todo_id, from_date, to_date FROM todo_migrations "
+        f"UNION ALL SELECT todo_id, from_date, to_date FROM {schema}.todo_migrations_archive"
+    )
+
+    async with db.SessionLocal() as session:
+        await session.execute(text("DELETE FROM stats_weekly"))
+        await session.execute(text(f"""
+            INSERT INTO stats_weekly (category_id, week_start, total, completed, completion_days)
+            SELECT COALESCE(t.category_id, 0), {_week_of("t")}, COUNT(*),
+                   SUM(COALESCE(t.completed, 0)), SUM({_completion_days("t", "t.completed_at")})
+            FROM ({all_todos}) t
+            WHERE true
+            GROUP BY 1, 2
+        """))
+        await session.execute(text(f"""
+            INSERT INTO stats_weekly (category_id, week_start, rolled_forward)
+            SELECT COALESCE(t.category_id, 0),
+                   COALESCE(date(COALESCE(m.from_date, m.to_date), 'weekday 0', '-6 days'), 'unknown'),
+                   COUNT(*)
+            FROM ({all_migrations}) m
+            LEFT JOIN ({all_todos}) t ON t.id = m.todo_id
+            WHERE true
+            GROUP BY 1, 2
+            ON CONFLICT (category_id, week_start) DO UPDATE SET
+                rolled_forward = excluded.rolled_forward
+        """))
+        await session.commit()
+
+    logger.info("Rebuilt productivity statistics")
+
+
+async def _rebuild_from_command_line():
+    from app.archive import ensure_archive_tables
+    
+    db = Database()
+    await db.initialize(os.getenv("DB_PATH", "./teuxdeux.db"),
+                        archive_path=os.getenv("ARCHIVE_DB_PATH"), seed_defaults=False)
+    try:
+        await ensure_archive_tables(db)
+        await ensure_statistics_tables(db)
+        await rebuild_statistics(db)
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        print("Usage: python -m app.statistics rebuild")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_rebuild_from_command_line())
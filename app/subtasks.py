@@ -0,0 +1,74 @@
+"""
+FastAPI TeuxDeux Clone - Subtasks
+Loading subtask trees with one recursive query
+"""
+
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import select, func, literal, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
+
+from app.models import Todo
+from app.ordering import TODO_ORDER
+
+# Deepest subtask level below a top-level todo (1 = subtasks without own subtasks)
+SUBTASK_MAX_DEPTH = int(os.getenv("SUBTASK_MAX_DEPTH", "5"))
+
+def subtask_tree(first_level):
+    """Recursive CTE of the ids of all subtasks, starting with the todos matching ``first_level``"""
+    tree = select(
+        Todo.id, literal(1).label("depth")
+    ).where(first_level).cte("subtasks", recursive=True)
+    child = aliased(Todo)
+    return tree.union_all(
+        select(child.id, tree.c.depth + 1).where(
+            child.parent_id == tree.c.id,
+            tree.c.depth < SUBTASK_MAX_DEPTH
+        )
+    )
+
+def _todo_depth_statement():
+    """Maximum depth of the ancestors of the todo bound as ``todo_id``"""
+    ancestors = select(
+        Todo.id, Todo.parent_id, literal(0).label("depth")
+    ).where(Todo.id == bindparam("todo_id")).cte("ancestors", recursive=True)
+    parent = aliased(Todo)
+    ancestors = ancestors.union_all(
+        select(parent.id, parent.parent_id, ancestors.c.depth + 1).where(
+            parent.id == ancestors.c.parent_id,
+            ancestors.c.depth <= SUBTASK_MAX_DEPTH
+        )
+    )
+    return select(func.max(ancestors.c.depth))
+
+# Built once; the todo ids are bound per execution
+TODO_DEPTH = _todo_depth_statement()
+_tree = subtask_tree(Todo.parent_id.in_(bindparam("root_ids", expanding=True)))
+SUBTASKS = (
+    select(Todo)
+    .options(joinedload(Todo.category))
+    .join(_tree, Todo.id == _tree.c.id)
+    .order_by(*TODO_ORDER)
+)
+
+async def todo_depth(db: AsyncSession, todo_id: int) -> Optional[int]:
+    """Nesting depth of a todo (0 for top-level todos), None if it does not exist"""
+    return await db.scalar(TODO_DEPTH, {"todo_id": todo_id})
+
+async def load_subtasks(db: AsyncSession, root_ids: Iterable[int]) -> Dict[int, List[Todo]]:
+    """Load all subtasks below the given todos in one WITH RECURSIVE query.
+
+    Returns the subtasks grouped by parent id, each group in display order,
+    so the trees can be assembled in a single pass.
+    """
+    children = defaultdict(list)
+    root_ids = list(root_ids)
+    if not root_ids:
+        return children
+
+    result = await db.execute(SUBTASKS, {"root_ids": root_ids})
+    for todo in result.scalars():
+        children[todo.parent_id].append(todo)
+    return children
@@ -0,0 +1,168 @@
+"""
+FastAPI TeuxDeux Clone - Multi-Tenant Database Pool
+One SQLite file per tenant, served by an LRU-bounded pool of lazily created engines
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from fastapi import HTTPException, Request
+
+from app.database import Database
+from app.archive import ensure_archive_tables
+from app.statistics import ensure_statistics_tables
+from app.migration import run_initial_migration
+from app.coordination import file_lock
+
+logger = logging.getLogger(__name__)
+
+MULTI_TENANT = os.getenv("MULTI_TENANT", "false").lower() in ("1", "true", "yes")
+TENANT_DB_DIR = os.getenv("TENANT_DB_DIR", "./tenants")
+TENANT_POOL_SIZE = int(os.getenv("TENANT_POOL_SIZE", "32"))
+TENANT_IDLE_SECONDS = int(os.getenv("TENANT_IDLE_SECONDS", "300"))
+
+TENANT_HEADER = "x-tenant-id"
+TENANT_PATH_PREFIX = "/t/"
+_TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def resolve_tenant_id(request: Request) -> str:
+    """Get the tenant of a request from the path prefix or the X-Tenant-ID header"""
+    tenant_id = request.scope.get("tenant") or request.headers.get(TENANT_HEADER)
+    if not tenant_id:
+        raise HTTPException(status_code=400, detail="Missing tenant")
+    if not _TENANT_ID_PATTERN.match(tenant_id):
+        raise HTTPException(status_code=400, detail="Invalid tenant")
+    return tenant_id
+
+
+class TenantPathMiddleware:
+    """Strip a /t/{tenant} prefix from the path and remember the tenant in the scope"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(TENANT_PATH_PREFIX):
+            tenant_id, _, rest = scope["path"][len(TENANT_PATH_PREFIX):].partition("/")
+            if tenant_id:
+                scope = dict(scope)
+                scope["tenant"] = tenant_id
+                scope["path"] = "/" + rest
+                scope["raw_path"] = scope["path"].encode()
+        await self.app(scope, receive, send)
+
+
+class TenantDatabasePool:
+    """LRU-bounded pool of per-tenant databases, each with its own AsyncEngine"""
+
+    def __init__(self, db_dir: str = TENANT_DB_DIR, max_size: int = TENANT_POOL_SIZE,
+                 idle_seconds: int = TENANT_IDLE_SECONDS):
+        self.db_dir = db_dir
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._databases: "OrderedDict[str, Database]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._init_locks: Dict[str, asyncio.Lock] = {}
+
+    async def get(self, tenant_id: str) -> Database:
+        """Get the database of a tenant, initializing its engine on first use"""
+        database = self._databases.get(tenant_id)
+        if database is None:
+            lock = self._init_locks.setdefault(tenant_id, asyncio.Lock())
+            async with lock:
+                database = self._databases.get(tenant_id)
+                if database is None:
+                    database = await self._open(tenant_id)
+                    self._databases[tenant_id] = database
+            self._init_locks.pop(tenant_id, None)
+            await self._evict_overflow()
+
+        self._databases.move_to_end(tenant_id)
+        self._last_used[tenant_id] = time.monotonic()
+        return database
+
+    async def _open(self, tenant_id: str) -> Database:
+        os.makedirs(self.db_dir, exist_ok=True)
+        db_path = os.path.join(self.db_dir, f"{tenant_id}.db")
+        database = Database()
+        # Other workers may be opening the same tenant at the same time
+        async with file_lock(f"{db_path}.init.lock"):
+            await database.initialize(db_path)
+            await ensure_archive_tables(database)
+            await ensure_statistics_tables(database)
+            await run_initial_migration(database)
+        logger.info(f"Opened database for tenant {tenant_id}")
+        return database
+
+    async def _close(self, tenant_id: str):
+        database = self._databases.pop(tenant_id, None)
+        self._last_used.pop(tenant_id, None)
+        if database:
+            # Checked-out connections stay valid until their session ends
+            await database.close()
+            logger.info(f"Closed database for tenant {tenant_id}")
+
+    async def _evict_overflow(self):
+        while len(self._databases) > self.max_size:
+            oldest = next(iter(self._databases))
+            await self._close(oldest)
+
+    async def evict_idle(self):
+        """Dispose the engines of tenants that have not been used recently"""
+        cutoff = time.monotonic() - self.idle_seconds
+        for tenant_id in [t for t, used in self._last_used.items() if used < cutoff]:
+            await self._close(tenant_id)
+
+    async def run_idle_sweeper(self, interval: Optional[int] = None):
+        """Periodically dispose idle engines until cancelled"""
+        interval = interval or max(self.idle_seconds // 2, 1)
+        while True:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+
+    def tenant_ids(self) -> List[str]:
+        """Tenants that have a database file in the pool's directory"""
+        if not os.path.isdir(self.db_dir):
+            return []
+        return sorted(
+            name[:-len(".db")] for name in os.listdir(self.db_dir)
+            if name.endswith(".db") and _TENANT_ID_PATTERN.match(name[:-len(".db")])
+        )
+
+    @asynccontextmanager
+    async def borrow(self, tenant_id: str) -> AsyncIterator[Database]:
+        """Database of a tenant for a background job.
+
+        Uses the pooled engine if the tenant is open, otherwise opens one just
+        for the job; the LRU order and idle times are left alone, so a job
+        never pushes the tenants that serve requests out of the pool.
+        """
+        database = self._databases.get(tenant_id)
+        if database is not None:
+            yield database
+            return
+        database = await self._open(tenant_id)
+        try:
+            yield database
+        finally:
+            await database.close()
+
+    async def run_for_each_tenant(self, job: Callable[[Database], Awaitable], name: str):
+        """Run ``job`` on every tenant database, one after another; a failing tenant is logged and skipped"""
+        for tenant_id in self.tenant_ids():
+            try:
+                async with self.borrow(tenant_id) as database:
+                    await job(database)
+            except Exception:
+                logger.exception(f"{name} failed for tenant {tenant_id}")
+
+    async def close(self):
+        """Dispose all tenant engines"""
+        for tenant_id in list(self._databases):
+            await self._close(tenant_id)
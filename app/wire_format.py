@@ -0,0 +1,117 @@
+"""
+FastAPI TeuxDeux Clone - Wire Formats
+JSON for browsers, compact MessagePack for machine clients that ask for it
+"""
+
+from contextvars import ContextVar
+from datetime import date, datetime
+from typing import Any, Callable, Optional
+
+import msgpack
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+# Names MessagePack goes by in Accept and Content-Type headers
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+# Whether the current request asked for MessagePack (set by NegotiatedRoute)
+compact_responses: ContextVar[bool] = ContextVar("compact_responses", default=False)
+
+# Keys of the Go-style nullable wrappers ({"Int64": 1, "Valid": true})
+_WRAPPED_KEYS = ("Int64", "String")
+
+
+def _quality(parameters: str) -> float:
+    for parameter in parameters.split(";"):
+        name, _, value = parameter.strip().partition("=")
+        if name == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def prefers_msgpack(accept: Optional[str]) -> bool:
+    """Whether an Accept header ranks MessagePack above JSON (ties go to JSON)"""
+    if not accept or "msgpack" not in accept:
+        return False
+    msgpack_q, json_q = 0.0, 0.0
+    for item in accept.split(","):
+        media_type, _, parameters = item.strip().partition(";")
+        media_type = media_type.strip().lower()
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_q = max(msgpack_q, _quality(parameters))
+        elif media_type in ("application/json", "application/*", "*/*"):
+            json_q = max(json_q, _quality(parameters))
+    return msgpack_q > json_q
+
+
+def is_msgpack(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.split(";")[0].strip().lower() in MSGPACK_MEDIA_TYPES
+
+
+def compact(value: Any) -> Any:
+    """Drop the nullable wrappers: ``{"Int64": 1, "Valid": true}`` becomes ``1``"""
+    if isinstance(value, dict):
+        if len(value) == 2 and "Valid" in value:
+            for key in _WRAPPED_KEYS:
+                if key in value:
+                    return value[key] if value["Valid"] else None
+        return {key: compact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [compact(item) for item in value]
+    return value
+
+
+def _encode_default(value: Any) -> Any:
+    # Same text as in the JSON responses
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} as MessagePack")
+
+
+def pack(content: Any) -> bytes:
+    """Compact MessagePack encoding of a response payload"""
+    return msgpack.packb(compact(content), default=_encode_default)
+
+
+class MsgpackRequest(Request):
+    """A request with a MessagePack body that FastAPI reads like a JSON body"""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = msgpack.unpackb(await self.body())
+        return self._json
+
+
+class NegotiatedRoute(APIRoute):
+    """Route class of the read and bulk routes.
+
+    ``Accept: application/msgpack`` makes EnvelopeRenderer answer in compact
+    MessagePack, and a ``Content-Type: application/msgpack`` body is decoded
+    and validated like JSON. Browsers keep getting JSON.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def negotiated_handler(request: Request) -> Response:
+            if is_msgpack(request.headers.get("content-type")):
+                scope = dict(request.scope)
+                scope["headers"] = [
+                    (name, b"application/json" if name == b"content-type" else value)
+                    for name, value in request.scope["headers"]
+                ]
+                request = MsgpackRequest(scope, request.receive)
+            token = compact_responses.set(prefers_msgpack(request.headers.get("accept")))
+            try:
+                response = await handler(request)
+            finally:
+                compact_responses.reset(token)
+            # Caches must keep both representations apart
+            response.headers.add_vary_header("Accept")
+            return response
+
+        return negotiated_handler
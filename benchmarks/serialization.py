@@ -0,0 +1,130 @@
+"""
+FastAPI TeuxDeux Clone - Serialization Benchmark
+Compares the CPU time of rendering a dashboard response the old way
+(validated models, .dict(), response_model re-validation, JSONResponse)
+with the EnvelopeRenderer path (plain dicts, one orjson pass to bytes).
+
+Usage: python -m benchmarks.serialization [todos_per_day] [iterations]
+"""
+
+import sys
+import time
+import asyncio
+from datetime import datetime, timedelta
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models import (
+    Todo, Category, TodoResponse, CategoryResponse, WeeklyTodos, DashboardData,
+    APIResponse, NullableInt64, NullableString
+)
+from app.responses import EnvelopeRenderer, todo_response, category_response
+
+
+def make_data(todos_per_day: int):
+    now = datetime.now()
+    categories = [
+        Category(id=i, name=f"Category {i}", color="#6b46c1", sort_order=i * 1024,
+                 created_at=now, updated_at=now)
+        for i in range(1, 6)
+    ]
+    days = []
+    next_id = 1
+    for day in range(7):
+        date = now + timedelta(days=day)
+        todos = []
+        for i in range(todos_per_day):
+            category = categories[i % len(categories)]
+            todos.append(Todo(
+                id=next_id, title=f"Todo {next_id}", completed=i % 3 == 0,
+                category_id=category.id, category=category,
+                scheduled_date=date.strftime("%Y-%m-%d"), sort_order=i * 1024,
+                color="#ff0000" if i % 2 else None, created_at=now, updated_at=now
+            ))
+            next_id += 1
+        days.append((date, todos))
+    return days, categories
+
+
+def validated_response(todo: Todo) -> TodoResponse:
+    """How responses were built before: every field validated"""
+    return TodoResponse(
+        id=todo.id,
+        title=todo.title,
+        completed=todo.completed,
+        category_id=NullableInt64(Int64=todo.category_id, Valid=True) if todo.category_id else None,
+        category_name=todo.category.name if todo.category else None,
+        category_color=todo.category.color if todo.category else None,
+        scheduled_date=NullableString(String=todo.scheduled_date, Valid=True) if todo.scheduled_date else None,
+        sort_order=todo.sort_order,
+        color=NullableString(String=todo.color, Valid=True) if todo.color else None,
+        recurring_pattern=None,
+        parent_id=None,
+        created_at=todo.created_at,
+        updated_at=todo.updated_at
+    )
+
+
+async def render_old(days, categories, field) -> bytes:
+    dashboard = DashboardData(
+        weekly_todos=[
+            WeeklyTodos(date=date.strftime("%Y-%m-%d"), day=date.strftime("%A"),
+                        todos=[validated_response(todo) for todo in todos])
+            for date, todos in days
+        ],
+        someday_todos=[],
+        categories=[CategoryResponse.model_validate(cat) for cat in categories],
+        today_date="2026-01-01",
+        week_start_date="2026-01-01"
+    )
+    content = APIResponse(success=True, data=dashboard.model_dump())
+    # What FastAPI does with response_model=APIResponse
+    encoded = await serialize_response(field=field, response_content=content, is_coroutine=True)
+    return JSONResponse(encoded).body
+
+
+def render_new(days, categories, renderer) -> bytes:
+    dashboard = {
+        "weekly_todos": [
+            {"date": date.strftime("%Y-%m-%d"), "day": date.strftime("%A"),
+             "todos": [todo_response(todo) for todo in todos]}
+            for date, todos in days
+        ],
+        "someday_todos": [],
+        "categories": [category_response(cat) for cat in categories],
+        "today_date": "2026-01-01",
+        "week_start_date": "2026-01-01"
+    }
+    return renderer(dashboard).body
+
+
+async def main(todos_per_day: int, iterations: int):
+    days, categories = make_data(todos_per_day)
+    field = create_response_field(name="response", type_=APIResponse)
+    renderer = EnvelopeRenderer(DashboardData)
+
+    old = await render_old(days, categories, field)
+    new = render_new(days, categories, renderer)
+    print(f"{7 * todos_per_day} todos, response {len(new)} bytes, "
+          f"identical JSON: {old.replace(b' ', b'') == new.replace(b' ', b'')}")
+
+    start = time.process_time()
+    for _ in range(iterations):
+        await render_old(days, categories, field)
+    old_ms = (time.process_time() - start) * 1000 / iterations
+
+    start = time.process_time()
+    for _ in range(iterations):
+        render_new(days, categories, renderer)
+    new_ms = (time.process_time() - start) * 1000 / iterations
+
+    print(f"old: {old_ms:.3f} ms CPU per request")
+    print(f"new: {new_ms:.3f} ms CPU per request ({old_ms / new_ms:.1f}x faster, "
+          f"{old_ms - new_ms:.3f} ms saved)")
+
+
+if __name__ == "__main__":
+    todos_per_day = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    asyncio.run(main(todos_per_day, iterations))
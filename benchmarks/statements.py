@@ -0,0 +1,92 @@
+"""
+FastAPI TeuxDeux Clone - Statement Construction Benchmark
+Compares the CPU time spent per request on building the SQL statements of
+the hot routes and deriving their compiled cache keys, for statements built
+per request with literal values (before) and the module-level statements
+with bound parameters (after). Compilation itself is cached in both cases.
+
+Usage: python -m benchmarks.statements [iterations]
+"""
+
+import sys
+import time
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.orm import aliased, joinedload, selectinload
+
+from app.models import Todo, Category
+from app.ordering import TODO_ORDER, CATEGORY_ORDER, append_position, todo_list_conditions
+from app.subtasks import subtask_tree, SUBTASKS
+from app.routers.dashboard import DAY_TODOS, SOMEDAY_TODOS, CATEGORIES
+from app.routers.todos import GET_TODO, CREATE_TODO, UPDATE_TODO, DELETE_TODO_TREES
+from app.routers import categories
+
+DATE = "2026-01-01"
+
+
+def dashboard_before():
+    """One dashboard request: 7 days, someday, subtasks and categories"""
+    statements = [
+        select(Todo).options(selectinload(Todo.category))
+        .where(Todo.scheduled_date == DATE, Todo.parent_id.is_(None)).order_by(*TODO_ORDER)
+        for _ in range(7)
+    ]
+    statements.append(
+        select(Todo).options(selectinload(Todo.category))
+        .where(Todo.scheduled_date.is_(None), Todo.parent_id.is_(None))
+        .order_by(Todo.category_id.asc(), *TODO_ORDER)
+    )
+    tree = subtask_tree(Todo.parent_id.in_([1, 2, 3]))
+    statements.append(
+        select(Todo).options(joinedload(Todo.category)).join(tree, Todo.id == tree.c.id).order_by(*TODO_ORDER)
+    )
+    statements.append(select(Category).order_by(*CATEGORY_ORDER))
+    return statements
+
+
+def dashboard_after():
+    return [DAY_TODOS[True]] * 7 + [SOMEDAY_TODOS[True], SUBTASKS, CATEGORIES]
+
+
+def writes_before():
+    """Get, create, update and delete of a todo, and a category list"""
+    subtree = select(Todo.id).where(Todo.id == 1).cte("subtree", recursive=True)
+    child = aliased(Todo)
+    subtree = subtree.union(select(child.id).where(child.parent_id == subtree.c.id))
+    return [
+        select(Todo).options(joinedload(Todo.category)).where(Todo.id == 1),
+        insert(Todo).values(
+            title="New", category_id=None, scheduled_date=DATE, color=None, recurring_pattern=None,
+            parent_id=None, sort_order=append_position(Todo, *todo_list_conditions(DATE, None))
+        ).returning(*Todo.__table__.c),
+        update(Todo).where(Todo.id == 1).values(completed=True).returning(*Todo.__table__.c),
+        delete(Todo).where(Todo.id.in_(select(subtree.c.id))).returning(Todo.id),
+        select(Category).order_by(Category.sort_order.asc(), Category.name.asc()),
+    ]
+
+
+def writes_after():
+    return [GET_TODO, CREATE_TODO["day"], UPDATE_TODO, DELETE_TODO_TREES, categories.CATEGORIES]
+
+
+def measure(build, iterations: int) -> float:
+    """Milliseconds of CPU per request to get every statement's cache key"""
+    start = time.process_time()
+    for _ in range(iterations):
+        for statement in build():
+            statement._generate_cache_key()
+    return (time.process_time() - start) * 1000 / iterations
+
+
+def main(iterations: int):
+    for name, before, after in (
+        ("dashboard", dashboard_before, dashboard_after),
+        ("todo writes", writes_before, writes_after),
+    ):
+        before_ms = measure(before, iterations)
+        after_ms = measure(after, iterations)
+        print(f"{name}: before {before_ms:.3f} ms, after {after_ms:.3f} ms CPU per request "
+              f"({before_ms / after_ms:.0f}x less, {before_ms - after_ms:.3f} ms saved)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -2,30 +2,39 @@
 
 # /// script
 # dependencies = [
-#   "pandas",
+#   "msgpack",
 #   "openpyxl",
 #   "requests"
 # ]
 # ///
 
+import sys
 import csv
 import requests
 import json
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 from pathlib import Path
-from typing import List, Dict, Optional, Any
-import pandas as pd
-from pprint import pprint
+from typing import List, Dict, Iterator, Optional, Any
+
+try:
+    import msgpack  # Compact API responses and request bodies
+except ImportError:
+    msgpack = None
 
 # --- Constants --- 
-# Keep constants for Excel reading
+# Calendar source: an Excel workbook, or a .csv/.ics export with the same events
 EXCEL_FILE_PATH: str = "/Users/niclasedge/Library/CloudStorage/OneDrive-DATAGROUPSE/Dokumente - DG Reporting HUB/Planung/cal.xlsx"
 EXCEL_TABLE_NAME: str = "kalender"
 EXCEL_SUBJECT_COL: str = "termin"
 EXCEL_START_COL: str = "start"
 EXCEL_END_COL: str = "end"
 EXCEL_LOCATION_COL: str = "location"
+# Text formats accepted for start/end besides ISO 8601
+SOURCE_DATETIME_FORMATS = ("%d.%m.%Y %H:%M", "%d.%m.%Y %H:%M:%S", "%Y%m%dT%H%M%SZ", "%Y%m%dT%H%M%S", "%Y%m%d")
+
+# Signatures of the events seen in previous runs (pass --full to ignore)
+EVENT_CACHE_PATH = Path.home() / ".cache" / "kalender_script" / "events.json"
 
 # Internal keys for processed data
 KEY_START_DT_OBJ = "start_dt_obj"
@@ -34,6 +43,8 @@ KEY_END_DT_OBJ = "end_dt_obj"
 # --- FastAPI Configuration ---
 FASTAPI_URL = 'http://localhost:8080'  # FastAPI backend URL
 TODO_DATE_FORMAT = "%Y-%m-%d"  # Date format for todo scheduled_date
+TODO_PAGE_SIZE = 500  # Todos per request when reading, creating or deleting todos
+MSGPACK_MEDIA_TYPE = "application/msgpack"
 
 # --- Timezone --- 
 LOCAL_TIMEZONE = 'Europe/Berlin'
@@ -42,36 +53,69 @@ LOCAL_TIMEZONE = 'Europe/Berlin'
 # FastAPI Todo Creation Functions
 # ==================================
 
-def get_existing_todos(base_url: str) -> List[Dict[str, Any]]:
-    """Fetches existing todos from FastAPI backend."""
+def api_headers() -> Dict[str, str]:
+    """Ask for MessagePack responses when msgpack is installed (JSON otherwise)."""
+    if msgpack is None:
+        return {}
+    return {'Accept': f"{MSGPACK_MEDIA_TYPE}, application/json;q=0.5"}
+
+def decode_response(response: requests.Response) -> Any:
+    """Decodes a MessagePack or JSON API response."""
+    if response.headers.get('Content-Type', '').startswith(MSGPACK_MEDIA_TYPE):
+        return msgpack.unpackb(response.content)
+    return response.json()
+
+def post_bulk(base_url: str, operations: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Sends creates/updates/deletes to the bulk endpoint, returns its result (None on errors)."""
+    headers = api_headers()
+    if msgpack is not None:
+        headers['Content-Type'] = MSGPACK_MEDIA_TYPE
+        body = msgpack.packb(operations)
+    else:
+        headers['Content-Type'] = 'application/json'
+        body = json.dumps(operations)
     try:
-        response = requests.get(f"{base_url}/api/v1/dashboard")
+        response = requests.post(f"{base_url}/api/v1/todos/bulk", headers=headers, data=body)
         response.raise_for_status()
-        data = response.json()
-        
-        if not data.get('success'):
-            print(f"API Error: {data.get('error')}")
-            return []
+        return decode_response(response).get('data')
+    except requests.exceptions.RequestException as e:
+        print(f"Bulk request failed: {e}")
+        if hasattr(e, 'response') and e.response is not None:
+            print(f"  Status: {e.response.status_code}")
+            print(f"  Response: {e.response.text[:500]}")
+        return None
+
+def get_existing_todos(base_url: str, from_date: Optional[str] = None, to_date: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Fetches existing scheduled top-level todos (optionally within a date range) page by page."""
+    params = {'scheduled': 'true', 'top_level': 'true', 'limit': TODO_PAGE_SIZE}
+    if from_date:
+        params['from'] = from_date
+    if to_date:
+        params['to'] = to_date
+    todos = []
+    try:
+        while True:
+            response = requests.get(f"{base_url}/api/v1/todos", params=params, headers=api_headers())
+            response.raise_for_status()
+            data = decode_response(response)
             
-        dashboard_data = data.get('data', {})
-        todos = []
-        
-        # Get todos from weekly_todos and someday_todos
-        for day_data in dashboard_data.get('weekly_todos', []):
-            if day_data.get('todos'):
-                todos.extend(day_data['todos'])
-                
-        todos.extend(dashboard_data.get('someday_todos', []))
-        
-        return todos
+            if not data.get('success'):
+                print(f"API Error: {data.get('error')}")
+                return []
+            
+            page = data.get('data', {})
+            todos.extend(page.get('todos', []))
+            if not page.get('next_cursor'):
+                return todos
+            params['cursor'] = page['next_cursor']
         
     except requests.exceptions.RequestException as e:
         print(f"Failed to fetch existing todos: {e}")
         return []
 
 def delete_calendar_todos(base_url: str) -> int:
-    """Deletes existing todos that were created from calendar events (contain time format HH:MM)."""
-    todos = get_existing_todos(base_url)
+    """Deletes upcoming todos that were created from calendar events (contain time format HH:MM)."""
+    todos = get_existing_todos(base_url, from_date=datetime.now().strftime(TODO_DATE_FORMAT))
     deleted_count = 0
     error_count = 0
     
@@ -92,143 +136,231 @@ def delete_calendar_todos(base_url: str) -> int:
     
     print(f"Found {len(calendar_todos)} calendar todos to delete...")
     
-    for todo in calendar_todos:
-        try:
-            response = requests.delete(f"{base_url}/api/v1/todos/{todo['id']}")
-            response.raise_for_status()
-            deleted_count += 1
+    for start in range(0, len(calendar_todos), TODO_PAGE_SIZE):
+        chunk = calendar_todos[start:start + TODO_PAGE_SIZE]
+        result = post_bulk(base_url, {'delete': [todo['id'] for todo in chunk]})
+        if result is None:
+            error_count += len(chunk)
+            continue
+        deleted_count += len(chunk)
+        for todo in chunk:
             print(f"Deleted todo: {todo['title']}")
-        except requests.exceptions.RequestException as e:
-            print(f"Failed to delete todo '{todo['title']}': {e}")
-            error_count += 1
             
     print(f"Deletion finished. Successfully deleted: {deleted_count}. Errors: {error_count}.")
     return deleted_count
 
-def create_todo(base_url: str, title: str, scheduled_date: str) -> bool:
-    """Creates a single todo in the FastAPI backend."""
-    payload = {
-        "title": title,
-        "scheduled_date": scheduled_date
-    }
-    
-    try:
-        response = requests.post(f"{base_url}/api/v1/todos", headers={'Content-Type': 'application/json'}, json=payload)
-        response.raise_for_status()
-        return True
-    except requests.exceptions.RequestException as e:
-        print(f"Failed to create todo '{title}': {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"  Status: {e.response.status_code}")
-            try: 
-                response_body = e.response.json()
-                print(f"  Response: {response_body}")
-            except json.JSONDecodeError: 
-                print(f"  Response: {e.response.text}")
-        return False
-    except Exception as e:
-         print(f"An unexpected error occurred during todo creation: {e}")
-         return False
+def create_todos(base_url: str, todos: List[Dict[str, str]]) -> int:
+    """Creates todos in the FastAPI backend in bulk requests, returns how many were created."""
+    created_count = 0
+    for start in range(0, len(todos), TODO_PAGE_SIZE):
+        chunk = todos[start:start + TODO_PAGE_SIZE]
+        result = post_bulk(base_url, {'create': chunk})
+        if result is None:
+            continue
+        created_count += len(result.get('created', []))
+        for todo in chunk:
+            print(f"Created todo: '{todo['title']}' for {todo['scheduled_date']}")
+    return created_count
 
 
 # ==================================
-# Excel Reading Function
+# Calendar Source Reading
 # ==================================
 
-def read_and_process_excel(file_path: Path, table_name: str) -> Optional[List[Dict[str, Any]]]:
-    """Reads the specified table/sheet from the Excel file, processes, and formats the data."""
-    if not file_path.exists():
-        print(f"Error: Excel file not found at {file_path}")
+def parse_datetime(value: Any) -> Optional[datetime]:
+    """Converts a cell value (datetime, date or string) to a datetime, None if invalid."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    if not isinstance(value, str) or not value.strip():
         return None
-
-    print(f"Attempting to read table/sheet '{table_name}' from: {file_path}")
+    value = value.strip()
     try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in SOURCE_DATETIME_FORMATS:
         try:
-            # Try reading the specified sheet name first
-            df = pd.read_excel(file_path, sheet_name=table_name)
-            print(f"Successfully read sheet '{table_name}'.")
-        except ValueError: # Sheet name not found
-            print(f"Sheet/Table '{table_name}' not found, trying the first sheet.")
-            df = pd.read_excel(file_path, sheet_name=0)
-            print("Successfully read the first sheet.")
-        
-        print(f"Read {len(df)} rows initially.")
-
-        # --- Data Cleaning and Preparation ---
-        # 1. Rename columns for consistency
-        rename_map = {
-            EXCEL_SUBJECT_COL: 'termin', # Keep original names if they match internal use
-            EXCEL_START_COL: 'start_str', # Read as string initially
-            EXCEL_END_COL: 'end_str',     # Read as string initially
-            EXCEL_LOCATION_COL: 'location' # Keep original name
-        }
-        # Only keep columns we need
-        required_cols_original = list(rename_map.keys())
-        df = df[required_cols_original].copy()
-        df.rename(columns=rename_map, inplace=True)
-        
-        # 2. Convert datetime strings to datetime objects
-        # Handle potential errors during conversion
-        df[KEY_START_DT_OBJ] = pd.to_datetime(df['start_str'], errors='coerce')
-        df[KEY_END_DT_OBJ] = pd.to_datetime(df['end_str'], errors='coerce')
-
-        # 3. Drop rows where datetime conversion failed
-        original_count = len(df)
-        df.dropna(subset=[KEY_START_DT_OBJ, KEY_END_DT_OBJ], inplace=True)
-        dropped_invalid_dt = original_count - len(df)
-        if dropped_invalid_dt > 0:
-            print(f"Dropped {dropped_invalid_dt} rows due to invalid datetime formats.")
-
-        # 4. Drop duplicates based on subject and the original datetime strings 
-        #    (or the converted objects, assuming successful conversion implies uniqueness)
-        #    Using subject + datetime objects is likely more robust.
-        duplicate_check_cols_internal = ['termin', KEY_START_DT_OBJ, KEY_END_DT_OBJ]
-        original_count = len(df)
-        df.drop_duplicates(subset=duplicate_check_cols_internal, keep='first', inplace=True)
-        dropped_duplicates = original_count - len(df)
-        if dropped_duplicates > 0:
-           print(f"Removed {dropped_duplicates} duplicate rows based on {duplicate_check_cols_internal}.")
-
-        print(f"{len(df)} unique rows remaining.")
-
-        # 5. Convert DataFrame to list of dictionaries
-        # Select only the columns needed for PocketBase sync + the datetime objects
-        final_cols = ['termin', KEY_START_DT_OBJ, KEY_END_DT_OBJ, 'location']
-        
-        # Ensure location column exists, add if not, and handle NaN for JSON compatibility
-        if 'location' not in df.columns:
-             df['location'] = None 
-        else:
-            # Replace pandas NaN with Python None before creating the dictionary
-            df['location'] = df['location'].astype(object).where(pd.notna(df['location']), None)
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        # ICS times ending in Z are UTC
+        return parsed.replace(tzinfo=timezone.utc) if value.endswith('Z') else parsed
+    return None
 
-        df_final = df[final_cols].copy()
-        # Rename 'termin' back to the original excel subject column name if needed by sync_events
-        # Currently sync_events uses EXCEL_SUBJECT_COL which maps to 'termin' internally here
-        # df_final.rename(columns={'termin': EXCEL_SUBJECT_COL}, inplace=True) 
-        
-        events_list = df_final.to_dict('records')
-        return events_list
+def iter_excel_rows(file_path: Path, table_name: str) -> Iterator[Dict[str, Any]]:
+    """Streams the rows of the calendar sheet without loading the whole workbook."""
+    from openpyxl import load_workbook  # Only needed for Excel sources
 
-    except FileNotFoundError:
-        print(f"Error: Excel file not found at {file_path}")
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        if table_name in workbook.sheetnames:
+            sheet = workbook[table_name]
+        else:
+            print(f"Sheet/Table '{table_name}' not found, reading the first sheet.")
+            sheet = workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+        for row in rows:
+            yield dict(zip(header, row))
+    finally:
+        workbook.close()
+
+def iter_csv_rows(file_path: Path) -> Iterator[Dict[str, Any]]:
+    """Streams the rows of a CSV export with the same columns as the Excel table."""
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        yield from csv.DictReader(f)
+
+def iter_ics_rows(file_path: Path) -> Iterator[Dict[str, Any]]:
+    """Streams the VEVENTs of an iCalendar file as rows with the Excel column names."""
+    fields = {'SUMMARY': EXCEL_SUBJECT_COL, 'DTSTART': EXCEL_START_COL,
+              'DTEND': EXCEL_END_COL, 'LOCATION': EXCEL_LOCATION_COL}
+    event = None
+    previous = None
+
+    def handle(line: str):
+        nonlocal event
+        if line == 'BEGIN:VEVENT':
+            event = {}
+        elif line == 'END:VEVENT' and event is not None:
+            yield event
+            event = None
+        elif event is not None and ':' in line:
+            name, value = line.split(':', 1)
+            name = name.split(';', 1)[0].upper()  # Drop parameters like TZID
+            if name in fields:
+                event[fields[name]] = value.replace('\\,', ',').replace('\\n', ' ')
+
+    with open(file_path, encoding='utf-8') as f:
+        for raw_line in f:
+            line = raw_line.rstrip('\r\n')
+            # Folded lines continue with a leading space or tab
+            if line[:1] in (' ', '\t') and previous is not None:
+                previous += line[1:]
+                continue
+            if previous is not None:
+                yield from handle(previous)
+            previous = line
+        if previous is not None:
+            yield from handle(previous)
+
+def iter_source_rows(file_path: Path, table_name: str) -> Iterator[Dict[str, Any]]:
+    """Streams raw rows from an Excel, CSV or ICS calendar source."""
+    suffix = file_path.suffix.lower()
+    if suffix == '.csv':
+        return iter_csv_rows(file_path)
+    if suffix == '.ics':
+        return iter_ics_rows(file_path)
+    return iter_excel_rows(file_path, table_name)
+
+def iter_calendar_events(file_path: Path, table_name: str) -> Iterator[Dict[str, Any]]:
+    """Streams valid, de-duplicated events from the calendar source."""
+    seen = set()
+    invalid_count = 0
+    duplicate_count = 0
+    for row in iter_source_rows(file_path, table_name):
+        start_dt = parse_datetime(row.get(EXCEL_START_COL))
+        end_dt = parse_datetime(row.get(EXCEL_END_COL))
+        if start_dt is None or end_dt is None:
+            invalid_count += 1
+            continue
+        summary = row.get(EXCEL_SUBJECT_COL)
+        # Duplicates share subject, start and end; the first one wins
+        key = (summary, start_dt, end_dt)
+        if key in seen:
+            duplicate_count += 1
+            continue
+        seen.add(key)
+        location = row.get(EXCEL_LOCATION_COL)
+        yield {
+            'termin': str(summary).strip() if summary is not None else None,
+            KEY_START_DT_OBJ: start_dt,
+            KEY_END_DT_OBJ: end_dt,
+            'location': str(location) if location not in (None, '') else None,
+        }
+    if invalid_count:
+        print(f"Dropped {invalid_count} rows due to invalid datetime formats.")
+    if duplicate_count:
+        print(f"Removed {duplicate_count} duplicate rows.")
+
+def event_signature(event: Dict[str, Any]) -> List[Any]:
+    """JSON-serializable identity of a normalized event, used by the cache."""
+    return [event['termin'], event[KEY_START_DT_OBJ].isoformat(),
+            event[KEY_END_DT_OBJ].isoformat(), event['location']]
+
+def load_event_cache(cache_path: Path) -> Dict[str, Any]:
+    """Loads the cached event signatures of previous runs, keyed by source path."""
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_event_cache(cache_path: Path, cache: Dict[str, Any]):
+    """Writes the event cache atomically."""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = cache_path.with_suffix('.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    temp_path.replace(cache_path)
+
+def read_changed_events(file_path: Path, table_name: str, cache: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Returns the events that are new or changed since the run recorded in `cache`.
+
+    An unchanged file (same mtime and size) is not opened at all. Otherwise
+    the rows are streamed and compared with the cached signatures; the cache
+    entry is updated in place and only written by the caller after a
+    successful sync.
+    """
+    if not file_path.exists():
+        print(f"Error: calendar file not found at {file_path}")
         return None
+
+    stat = file_path.stat()
+    key = str(file_path.resolve())
+    cached = cache.get(key)
+    if cached and cached.get('mtime_ns') == stat.st_mtime_ns and cached.get('size') == stat.st_size:
+        print(f"{file_path.name} is unchanged since the last run.")
+        return []
+
+    print(f"Reading '{table_name}' from: {file_path}")
+    previous = {tuple(signature) for signature in cached['events']} if cached else set()
+    signatures = []
+    changed_events = []
+    try:
+        for event in iter_calendar_events(file_path, table_name):
+            signature = event_signature(event)
+            signatures.append(signature)
+            if tuple(signature) not in previous:
+                changed_events.append(event)
     except Exception as e:
-        print(f"Error reading or processing Excel file: {e}")
+        print(f"Error reading calendar file: {e}")
         import traceback
         traceback.print_exc()
         return None
 
+    print(f"{len(signatures)} unique events, {len(changed_events)} new or changed since the last run.")
+    cache[key] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'events': signatures}
+    return changed_events
+
 # ==================================
 # Main Sync Logic
 # ==================================
 
-def sync_events(local_events: List[Dict[str, Any]], base_url: str):
-    """Creates todos from calendar events in the FastAPI backend."""
-    print(f"\nCreating {len(local_events)} todos from Excel calendar events...")
+def sync_events(local_events: List[Dict[str, Any]], base_url: str) -> int:
+    """Creates todos from calendar events in the FastAPI backend, returns the number of failed creates."""
+    print(f"\nCreating {len(local_events)} todos from calendar events...")
     
-    # First, get all existing todos to check for duplicates
-    existing_todos = get_existing_todos(base_url)
+    # First, get the existing todos on the events' dates to check for duplicates
+    # (a day of margin on both sides for the timezone conversion below)
+    start_dates = [event[KEY_START_DT_OBJ].date() for event in local_events if event.get(KEY_START_DT_OBJ)]
+    if start_dates:
+        from_date = (min(start_dates) - timedelta(days=1)).strftime(TODO_DATE_FORMAT)
+        to_date = (max(start_dates) + timedelta(days=1)).strftime(TODO_DATE_FORMAT)
+        existing_todos = get_existing_todos(base_url, from_date, to_date)
+    else:
+        existing_todos = []
     existing_todo_signatures = set()
     
     # Create signatures for existing todos (title + date combination)
@@ -246,14 +378,13 @@ def sync_events(local_events: List[Dict[str, Any]], base_url: str):
     
     print(f"Found {len(existing_todo_signatures)} existing todos to check against duplicates.")
     
-    created_count = 0
+    new_todos = []
     skipped_count = 0
     duplicate_count = 0
-    error_count = 0
     local_tz = ZoneInfo(LOCAL_TIMEZONE) # E.g., 'Europe/Berlin'
 
     for event in local_events:
-        summary = event.get('termin') # Field name from read_and_process_excel
+        summary = event.get('termin') # Field name from iter_calendar_events
         start_dt = event.get(KEY_START_DT_OBJ)
         end_dt = event.get(KEY_END_DT_OBJ)
         location = event.get('location', None) # Optional
@@ -265,9 +396,9 @@ def sync_events(local_events: List[Dict[str, Any]], base_url: str):
 
         try:
             # Ensure datetime objects are timezone-aware (assuming local time from Excel)
-            # Handle cases where datetime might already be aware (though unlikely from pandas)
-            start_dt_local = local_tz.localize(start_dt) if getattr(start_dt, 'tzinfo', None) is None else start_dt.astimezone(local_tz)
-            end_dt_local = local_tz.localize(end_dt) if getattr(end_dt, 'tzinfo', None) is None else end_dt.astimezone(local_tz)
+            # ICS sources may already carry a timezone (UTC)
+            start_dt_local = start_dt.replace(tzinfo=local_tz) if start_dt.tzinfo is None else start_dt.astimezone(local_tz)
+            end_dt_local = end_dt.replace(tzinfo=local_tz) if end_dt.tzinfo is None else end_dt.astimezone(local_tz)
 
         except Exception as e:
             print(f"Error processing timezone for event '{summary}': {e}")
@@ -295,14 +426,13 @@ def sync_events(local_events: List[Dict[str, Any]], base_url: str):
             duplicate_count += 1
             continue
 
-        # Create the todo using the helper function
-        if create_todo(base_url, todo_title, scheduled_date):
-            print(f"Created todo: '{todo_title}' for {scheduled_date}")
-            created_count += 1
-            # Add to existing signatures to prevent duplicates within this run
-            existing_todo_signatures.add(todo_signature)
-        else:
-            error_count += 1 # create_todo prints the specific error
+        new_todos.append({"title": todo_title, "scheduled_date": scheduled_date})
+        # Add to existing signatures to prevent duplicates within this run
+        existing_todo_signatures.add(todo_signature)
+
+    # Create the todos in bulk requests (create_todos prints the specific errors)
+    created_count = create_todos(base_url, new_todos)
+    error_count = len(new_todos) - created_count
 
     print("\nTodo creation finished.")
     print(f"  Events processed for creation: {len(local_events)}")
@@ -310,6 +440,7 @@ def sync_events(local_events: List[Dict[str, Any]], base_url: str):
     print(f"  Skipped duplicates: {duplicate_count}")
     print(f"  Skipped (missing data/TZ error): {skipped_count}")
     print(f"  Errors during creation: {error_count}")
+    return error_count
 
 # ==================================
 # Main Execution
@@ -318,16 +449,17 @@ def main():
     """Main function to run the script."""
     print("Starting calendar to todo sync script...\n")
 
-    # 1. Read and process Excel data
-    excel_path = Path(EXCEL_FILE_PATH)
-    local_events = read_and_process_excel(excel_path, EXCEL_TABLE_NAME)
+    # 1. Read the events that changed since the last run
+    full_sync = "--full" in sys.argv[1:]
+    cache = {} if full_sync else load_event_cache(EVENT_CACHE_PATH)
+    local_events = read_changed_events(Path(EXCEL_FILE_PATH), EXCEL_TABLE_NAME, cache)
     if local_events is None:
-        print("Exiting due to error reading Excel file.")
+        print("Exiting due to error reading the calendar file.")
         return
     if not local_events:
-        print("No events found in the Excel file. Exiting.")
+        print("No new or changed events. Exiting.")
+        save_event_cache(EVENT_CACHE_PATH, cache)
         return
-    print(f"Successfully processed {len(local_events)} unique events from Excel.")
 
     # 2. Test FastAPI connection
     try:
@@ -340,7 +472,13 @@ def main():
         return
 
     # 3. Create todos from calendar events (duplicates will be skipped automatically)
-    sync_events(local_events, FASTAPI_URL)
+    error_count = sync_events(local_events, FASTAPI_URL)
+    # Only remember the events once they have been handed to the backend; after
+    # errors the next run reads them again (existing todos are skipped as duplicates)
+    if error_count:
+        print("Not updating the event cache, the failed events are retried on the next run.")
+    else:
+        save_event_cache(EVENT_CACHE_PATH, cache)
 
     print("\nScript finished.")
 
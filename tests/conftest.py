@@ -0,0 +1,101 @@
+"""
+FastAPI TeuxDeux Clone - Test Fixtures
+Runs app.main:app in-process against a temporary, seeded SQLite database
+"""
+
+import os
+import time
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Configuration is read at import time, so it has to be set before the app is imported
+_test_dir = tempfile.mkdtemp(prefix="teuxdeux-tests-")
+os.environ.update({
+    "DB_PATH": os.path.join(_test_dir, "teuxdeux.db"),
+    "BACKUP_DIR": os.path.join(_test_dir, "backups"),
+    "SLOW_QUERY_LOG_DIR": os.path.join(_test_dir, "logs"),
+    "RESPONSE_VALIDATION": "true",
+    "ADMISSION_CONTROL": "false",
+    "ARCHIVE_INTERVAL_SECONDS": "0",
+})
+os.environ.pop("ADMIN_TOKEN", None)
+os.environ.pop("MULTI_TENANT", None)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app.dependencies import get_database
+
+# Fixed dataset: per day of the dashboard week, someday todos per category, subtasks per todo
+TODOS_PER_DAY = 15
+SOMEDAY_TODOS_PER_CATEGORY = 10
+SUBTASKS_PER_TODO = 2
+PAST_TODOS = 20
+
+
+class QueryCounter:
+    """SQL statements executed while active, and the wall-clock time"""
+
+    def __init__(self):
+        self.statements = []
+        self.elapsed_ms = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def describe(self) -> str:
+        return "\n".join(f"  {i + 1}. {' '.join(s.split())[:160]}" for i, s in enumerate(self.statements))
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        _seed(test_client)
+        yield test_client
+
+
+def _seed(client: TestClient):
+    today = datetime.now()
+    for day in range(7):
+        date = (today + timedelta(days=day)).strftime("%Y-%m-%d")
+        for i in range(TODOS_PER_DAY):
+            response = client.post("/api/v1/todos", json={
+                "title": f"Todo {day}-{i}", "scheduled_date": date, "category_id": i % 5 + 1
+            })
+            todo_id = response.json()["data"]["id"]
+            if i % 5 == 0:
+                for j in range(SUBTASKS_PER_TODO):
+                    client.post("/api/v1/todos", json={"title": f"Subtask {j}", "parent_id": todo_id})
+    for category_id in range(1, 6):
+        for i in range(SOMEDAY_TODOS_PER_CATEGORY):
+            client.post("/api/v1/todos", json={"title": f"Someday {i}", "category_id": category_id})
+    for i in range(PAST_TODOS):
+        date = (today - timedelta(days=i + 1)).strftime("%Y-%m-%d")
+        client.post("/api/v1/todos", json={"title": f"Past {i}", "scheduled_date": date})
+
+
+@pytest.fixture
+def count_queries():
+    """Context manager counting the SQL statements of the requests made inside it"""
+
+    @contextmanager
+    def counting():
+        counter = QueryCounter()
+        engine = get_database().engine.sync_engine
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            counter.statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        started = time.perf_counter()
+        try:
+            yield counter
+        finally:
+            counter.elapsed_ms = (time.perf_counter() - started) * 1000
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return counting
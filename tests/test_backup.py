@@ -0,0 +1,64 @@
+"""
+FastAPI TeuxDeux Clone - Backups
+Backups finish under a steady write load, never overwrite each other, and
+retention only ever deletes the backups of the database that was backed up.
+"""
+
+import asyncio
+import sqlite3
+from types import SimpleNamespace
+
+from app import backup
+
+
+def _database(path) -> str:
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("CREATE TABLE items (value BLOB)")
+        connection.executemany("INSERT INTO items VALUES (?)", [(b"x" * 1000,)] * 500)
+    connection.close()
+    return str(path)
+
+
+def test_pruning_keeps_other_databases(tmp_path, monkeypatch):
+    monkeypatch.setattr(backup, "BACKUP_DIR", str(tmp_path))
+    monkeypatch.setattr(backup, "BACKUP_RETAIN", 2)
+    names = [f"acme-2026010{day}-120000.db" for day in range(1, 3)]
+    names += [f"acme-2026010{day}-120000-000001.db" for day in range(3, 5)]
+    others = ["acme-corp-20260101-120000.db", "acme-notes.db"]
+    for name in names + others:
+        (tmp_path / name).write_bytes(b"")
+
+    backup._prune_backups("acme")
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(names[-2:] + others)
+
+
+def test_backup_under_constant_writes_falls_back_to_one_step(tmp_path, monkeypatch):
+    source_path = _database(tmp_path / "busy.db")
+    writer = sqlite3.connect(source_path, isolation_level=None)
+
+    def write_between_steps(seconds):
+        writer.execute("INSERT INTO items VALUES (x'00')")
+
+    monkeypatch.setattr(backup, "BACKUP_PAGES_PER_STEP", 10)
+    monkeypatch.setattr(backup, "BACKUP_MAX_RESTARTS", 3)
+    monkeypatch.setattr(backup.time, "sleep", write_between_steps)
+    result = backup._backup_file(source_path, str(tmp_path / "copy.db"))
+    writer.close()
+
+    assert result["full_copy"] and result["restarts"] == 4
+    copy = sqlite3.connect(tmp_path / "copy.db")
+    assert copy.execute("SELECT count(*) FROM items").fetchone()[0] >= 500
+    copy.close()
+
+
+def test_backups_in_the_same_second_keep_both(tmp_path, monkeypatch):
+    monkeypatch.setattr(backup, "BACKUP_DIR", str(tmp_path / "backups"))
+    database = SimpleNamespace(db_path=_database(tmp_path / "main.db"), archive_path=None)
+
+    async def twice():
+        return await asyncio.gather(backup.backup_database(database), backup.backup_database(database))
+
+    first, second = asyncio.run(twice())
+    assert first["files"][0]["file"] != second["files"][0]["file"]
+    assert len(list((tmp_path / "backups").iterdir())) == 2
@@ -0,0 +1,24 @@
+"""
+FastAPI TeuxDeux Clone - Response Compression
+Whether a response is compressed depends on Accept-Encoding, so every
+compressible response says so in Vary, compressed or not.
+"""
+
+import pytest
+
+
+@pytest.mark.parametrize("path,accept_encoding,compressed", [
+    ("/api/v1/dashboard", "gzip", True),
+    ("/api/v1/dashboard", "identity", False),
+    ("/api/v1/todos/999999", "gzip", False),
+])
+def test_vary_on_every_compressible_response(client, path, accept_encoding, compressed):
+    response = client.get(path, headers={"Accept-Encoding": accept_encoding})
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert ("content-encoding" in response.headers) is compressed
+
+
+def test_uncompressible_responses_do_not_vary(client):
+    response = client.get("/api/v1/dashboard", headers={"Accept": "application/msgpack"})
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" not in response.headers.get("vary", "")
@@ -0,0 +1,50 @@
+"""
+FastAPI TeuxDeux Clone - Dashboard Sections and Fields
+Sparse dashboards must be exact projections of the full dashboard.
+"""
+
+import pytest
+
+from app.responses import TODO_FIELDS
+
+
+def _project(todo: dict, fields: list) -> dict:
+    projected = {field: todo[field] for field in TODO_FIELDS if field in fields or field == "id"}
+    if "children" in fields:
+        projected["children"] = [_project(child, fields) for child in todo["children"]]
+    return projected
+
+
+@pytest.mark.parametrize("fields", [
+    ["title", "completed"],
+    ["title", "category_name", "scheduled_date", "children"],
+    ["children", "updated_at"],
+])
+def test_fields_are_a_projection_of_the_full_dashboard(client, fields):
+    full = client.get("/api/v1/dashboard").json()["data"]
+    sparse = client.get(f"/api/v1/dashboard?fields={','.join(fields)}").json()["data"]
+
+    assert sparse["categories"] == full["categories"]
+    assert sparse["someday_todos"] == [_project(todo, fields) for todo in full["someday_todos"]]
+    for sparse_day, full_day in zip(sparse["weekly_todos"], full["weekly_todos"], strict=True):
+        assert sparse_day["date"] == full_day["date"]
+        assert sparse_day["todos"] == [_project(todo, fields) for todo in full_day["todos"]]
+
+
+def test_include_returns_only_the_requested_sections(client):
+    full = client.get("/api/v1/dashboard?weekOffset=7").json()["data"]
+
+    week = client.get("/api/v1/dashboard?weekOffset=7&include=week").json()["data"]
+    assert set(week) == {"weekly_todos", "today_date", "week_start_date"}
+    assert week["weekly_todos"] == full["weekly_todos"]
+
+    lists = client.get("/api/v1/dashboard?weekOffset=7&include=someday,categories").json()["data"]
+    assert set(lists) == {"someday_todos", "categories", "today_date", "week_start_date"}
+    assert lists["someday_todos"] == full["someday_todos"]
+    assert lists["categories"] == full["categories"]
+
+
+@pytest.mark.parametrize("query", ["include=week,todos", "fields=title,owner"])
+def test_unknown_sections_and_fields_are_rejected(client, query):
+    response = client.get(f"/api/v1/dashboard?{query}")
+    assert response.status_code == 400
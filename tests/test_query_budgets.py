@@ -0,0 +1,156 @@
+"""
+FastAPI TeuxDeux Clone - Query and Latency Budgets
+Each endpoint declares how many SQL statements and how much wall-clock time
+one request may take on the seeded dataset. An N+1 regression shows up as a
+statement count that exceeds the budget (or grows with the data).
+"""
+
+import os
+from datetime import datetime
+
+import pytest
+
+# Wall-clock budgets are generous; scale them up on slow machines
+LATENCY_BUDGET_SCALE = float(os.getenv("LATENCY_BUDGET_SCALE", "1"))
+
+TODAY = datetime.now().strftime("%Y-%m-%d")
+
+# (method, path, json body, max statements, max milliseconds)
+READ_BUDGETS = [
+    # 7 days + their categories, someday + categories, subtasks, category list
+    ("GET", "/api/v1/dashboard", None, 18, 1000),
+    ("GET", "/api/v1/dashboard?weekOffset=7", None, 18, 1000),
+    # Week navigation: 7 days; categories and subtasks only when their fields are requested
+    ("GET", "/api/v1/dashboard?weekOffset=7&include=week&fields=title,completed,sort_order", None, 7, 500),
+    ("GET", "/api/v1/dashboard?weekOffset=7&include=week&fields=title,category_name,children", None, 15, 1000),
+    ("GET", "/api/v1/dashboard?include=someday,categories", None, 4, 500),
+    ("GET", "/api/v1/categories", None, 1, 250),
+    ("GET", "/api/v1/todos?limit=500", None, 1, 500),
+    ("GET", f"/api/v1/todos?from={TODAY}&to={TODAY}&completed=false&top_level=true", None, 1, 250),
+    ("GET", "/api/v1/todos?ids=1,2,3,4,5,6,7,8,9,10", None, 1, 250),
+    ("GET", "/api/v1/todos/1", None, 2, 250),
+    ("GET", f"/api/v1/calendar?from={TODAY[:4]}-01-01&to={TODAY[:4]}-12-31", None, 1, 250),
+    ("GET", f"/api/v1/calendar?from={TODAY[:4]}-01-01&to={TODAY[:4]}-12-31&categories=true", None, 1, 250),
+    ("GET", "/api/v1/stats", None, 1, 250),
+    ("GET", "/api/v1/archive/todos", None, 1, 250),
+]
+
+
+def assert_within_budget(counter, response, max_queries: int, max_ms: float):
+    assert response.status_code == 200, response.text
+    assert counter.count <= max_queries, (
+        f"{counter.count} SQL statements, budget is {max_queries}:\n{counter.describe()}"
+    )
+    assert counter.elapsed_ms <= max_ms * LATENCY_BUDGET_SCALE, (
+        f"{counter.elapsed_ms:.0f} ms, budget is {max_ms * LATENCY_BUDGET_SCALE:.0f} ms"
+    )
+
+
+@pytest.mark.parametrize("method,path,body,max_queries,max_ms", READ_BUDGETS)
+def test_read_budget(client, count_queries, method, path, body, max_queries, max_ms):
+    with count_queries() as counter:
+        response = client.request(method, path, json=body)
+    assert_within_budget(counter, response, max_queries, max_ms)
+
+
+def test_dashboard_queries_do_not_grow_with_data(client, count_queries):
+    with count_queries() as before:
+        client.get("/api/v1/dashboard")
+
+    for i in range(10):
+        todo_id = client.post("/api/v1/todos", json={"title": f"Extra {i}", "scheduled_date": TODAY}).json()["data"]["id"]
+        subtask_id = client.post("/api/v1/todos", json={"title": "Extra subtask", "parent_id": todo_id}).json()["data"]["id"]
+        client.post("/api/v1/todos", json={"title": "Extra nested subtask", "parent_id": subtask_id})
+        client.post("/api/v1/todos", json={"title": f"Extra someday {i}"})
+
+    with count_queries() as after:
+        response = client.get("/api/v1/dashboard")
+    assert response.status_code == 200
+    assert after.count == before.count, after.describe()
+
+
+def _create_todo(client, **fields) -> int:
+    response = client.post("/api/v1/todos", json={"title": "Budget", **fields})
+    return response.json()["data"]["id"]
+
+
+def test_create_todo_budget(client, count_queries):
+    with count_queries() as counter:
+        response = client.post("/api/v1/todos", json={"title": "New", "scheduled_date": TODAY})
+    assert_within_budget(counter, response, 1, 250)
+
+
+def test_create_subtask_budget(client, count_queries):
+    parent_id = _create_todo(client, scheduled_date=TODAY)
+    with count_queries() as counter:
+        response = client.post("/api/v1/todos", json={"title": "Child", "parent_id": parent_id})
+    assert_within_budget(counter, response, 2, 250)
+
+
+def test_update_todo_budget(client, count_queries):
+    todo_id = _create_todo(client, scheduled_date=TODAY)
+    with count_queries() as counter:
+        response = client.put(f"/api/v1/todos/{todo_id}", json={"completed": True, "title": "Done"})
+    assert_within_budget(counter, response, 1, 250)
+
+
+def test_move_todo_budget(client, count_queries):
+    first = _create_todo(client, scheduled_date=TODAY)
+    second = _create_todo(client, scheduled_date=TODAY)
+    moved = _create_todo(client, scheduled_date=TODAY)
+    with count_queries() as counter:
+        response = client.post(f"/api/v1/todos/{moved}/move", json={"after_id": first, "before_id": second})
+    assert_within_budget(counter, response, 2, 250)
+    with count_queries() as counter:
+        response = client.post(f"/api/v1/todos/{moved}/move", json={"before_id": first})
+    assert_within_budget(counter, response, 3, 250)
+
+
+def test_delete_todo_with_subtasks_budget(client, count_queries):
+    parent_id = _create_todo(client, scheduled_date=TODAY)
+    for _ in range(5):
+        _create_todo(client, parent_id=_create_todo(client, parent_id=parent_id))
+    with count_queries() as counter:
+        response = client.delete(f"/api/v1/todos/{parent_id}")
+    assert_within_budget(counter, response, 1, 250)
+
+
+def test_migrate_budget(client, count_queries):
+    for day in range(1, 11):
+        _create_todo(client, scheduled_date=f"2000-01-{day:02d}")
+    with count_queries() as counter:
+        response = client.post("/api/v1/todos/migrate")
+    assert_within_budget(counter, response, 2, 500)
+    assert response.json()["data"]["migrated_count"] >= 10
+
+
+def test_category_write_budgets(client, count_queries):
+    with count_queries() as counter:
+        response = client.post("/api/v1/categories", json={"name": "Budget category"})
+    assert_within_budget(counter, response, 1, 250)
+    category_id = response.json()["data"]["id"]
+
+    with count_queries() as counter:
+        response = client.put(f"/api/v1/categories/{category_id}", json={"color": "#123456"})
+    assert_within_budget(counter, response, 1, 250)
+
+    with count_queries() as counter:
+        response = client.post(f"/api/v1/categories/{category_id}/move", json={"after_id": 1})
+    assert_within_budget(counter, response, 3, 250)
+
+    with count_queries() as counter:
+        response = client.delete(f"/api/v1/categories/{category_id}")
+    assert_within_budget(counter, response, 1, 250)
+
+
+def test_bulk_budget(client, count_queries):
+    ids = [_create_todo(client, scheduled_date=TODAY) for _ in range(10)]
+    operations = {
+        "create": [{"title": f"Bulk {i}", "scheduled_date": TODAY if i % 2 else None} for i in range(50)],
+        "update": [{"id": todo_id, "completed": True} for todo_id in ids[:5]],
+        "delete": ids[5:],
+    }
+    # Existence check, one position per list, one insert, one update per field set, one delete
+    with count_queries() as counter:
+        response = client.post("/api/v1/todos/bulk", json=operations)
+    assert_within_budget(counter, response, 6, 500)
@@ -0,0 +1,162 @@
+"""
+FastAPI TeuxDeux Clone - Read Model Consistency
+The dashboard served from memory must match the one loaded from SQL after
+every kind of write.
+"""
+
+import os
+import asyncio
+import sqlite3
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.coordination import change_monitor
+from app.dependencies import get_database
+from app.read_model import read_model, READ_MODEL_DAYS
+
+TODAY = datetime.now()
+OFFSETS = (0, 7, READ_MODEL_DAYS - 7, -7, READ_MODEL_DAYS)
+QUERIES = [f"weekOffset={offset}" for offset in OFFSETS] + [
+    "include=week&fields=title,category_name,children",
+    "include=someday,categories",
+]
+
+
+def _date(days: int) -> str:
+    return (TODAY + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+@pytest.fixture
+def memory(client):
+    read_model.enable()
+    yield read_model
+    read_model.disable()
+
+
+def assert_matches_sql(client):
+    for query in QUERIES:
+        from_memory = client.get(f"/api/v1/dashboard?{query}")
+        # Bypass the model without dropping it
+        read_model.enabled = False
+        try:
+            from_sql = client.get(f"/api/v1/dashboard?{query}")
+        finally:
+            read_model.enabled = True
+        assert from_memory.status_code == from_sql.status_code == 200
+        assert from_memory.content == from_sql.content, query
+
+
+def _create(client, **fields) -> int:
+    return client.post("/api/v1/todos", json={"title": "Read model", **fields}).json()["data"]["id"]
+
+
+def test_dashboard_is_served_from_memory(client, count_queries, memory):
+    client.get("/api/v1/dashboard")
+    assert memory.ready
+    with count_queries() as counter:
+        response = client.get("/api/v1/dashboard?weekOffset=7")
+    assert response.status_code == 200
+    assert counter.count == 0, counter.describe()
+    with count_queries() as counter:
+        client.get("/api/v1/dashboard?weekOffset=-7")
+    assert counter.count > 0
+
+
+def test_todo_writes_keep_memory_in_sync(client, memory):
+    assert_matches_sql(client)
+
+    parent = _create(client, scheduled_date=_date(1), category_id=2)
+    child = _create(client, parent_id=parent)
+    _create(client, parent_id=child)
+    someday = _create(client, category_id=3)
+    far = _create(client, scheduled_date=_date(READ_MODEL_DAYS + 30))
+    _create(client, parent_id=far)
+    assert_matches_sql(client)
+
+    client.put(f"/api/v1/todos/{child}", json={"completed": True, "title": "Done"})
+    client.put(f"/api/v1/todos/{someday}", json={"category_id": 4, "color": "#abcdef"})
+    client.put(f"/api/v1/todos/{parent}", json={"scheduled_date": _date(2)})
+    assert_matches_sql(client)
+
+    # Leaving and entering the window, with subtasks
+    client.put(f"/api/v1/todos/{parent}", json={"scheduled_date": _date(READ_MODEL_DAYS + 1)})
+    client.put(f"/api/v1/todos/{far}", json={"scheduled_date": _date(3)})
+    assert_matches_sql(client)
+
+    first = _create(client, scheduled_date=_date(3))
+    client.post(f"/api/v1/todos/{first}/move", json={"before_id": far})
+    client.post(f"/api/v1/todos/{someday}/move", json={"after_id": first})
+    assert_matches_sql(client)
+
+    client.delete(f"/api/v1/todos/{far}")
+    _create(client, scheduled_date=_date(-3))
+    client.post("/api/v1/todos/migrate")
+    assert_matches_sql(client)
+
+
+def test_category_writes_keep_memory_in_sync(client, memory):
+    category_id = client.post("/api/v1/categories", json={"name": "Read model"}).json()["data"]["id"]
+    _create(client, category_id=category_id)
+    client.put(f"/api/v1/categories/{category_id}", json={"name": "Renamed", "color": "#654321"})
+    client.post(f"/api/v1/categories/{category_id}/move", json={"before_id": 1})
+    assert_matches_sql(client)
+
+    unused = client.post("/api/v1/categories", json={"name": "Unused"}).json()["data"]["id"]
+    client.delete(f"/api/v1/categories/{unused}")
+    assert_matches_sql(client)
+
+
+def test_write_during_hydration_is_not_lost(client, memory):
+    database = get_database()
+    written = []
+
+    @asynccontextmanager
+    async def write_after_loading():
+        async with database.SessionLocal() as session:
+            yield session
+        # The rows are loaded but not installed yet
+        written.append(_create(client, scheduled_date=_date(1)))
+
+    memory.invalidate()
+    loaded = asyncio.run(memory.hydrate(SimpleNamespace(SessionLocal=write_after_loading)))
+    assert not loaded and not memory.ready
+
+    client.get("/api/v1/dashboard")
+    assert memory.ready
+    assert written[0] in memory.todos
+    assert_matches_sql(client)
+
+
+def test_only_other_workers_writes_reload_the_model(client, memory):
+    # What the lifespan starts with WEB_CONCURRENCY > 1
+    database = get_database()
+    change_monitor.start(database.db_path, database.engine)
+    try:
+        client.get("/api/v1/dashboard")
+        hydrations = memory.hydrations
+        todo_id = _create(client, scheduled_date=_date(2))
+        client.put(f"/api/v1/todos/{todo_id}", json={"title": "Applied in place"})
+        client.get("/api/v1/dashboard")
+        assert memory.hydrations == hydrations
+        assert_matches_sql(client)
+
+        other_worker = sqlite3.connect(database.db_path)
+        # The other workers are told about ours
+        assert other_worker.execute(
+            "SELECT counter FROM worker_changes WHERE pid = ?", (os.getpid(),)
+        ).fetchone()[0] >= 2
+        with other_worker:
+            other_worker.execute("UPDATE todos SET title = 'Other worker' WHERE id = ?", (todo_id,))
+            other_worker.execute(
+                "INSERT INTO worker_changes (pid, counter) VALUES (0, 1) "
+                "ON CONFLICT (pid) DO UPDATE SET counter = counter + 1"
+            )
+        other_worker.close()
+        client.get("/api/v1/dashboard")
+        assert memory.hydrations == hydrations + 1
+        assert memory.todos[todo_id].title == "Other worker"
+    finally:
+        change_monitor.stop()
@@ -0,0 +1,103 @@
+"""
+FastAPI TeuxDeux Clone - Single-Flight Reads
+Concurrent identical reads share one computation; writes and failures are
+never hidden from callers that arrive later.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.single_flight import SingleFlight, read_flights
+
+
+def _counting(calls: list, result="result", delay: float = 0.01):
+    async def compute():
+        calls.append(result)
+        await asyncio.sleep(delay)
+        return result
+    return compute
+
+
+def test_concurrent_calls_share_one_computation():
+    flights, calls = SingleFlight(), []
+
+    async def main():
+        return await asyncio.gather(*(flights.run("key", _counting(calls)) for _ in range(10)))
+
+    assert asyncio.run(main()) == ["result"] * 10
+    assert len(calls) == 1
+    assert (flights.executed, flights.shared) == (1, 9)
+    assert flights.as_dict()["in_flight"] == 0
+
+
+def test_different_keys_and_later_calls_compute_again():
+    flights, calls = SingleFlight(), []
+
+    async def main():
+        await asyncio.gather(flights.run("a", _counting(calls, "a")), flights.run("b", _counting(calls, "b")))
+        await flights.run("a", _counting(calls, "a"))
+
+    asyncio.run(main())
+    assert calls == ["a", "b", "a"]
+
+
+def test_invalidate_starts_a_new_computation():
+    flights, calls = SingleFlight(), []
+
+    async def main():
+        first = asyncio.ensure_future(flights.run("key", _counting(calls, "before write")))
+        await asyncio.sleep(0)
+        flights.invalidate()
+        second = await flights.run("key", _counting(calls, "after write"))
+        return await first, second
+
+    assert asyncio.run(main()) == ("before write", "after write")
+    assert len(calls) == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    flights, calls = SingleFlight(), []
+
+    async def main():
+        leader = asyncio.ensure_future(flights.run("key", _counting(calls, delay=0.05)))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.run("key", _counting(calls)))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(main()) == "result"
+    assert len(calls) == 1
+
+
+def test_errors_reach_every_caller():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("broken")
+
+    async def main():
+        return await asyncio.gather(*(flights.run("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flights.as_dict()["in_flight"] == 0
+
+
+@pytest.mark.parametrize("path", ["/api/v1/dashboard", "/api/v1/categories"])
+def test_concurrent_requests_get_identical_responses(client, path):
+    before = read_flights.executed + read_flights.shared
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(lambda _: client.get(path), range(16)))
+    assert all(response.status_code == 200 for response in responses)
+    assert len({response.content for response in responses}) == 1
+    assert read_flights.executed + read_flights.shared == before + 16
+
+
+def test_reads_after_a_write_see_it(client):
+    todo_id = client.post("/api/v1/todos", json={"title": "Seen"}).json()["data"]["id"]
+    todos = client.get("/api/v1/dashboard?include=someday&fields=title").json()["data"]["someday_todos"]
+    assert todo_id in [todo["id"] for todo in todos]
@@ -0,0 +1,39 @@
+"""
+FastAPI TeuxDeux Clone - Slow Query Log
+Statements are timed one by one, including around statements that fail.
+"""
+
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import slow_query
+
+
+def test_failing_statements_leave_no_timers_behind(tmp_path, monkeypatch):
+    records = []
+    log = logging.getLogger("test_slow_query")
+    monkeypatch.setattr(log, "info", records.append)
+    monkeypatch.setattr(slow_query, "_get_slow_query_log", lambda: log)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'slow.db'}")
+    slow_query.install_slow_query_log(engine, threshold_ms=0.000001)
+
+    async def main():
+        async with engine.connect() as conn:
+            await conn.execute(text("CREATE TABLE names (name TEXT UNIQUE)"))
+            await conn.execute(text("INSERT INTO names VALUES ('taken')"))
+            for _ in range(3):
+                with pytest.raises(IntegrityError):
+                    await conn.execute(text("INSERT INTO names VALUES ('taken')"))
+            await conn.execute(text("SELECT name FROM names"))
+            info = dict(conn.sync_connection.info)
+        await engine.dispose()
+        return info
+
+    assert asyncio.run(main()) == {}
+    # Every statement that completed was timed and logged
+    assert len(records) == 3
@@ -0,0 +1,44 @@
+"""
+FastAPI TeuxDeux Clone - Compiled Statement Cache
+Once every statement shape has been seen, the hot routes only reuse compiled
+statements; a statement built with literal values would miss on every request.
+"""
+
+from datetime import datetime
+
+from app.statement_cache import statement_cache_stats
+
+TODAY = datetime.now().strftime("%Y-%m-%d")
+
+
+def _exercise(client, offset: int):
+    client.get(f"/api/v1/dashboard?weekOffset={offset}")
+    client.get(f"/api/v1/dashboard?weekOffset={offset}&include=week&fields=title,completed")
+    client.get("/api/v1/categories")
+    client.get(f"/api/v1/todos/{offset + 1}")
+    todo_id = client.post("/api/v1/todos", json={"title": "Cached", "scheduled_date": TODAY}).json()["data"]["id"]
+    subtask_id = client.post("/api/v1/todos", json={"title": "Cached", "parent_id": todo_id}).json()["data"]["id"]
+    client.post("/api/v1/todos", json={"title": "Cached", "category_id": offset % 5 + 1})
+    client.put(f"/api/v1/todos/{subtask_id}", json={"completed": True})
+    client.delete(f"/api/v1/todos/{todo_id}")
+    category_id = client.post("/api/v1/categories", json={"name": f"Cached {offset}"}).json()["data"]["id"]
+    client.put(f"/api/v1/categories/{category_id}", json={"color": "#123456"})
+    client.delete(f"/api/v1/categories/{category_id}")
+    client.post("/api/v1/todos/migrate")
+
+
+def test_hot_routes_reuse_compiled_statements(client):
+    _exercise(client, 0)
+    misses = statement_cache_stats.misses
+    hits = statement_cache_stats.hits
+    for offset in range(1, 4):
+        _exercise(client, offset)
+    assert statement_cache_stats.misses == misses
+    assert statement_cache_stats.hits > hits
+
+
+def test_health_reports_statement_cache(client):
+    client.get("/api/v1/categories")
+    cache = client.get("/api/v1/health").json()["statement_cache"]
+    assert cache["hits"] > 0
+    assert 0 < cache["size"] <= cache["capacity"]
@@ -0,0 +1,91 @@
+"""
+FastAPI TeuxDeux Clone - Productivity Statistics
+The trigger-maintained rollups count a todo's days to complete up to when it
+was completed, and agree with a rebuild from scratch.
+"""
+
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.archive import archive_old_data
+from app.dependencies import get_database
+from app.statistics import rebuild_statistics
+
+
+def _totals(client, category_id: int) -> dict:
+    response = client.get(f"/api/v1/stats?weeks=1&category_id={category_id}")
+    assert response.status_code == 200, response.text
+    totals = response.json()["data"]["totals"]
+    return totals[0] if totals else {}
+
+
+async def _backdate(todo_id: int, created_days_ago: int, completed_days_ago: int):
+    database = get_database()
+    async with database.engine.begin() as conn:
+        await conn.execute(text(
+            "UPDATE todos SET created_at = datetime('now', :created) WHERE id = :id"
+        ), {"id": todo_id, "created": f"-{created_days_ago} days"})
+        await conn.execute(text(
+            "UPDATE stats_completions SET completed_at = datetime('now', :completed) WHERE todo_id = :id"
+        ), {"id": todo_id, "completed": f"-{completed_days_ago} days"})
+    await rebuild_statistics(database)
+
+
+def test_days_to_complete_ignore_later_edits(client):
+    category_id = client.post("/api/v1/categories", json={"name": "Stats"}).json()["data"]["id"]
+    todo_id = client.post("/api/v1/todos", json={
+        "title": "Measured", "category_id": category_id, "scheduled_date": datetime.now().strftime("%Y-%m-%d")
+    }).json()["data"]["id"]
+    assert _totals(client, category_id)["completed"] == 0
+
+    client.put(f"/api/v1/todos/{todo_id}", json={"completed": True})
+    asyncio.run(_backdate(todo_id, created_days_ago=5, completed_days_ago=3))
+    assert _totals(client, category_id)["avg_days_to_complete"] == 2
+
+    client.put(f"/api/v1/todos/{todo_id}", json={"title": "Renamed"})
+    client.put(f"/api/v1/todos/{todo_id}", json={"completed": True})
+    assert _totals(client, category_id)["avg_days_to_complete"] == 2
+    by_triggers = _totals(client, category_id)
+    asyncio.run(rebuild_statistics(get_database()))
+    assert _totals(client, category_id) == by_triggers
+
+    # Reopening drops the completion; completing again starts counting from then
+    client.put(f"/api/v1/todos/{todo_id}", json={"completed": False})
+    assert _totals(client, category_id)["completed"] == 0
+    client.put(f"/api/v1/todos/{todo_id}", json={"completed": True})
+    assert _totals(client, category_id)["avg_days_to_complete"] == 5
+
+    client.delete(f"/api/v1/todos/{todo_id}")
+    client.delete(f"/api/v1/categories/{category_id}")
+
+
+async def _query(sql: str, **params) -> list:
+    async with get_database().engine.connect() as conn:
+        return (await conn.execute(text(sql), params)).all()
+
+
+def test_archived_completion_times_go_with_the_todo(client):
+    category_id = client.post("/api/v1/categories", json={"name": "Archived stats"}).json()["data"]["id"]
+    todo_id = client.post("/api/v1/todos", json={
+        "title": "Old", "category_id": category_id, "scheduled_date": "2020-01-06"
+    }).json()["data"]["id"]
+    client.put(f"/api/v1/todos/{todo_id}", json={"completed": True})
+    asyncio.run(_backdate(todo_id, created_days_ago=5, completed_days_ago=3))
+    weekly = "SELECT * FROM stats_weekly WHERE category_id = :category_id ORDER BY week_start"
+    before = asyncio.run(_query(weekly, category_id=category_id))
+
+    asyncio.run(archive_old_data(get_database()))
+    assert asyncio.run(_query("SELECT * FROM stats_completions WHERE todo_id = :id", id=todo_id)) == []
+    asyncio.run(rebuild_statistics(get_database()))
+    assert asyncio.run(_query(weekly, category_id=category_id)) == before
+
+    # SQLite hands the highest id out again; the new todo starts without a completion time
+    reused = client.post("/api/v1/todos", json={
+        "title": "Reused", "category_id": category_id, "scheduled_date": datetime.now().strftime("%Y-%m-%d")
+    }).json()["data"]["id"]
+    assert reused == todo_id
+    client.put(f"/api/v1/todos/{reused}", json={"completed": True})
+    assert _totals(client, category_id)["avg_days_to_complete"] == 0
+    client.delete(f"/api/v1/todos/{reused}")
@@ -0,0 +1,31 @@
+"""
+FastAPI TeuxDeux Clone - Multi-Tenant Database Pool
+Background jobs reach every tenant database without disturbing the pool.
+"""
+
+import asyncio
+
+from app.tenancy import TenantDatabasePool
+
+
+def test_jobs_run_for_every_tenant(tmp_path):
+    pool = TenantDatabasePool(db_dir=str(tmp_path), max_size=1)
+    visited = []
+
+    async def job(database):
+        visited.append(database.db_path)
+        if database.db_path.endswith("broken.db"):
+            raise RuntimeError("broken")
+
+    async def main():
+        for tenant_id in ("acme", "broken", "zeta"):
+            await pool.get(tenant_id)
+        open_tenant = list(pool._databases)
+        await pool.run_for_each_tenant(job, "Test job")
+        assert list(pool._databases) == open_tenant == ["zeta"]
+        await pool.close()
+
+    (tmp_path / "not a tenant.db").write_bytes(b"")
+    asyncio.run(main())
+    assert pool.tenant_ids() == ["acme", "broken", "zeta"]
+    assert [path.rsplit("/", 1)[-1] for path in visited] == ["acme.db", "broken.db", "zeta.db"]
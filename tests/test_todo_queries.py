@@ -0,0 +1,85 @@
+"""
+FastAPI TeuxDeux Clone - Todo Query API
+Filters and keyset pagination of GET /api/v1/todos
+"""
+
+from datetime import datetime
+
+import pytest
+
+TODAY = datetime.now().strftime("%Y-%m-%d")
+
+
+def _all_pages(client, **params) -> list:
+    todos, cursor = [], None
+    while True:
+        page = client.get("/api/v1/todos", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert page.status_code == 200, page.text
+        data = page.json()["data"]
+        assert data["count"] == len(data["todos"]) <= params.get("limit", 100)
+        todos.extend(data["todos"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return todos
+
+
+def _key(todo: dict):
+    date = todo["scheduled_date"]["String"] if todo["scheduled_date"] else ""
+    return (date, todo["sort_order"], todo["id"])
+
+
+def test_pages_cover_every_todo_once_in_order(client):
+    todos = _all_pages(client, limit=23)
+    ids = [todo["id"] for todo in todos]
+    assert len(ids) == len(set(ids))
+    assert [_key(todo) for todo in todos] == sorted(_key(todo) for todo in todos)
+    assert ids == [todo["id"] for todo in _all_pages(client, limit=500)]
+
+
+def test_pages_stay_stable_when_earlier_rows_are_inserted(client):
+    first = client.get("/api/v1/todos", params={"limit": 10, "scheduled": True}).json()["data"]
+    # A todo sorted before the cursor must not shift the next page
+    client.post("/api/v1/todos", json={"title": "Early", "scheduled_date": "1999-01-01"})
+    rest = _all_pages(client, limit=10, scheduled=True, cursor=first["next_cursor"])
+    assert not {todo["id"] for todo in first["todos"]} & {todo["id"] for todo in rest}
+    assert all(_key(todo) > _key(first["todos"][-1]) for todo in rest)
+
+
+@pytest.mark.parametrize("params,check", [
+    ({"from": TODAY, "to": TODAY}, lambda t: t["scheduled_date"]["String"] == TODAY),
+    ({"scheduled": False}, lambda t: t["scheduled_date"] is None),
+    ({"category_id": 3, "completed": False}, lambda t: t["category_id"]["Int64"] == 3 and not t["completed"]),
+    ({"top_level": False}, lambda t: t["parent_id"] is not None),
+    ({"parent_id": 1}, lambda t: t["parent_id"]["Int64"] == 1),
+    ({"recurring": False}, lambda t: t["recurring_pattern"] is None),
+])
+def test_filters(client, params, check):
+    todos = _all_pages(client, limit=50, **params)
+    assert todos
+    assert all(check(todo) for todo in todos)
+
+
+def test_ids_and_single_todo(client):
+    todos = client.get("/api/v1/todos?ids=3,1,2,999999").json()["data"]["todos"]
+    assert sorted(todo["id"] for todo in todos) == [1, 2, 3]
+
+    todo = client.get("/api/v1/todos/1").json()["data"]
+    assert todo["id"] == 1 and len(todo["children"]) > 0
+    assert client.get("/api/v1/todos/999999").status_code == 404
+
+
+@pytest.mark.parametrize("query", [
+    "cursor=not-a-cursor", "cursor=W1sxXSx7ImEiOjF9LDBd", "cursor=WyIiLHRydWUsMV0",
+    "from=2026-02-30", "ids=1,x", "limit=0"
+])
+def test_invalid_parameters(client, query):
+    assert client.get(f"/api/v1/todos?{query}").status_code in (400, 422)
+
+
+def test_calendar_normalizes_unpadded_dates(client):
+    todo_id = client.post("/api/v1/todos", json={"title": "Calendar", "scheduled_date": "2024-01-15"}).json()["data"]["id"]
+    padded = client.get("/api/v1/calendar?from=2024-01-10&to=2024-01-20").json()["data"]
+    unpadded = client.get("/api/v1/calendar?from=2024-1-10&to=2024-1-20").json()["data"]
+    assert unpadded == padded
+    assert [day["date"] for day in padded["days"]] == ["2024-01-15"]
+    client.delete(f"/api/v1/todos/{todo_id}")
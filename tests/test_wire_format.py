@@ -0,0 +1,104 @@
+"""
+FastAPI TeuxDeux Clone - Wire Formats and Bulk Writes
+MessagePack responses carry the same data as JSON without the nullable
+wrappers; bulk writes accept JSON and MessagePack bodies.
+"""
+
+import msgpack
+import orjson
+import pytest
+
+from app.wire_format import prefers_msgpack, compact
+
+MSGPACK = {"Accept": "application/msgpack"}
+
+
+@pytest.mark.parametrize("accept,expected", [
+    (None, False),
+    ("application/json", False),
+    ("text/html,application/xhtml+xml,*/*;q=0.8", False),
+    ("application/msgpack", True),
+    ("application/x-msgpack, application/json;q=0.5", True),
+    ("application/json, application/msgpack", False),
+    ("application/msgpack;q=0", False),
+])
+def test_accept_negotiation(accept, expected):
+    assert prefers_msgpack(accept) is expected
+
+
+def test_compact_drops_nullable_wrappers():
+    assert compact({
+        "category_id": {"Int64": 3, "Valid": True},
+        "color": {"String": "#fff", "Valid": False},
+        "children": [{"parent_id": {"Int64": 1, "Valid": True}}],
+        "title": "Valid",
+    }) == {"category_id": 3, "color": None, "children": [{"parent_id": 1}], "title": "Valid"}
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/dashboard",
+    "/api/v1/dashboard?include=week&fields=title,category_id",
+    "/api/v1/categories",
+    "/api/v1/todos?limit=50",
+    "/api/v1/todos/1",
+])
+def test_msgpack_responses_match_json(client, path):
+    as_json = client.get(path)
+    as_msgpack = client.get(path, headers=MSGPACK)
+    assert as_msgpack.status_code == 200
+    assert as_msgpack.headers["content-type"] == "application/msgpack"
+    assert "Accept" in as_msgpack.headers["vary"]
+    assert as_json.headers["content-type"] == "application/json"
+    assert msgpack.unpackb(as_msgpack.content) == compact(orjson.loads(as_json.content))
+    assert len(as_msgpack.content) < len(as_json.content)
+
+
+def _bulk(client, operations: dict, as_msgpack: bool = True):
+    if as_msgpack:
+        response = client.post(
+            "/api/v1/todos/bulk", content=msgpack.packb(operations),
+            headers={"Content-Type": "application/msgpack", **MSGPACK}
+        )
+        return response, msgpack.unpackb(response.content) if response.status_code == 200 else None
+    response = client.post("/api/v1/todos/bulk", json=operations)
+    return response, response.json() if response.status_code == 200 else None
+
+
+def test_bulk_writes(client):
+    response, body = _bulk(client, {"create": [
+        {"title": "Bulk 1", "scheduled_date": "2031-01-01"},
+        {"title": "Bulk 2", "scheduled_date": "2031-01-01"},
+        {"title": "Bulk someday", "category_id": 2},
+    ]})
+    assert response.status_code == 200, response.text
+    first, second, someday = body["data"]["created"]
+    subtask = _bulk(client, {"create": [{"title": "Bulk child", "parent_id": first}]})[1]["data"]["created"][0]
+
+    day = client.get("/api/v1/todos?from=2031-01-01&to=2031-01-01&top_level=true", headers=MSGPACK)
+    todos = msgpack.unpackb(day.content)["data"]["todos"]
+    assert [todo["id"] for todo in todos] == [first, second]
+    assert todos[0]["sort_order"] < todos[1]["sort_order"]
+    assert todos[0]["scheduled_date"] == "2031-01-01"
+
+    response, body = _bulk(client, {
+        "update": [{"id": first, "completed": True}, {"id": someday, "title": "Renamed", "completed": True}],
+        "delete": [second]
+    }, as_msgpack=False)
+    assert response.status_code == 200, response.text
+    assert body["data"] == {"created": [], "updated": 2, "deleted": [second]}
+    assert client.get(f"/api/v1/todos/{someday}").json()["data"]["title"] == "Renamed"
+
+    # Subtasks go with their todo
+    assert _bulk(client, {"delete": [first]})[1]["data"]["deleted"] == sorted([first, subtask])
+
+
+def test_bulk_errors(client):
+    assert _bulk(client, {})[0].status_code == 400
+    response, _ = _bulk(client, {"delete": [999999], "create": [{"title": "Not written"}]})
+    assert response.status_code == 404
+    assert "999999" in response.json()["detail"]
+    response, _ = _bulk(client, {"create": [{"title": "Orphan", "parent_id": 999999}]})
+    assert response.status_code == 404
+    assert _bulk(client, {"create": [{"no_title": True}]})[0].status_code == 422
+    response = client.post("/api/v1/todos/bulk", content=b"\xc1", headers={"Content-Type": "application/msgpack"})
+    assert response.status_code == 400